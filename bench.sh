@@ -0,0 +1,2 @@
+# Per-stage benchmark on a synthetic corpus; pass --help for the options
+python3 src/benchmark.py "$@"
@@ -1,7 +1,9 @@
 #!/bin/bash
 
-# Generate the static site
-python3 src/main.py
-
 # Start the web server in the docs directory
-cd docs && python3 -m http.server 8888
+python3 -m http.server 8888 --directory docs &
+SERVER_PID=$!
+trap 'kill $SERVER_PID' EXIT
+
+# Generate the static site, then rebuild changed pages and assets
+python3 src/main.py --watch
@@ -0,0 +1,264 @@
+import json
+import os
+import posixpath
+import re
+
+from build_manifest import hash_bytes, hash_file
+
+# Files referenced by pages and templates that get a content hash in their
+# name. Others (robots.txt, favicon.ico, HTML) are fetched by fixed URLs and
+# keep their names.
+FINGERPRINT_EXTENSIONS = frozenset(
+    {
+        ".css",
+        ".js",
+        ".mjs",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".webp",
+        ".avif",
+        ".svg",
+        ".woff",
+        ".woff2",
+        ".ttf",
+        ".otf",
+    }
+)
+
+DEFAULT_ASSET_MANIFEST_NAME = "assets.json"
+
+# Hex digits of the content hash put into file names
+_HASH_LENGTH = 10
+
+# url(...) references and @import strings in stylesheets; the URL is in
+# whichever group matched
+_CSS_REFERENCE = re.compile(
+    r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)'"\s]*))\s*\)"""
+    r"""|@import\s+(?:"([^"]*)"|'([^']*)')""",
+    re.IGNORECASE,
+)
+
+
+def _css_references(css):
+    """
+    Yields:
+        tuple: (start, end, url) of every URL a stylesheet references, with
+        start and end its offsets in css
+    """
+    for match in _CSS_REFERENCE.finditer(css):
+        for group in range(1, 6):
+            if match.group(group) is not None:
+                yield match.start(group), match.end(group), match.group(group)
+                break
+
+
+def _split_url(url, base_path):
+    """
+    Split a URL referenced from the static file at URL path base_path.
+
+    Returns:
+        tuple | None: The URL path of the static file it names and the
+        query and fragment suffix, or None if it names no static file
+        (external, data: and fragment-only URLs, or outside the static
+        directory)
+    """
+    end = len(url)
+    for separator in "?#":
+        index = url.find(separator)
+        if index != -1:
+            end = min(end, index)
+    path, suffix = url[:end], url[end:]
+    if not path or path.startswith("//") or ":" in path:
+        return None
+    if path.startswith("/"):
+        path = path[1:]
+    else:
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(base_path), path))
+        if path.startswith("../") or path == "..":
+            return None
+    return path, suffix
+
+
+def fingerprinted_name(rel_path, digest):
+    """
+    Returns:
+        str: rel_path with the start of digest inserted before its extension,
+        e.g. images/tom.png -> images/tom.0123456789.png
+    """
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:_HASH_LENGTH]}{ext}"
+
+
+class AssetMap:
+    """
+    Maps the URL paths of static files (relative to the static directory,
+    with "/" separators) to their fingerprinted names.
+
+    Renderers resolve root-relative URLs through it before applying the
+    basepath (see url_resolver). The map is immutable once built, and
+    digest identifies its contents, e.g. in render cache keys.
+    """
+
+    def __init__(self, names=None):
+        self.names = dict(names or {})
+        self.digest = hash_bytes(json.dumps(self.names, sort_keys=True).encode())
+
+    def __len__(self):
+        return len(self.names)
+
+    def resolve(self, url):
+        """
+        Returns:
+            str: url pointing at the fingerprinted name of the static file it
+            names, with any query and fragment kept; other URLs unchanged
+        """
+        if not url.startswith("/") or url.startswith("//"):
+            return url
+        end = len(url)
+        for separator in "?#":
+            index = url.find(separator)
+            if index != -1:
+                end = min(end, index)
+        name = self.names.get(url[1:end])
+        if name is None:
+            return url
+        return "/" + name + url[end:]
+
+    def output_name(self, rel_path):
+        """
+        Returns:
+            str: Output path, relative to the output directory, of the static
+            file at rel_path (relative to the static directory)
+        """
+        name = self.names.get(rel_path.replace(os.sep, "/"))
+        return rel_path if name is None else name.replace("/", os.sep)
+
+    def rewrite_css(self, css, rel_path):
+        """
+        Point the url(...) and @import references of the stylesheet at
+        rel_path (relative to the static directory) that name static files
+        at their fingerprinted names. Root-relative references stay
+        root-relative and relative ones relative; only the file name
+        changes, as fingerprinting keeps files in their directory.
+
+        Returns:
+            str: The rewritten stylesheet
+        """
+        base_path = rel_path.replace(os.sep, "/")
+        parts = []
+        last = 0
+        for start, end, url in _css_references(css):
+            split = _split_url(url, base_path)
+            if split is None or split[0] not in self.names:
+                continue
+            path, suffix = split
+            url_path = url[: len(url) - len(suffix)]
+            directory = url_path[: url_path.rfind("/") + 1]
+            new_name = posixpath.basename(self.names[path])
+            parts += [css[last:start], directory, new_name, suffix]
+            last = end
+        parts.append(css[last:])
+        return "".join(parts)
+
+    def to_json(self):
+        """
+        The asset manifest: original URL path -> fingerprinted URL path.
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        return json.dumps(self.names, indent=1, sort_keys=True).encode("utf-8")
+
+
+def fingerprint_assets(static_dir, records=None, minify=False):
+    """
+    Hash every static file with one of FINGERPRINT_EXTENSIONS and build the
+    map to their fingerprinted names.
+
+    Stylesheets are copied with their references rewritten (see
+    AssetMap.rewrite_css), so the name of a stylesheet also covers the
+    fingerprinted names of the files it references: it changes when one of
+    those does.
+
+    Args:
+        static_dir (str): Static source directory
+        records (dict): Optional rel_path -> [size, mtime_ns, hash, name
+            hash] of the previous run, updated in place; files whose size and
+            mtime match their record are not hashed again
+        minify (bool): Whether stylesheets are copied minified; their names
+            then get a different hash, since their content differs
+
+    Returns:
+        tuple: The AssetMap and the sorted paths, relative to static_dir, of
+        the fingerprinted files added, renamed or removed since records were
+        taken
+    """
+    if records is None:
+        records = {}
+    files_by_url = {}
+    seen = set()
+
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() not in FINGERPRINT_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, static_dir)
+            seen.add(rel_path)
+            stat = os.stat(path)
+
+            record = records.get(rel_path)
+            if record is not None and record[:2] == [stat.st_size, stat.st_mtime_ns]:
+                digest = record[2]
+            else:
+                digest = hash_file(path)
+            files_by_url[rel_path.replace(os.sep, "/")] = (path, rel_path, stat, digest)
+
+    name_digests = {}
+    pending = set()
+
+    def name_digest(url_path):
+        if url_path in name_digests:
+            return name_digests[url_path]
+        path, _, _, digest = files_by_url[url_path]
+        if os.path.splitext(path)[1].lower() != ".css":
+            return digest
+        # A reference cycle between stylesheets falls back to content hashes
+        pending.add(url_path)
+        with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+            css = f.read()
+        parts = ["css", digest]
+        for _, _, url in _css_references(css):
+            split = _split_url(url, url_path)
+            if split is None or split[0] not in files_by_url:
+                continue
+            ref = split[0]
+            ref_digest = files_by_url[ref][3] if ref in pending else name_digest(ref)
+            parts.append(f"{ref}\0{ref_digest}")
+        if minify:
+            parts.append("minify")
+        pending.discard(url_path)
+        if len(parts) > 2:
+            digest = hash_bytes("\0".join(parts).encode())
+        name_digests[url_path] = digest
+        return digest
+
+    names = {}
+    changed = []
+    for url_path, (_, rel_path, stat, digest) in files_by_url.items():
+        url_digest = name_digest(url_path)
+        record = records.get(rel_path)
+        if record is None or record[3:] != [url_digest]:
+            changed.append(rel_path)
+        records[rel_path] = [stat.st_size, stat.st_mtime_ns, digest, url_digest]
+        names[url_path] = fingerprinted_name(url_path, url_digest)
+
+    for rel_path in list(records):
+        if rel_path not in seen:
+            del records[rel_path]
+            changed.append(rel_path)
+
+    return AssetMap(names), sorted(changed)
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from block_to_block_type import BlockType, block_to_block_type
+from build_manifest import GENERATOR_VERSION
+from compile_template import compile_template
+from extract_title import extract_title
+from generate_page import generate_pages_recursive
+from inline_cache import InlineCache
+from markdown_to_blocks import markdown_to_blocks
+from markdown_to_html import markdown_to_html, write_markdown_html
+from markdown_to_html_node import markdown_to_html_node, split_heading
+from scan_blocks import Block
+from synthetic_corpus import CorpusOptions, generate_corpus, write_corpus
+from text_to_html import text_node_to_html_node
+from text_to_textnodes import text_to_textnodes
+
+TEMPLATE = (
+    "<!doctype html><html><head><title>{{ Title }}</title>"
+    '<link href="/index.css" rel="stylesheet" /></head>'
+    "<body><article>{{ Content }}</article></body></html>"
+)
+
+
+def _inline_texts(block_text):
+    """
+    The inline text fragments block_to_html_node passes to text_to_textnodes.
+    """
+    block = Block(block_text.split("\n"))
+    if block.block_type == BlockType.PARAGRAPH:
+        return [" ".join([line.strip() for line in block.lines])]
+    if block.block_type == BlockType.HEADING:
+        return [split_heading(block_text)[1]]
+    if block.block_type == BlockType.QUOTE:
+        return [" ".join([line.lstrip("> ").strip() for line in block.lines])]
+    if block.block_type == BlockType.UNORDERED_LIST:
+        return [line[2:] for line in block.lines]
+    if block.block_type == BlockType.ORDERED_LIST:
+        return [line.split(". ", 1)[1] for line in block.lines]
+    return []
+
+
+def _best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _render_with_inline_cache(markdowns, cache_size):
+    cache = InlineCache(cache_size)
+    for md in markdowns:
+        write_markdown_html(md, [].append, inline_cache=cache)
+    return cache
+
+
+def run_benchmarks(options, repeat=3, inline_cache_size=4096):
+    """
+    Time each pipeline stage separately over a synthetic corpus.
+
+    Every stage gets its inputs precomputed by the previous stages, so the
+    timings only cover the stage itself. The inline cache stage renders
+    like markdown_to_html with a fresh InlineCache of inline_cache_size
+    entries per run.
+
+    Returns:
+        dict: JSON-serializable results with per-stage seconds, pages/s and
+        MB/s (relative to the markdown input size)
+    """
+    corpus = generate_corpus(options)
+    markdowns = [markdown for _, markdown in corpus]
+    input_bytes = sum(len(markdown.encode("utf-8")) for markdown in markdowns)
+
+    blocks = [block for md in markdowns for block in markdown_to_blocks(md)]
+    inline_texts = [text for block in blocks for text in _inline_texts(block)]
+    text_nodes = [node for text in inline_texts for node in text_to_textnodes(text)]
+    trees = [markdown_to_html_node(md) for md in markdowns]
+    titles = [extract_title(md) for md in markdowns]
+    contents = [tree.to_html() for tree in trees]
+    template = compile_template(TEMPLATE)
+
+    stages = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(md) for md in markdowns],
+        "block_to_block_type": lambda: [block_to_block_type(b) for b in blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(t) for t in inline_texts],
+        "text_node_to_html_node": lambda: [
+            text_node_to_html_node(n) for n in text_nodes
+        ],
+        "markdown_to_html_node": lambda: [
+            markdown_to_html_node(md) for md in markdowns
+        ],
+        "to_html": lambda: [tree.to_html() for tree in trees],
+        "markdown_to_html": lambda: [markdown_to_html(md) for md in markdowns],
+        "markdown_to_html_inline_cache": lambda: _render_with_inline_cache(
+            markdowns, inline_cache_size
+        ),
+        "extract_title": lambda: [extract_title(md) for md in markdowns],
+        "template_fill": lambda: [
+            template.render_bytes(title, content)
+            for title, content in zip(titles, contents)
+        ],
+    }
+
+    results = {}
+    for name, func in stages.items():
+        results[name] = _best_time(func, repeat)
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        content_dir = os.path.join(work_dir, "content")
+        public_dir = os.path.join(work_dir, "public")
+        template_path = os.path.join(work_dir, "template.html")
+        write_corpus(corpus, content_dir)
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write(TEMPLATE)
+
+        paths = [os.path.join(content_dir, rel_path) for rel_path, _ in corpus]
+        pages = [template.render_bytes(t, c) for t, c in zip(titles, contents)]
+
+        def file_io():
+            for path, page in zip(paths, pages):
+                with open(path, "rb") as f:
+                    f.read()
+                with open(path[:-3] + ".html", "wb") as f:
+                    f.write(page)
+
+        results["file_io"] = _best_time(file_io, repeat)
+
+        def full_build():
+            shutil.rmtree(public_dir, ignore_errors=True)
+            generate_pages_recursive(content_dir, template_path, public_dir)
+
+        # generate_page reports every page; keep the JSON output clean
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            results["full_build"] = _best_time(full_build, repeat)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    finally:
+        shutil.rmtree(work_dir)
+
+    cache = _render_with_inline_cache(markdowns, inline_cache_size)
+    megabytes = input_bytes / 1e6
+    return {
+        "generator_version": GENERATOR_VERSION,
+        "python": platform.python_version(),
+        "corpus": dict(
+            options.to_dict(),
+            input_bytes=input_bytes,
+            blocks=len(blocks),
+            text_nodes=len(text_nodes),
+        ),
+        "repeat": repeat,
+        "inline_cache": {
+            "size": inline_cache_size,
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "evictions": cache.evictions,
+            "hit_rate": round(cache.hit_rate(), 4),
+        },
+        "stages": {
+            name: {
+                "seconds": round(seconds, 6),
+                "pages_per_s": round(options.pages / seconds, 1) if seconds else None,
+                "mb_per_s": round(megabytes / seconds, 3) if seconds else None,
+            }
+            for name, seconds in results.items()
+        },
+    }
+
+
+def main(argv=None):
+    defaults = CorpusOptions()
+    parser = argparse.ArgumentParser(
+        description="Per-stage benchmark on a synthetic markdown corpus"
+    )
+    for name, value in defaults.to_dict().items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"), type=type(value), default=value
+        )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--inline-cache-size", type=int, default=4096)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = vars(parser.parse_args(argv))
+
+    repeat = args.pop("repeat")
+    output = args.pop("output")
+    inline_cache_size = args.pop("inline_cache_size")
+    results = run_benchmarks(CorpusOptions(**args), repeat, inline_cache_size)
+
+    report = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
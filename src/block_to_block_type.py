@@ -10,32 +10,85 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
-def block_to_block_type(markdown_block):
-    # Heading
-    if markdown_block.startswith("#"):
-        parts = markdown_block.split(" ", 1)
-        if len(parts) == 2:
-            hashes = parts[0]
-            if 1 <= len(hashes) <= 6 and parts[1].strip() != "":
-                return BlockType.HEADING
-
-    # CodeBlock
-    if markdown_block.startswith("```") and markdown_block.endswith("```"):
+def _is_heading(lines):
+    # Same rule as block.split(" ", 1) on the joined block: 1-6 characters
+    # before the first space and something non-blank after it
+    offset = 0
+    for i, line in enumerate(lines):
+        space = line.find(" ")
+        if space != -1:
+            if offset + space > 6:
+                return False
+            if line[space + 1 :].strip():
+                return True
+            return any(rest.strip() for rest in lines[i + 1 :])
+        offset += len(line) + 1
+        if offset > 6:
+            return False
+    return False
+
+
+def _heading_or_paragraph(lines):
+    return BlockType.HEADING if _is_heading(lines) else BlockType.PARAGRAPH
+
+
+def _code_or_paragraph(lines):
+    if lines[0].startswith("```") and lines[-1].endswith("```"):
         return BlockType.CODE
+    return BlockType.PARAGRAPH
 
-    lines = markdown_block.split("\n")
 
-    # QuoteBlock
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
+def _quote_or_paragraph(lines):
+    for line in lines:
+        if not line.startswith(">"):
+            return BlockType.PARAGRAPH
+    return BlockType.QUOTE
 
-    # UnorderedList
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
 
-    # OrderedList "1. "
-    if all(line.startswith(str(i + 1) + ". ") for i, line in enumerate(lines)):
-        return BlockType.ORDERED_LIST
+def _unordered_list_or_paragraph(lines):
+    for line in lines:
+        if not line.startswith("- "):
+            return BlockType.PARAGRAPH
+    return BlockType.UNORDERED_LIST
 
-    # if no than paragraph
-    return BlockType.PARAGRAPH
+
+# "1. " to "100. ", so list items are not checked against freshly built
+# strings; longer lists build the rest
+_ORDERED_PREFIXES = tuple(f"{i}. " for i in range(1, 101))
+
+
+def _ordered_list_or_paragraph(lines):
+    for line, prefix in zip(lines, _ORDERED_PREFIXES):
+        if not line.startswith(prefix):
+            return BlockType.PARAGRAPH
+    for i in range(len(_ORDERED_PREFIXES), len(lines)):
+        if not lines[i].startswith(f"{i + 1}. "):
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+
+# Only a block starting with one of these characters can be anything but a
+# paragraph; an ordered list has to start at "1. "
+_CLASSIFIERS = {
+    "#": _heading_or_paragraph,
+    "`": _code_or_paragraph,
+    ">": _quote_or_paragraph,
+    "-": _unordered_list_or_paragraph,
+    "1": _ordered_list_or_paragraph,
+}
+
+
+def block_type_from_lines(lines):
+    """
+    Classify a block from its lines in a single pass: the first character
+    selects the only type the block can have besides a paragraph, and that
+    type's check stops at the first line that rules it out.
+    """
+    classify = _CLASSIFIERS.get(lines[0][:1])
+    if classify is None:
+        return BlockType.PARAGRAPH
+    return classify(lines)
+
+
+def block_to_block_type(markdown_block):
+    return block_type_from_lines(markdown_block.split("\n"))
@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+
+from dependency_graph import DependencyGraph
+
+# Bump whenever a parser or renderer change alters generated HTML, or the
+# manifest gains information older builds did not record, so that pages
+# built by an older generator are never considered up to date.
+GENERATOR_VERSION = "3"
+
+DEFAULT_MANIFEST_PATH = os.path.join(".ssg-cache", "manifest.json")
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Persisted record of the inputs each generated page was built from.
+
+    Every entry maps a source markdown path to its size, mtime, content hash,
+    the template hash, basepath, generator version and output path of the
+    last successful build. A page is only regenerated when one of those
+    inputs changed or its output file disappeared.
+
+    It also remembers which output files were copied from the static
+    directory, so assets removed from the source can be pruned without
+    touching generated pages.
+
+    The dependency graph records which input files every output was built
+    from, see DependencyGraph. With asset fingerprinting, fingerprints keeps
+    the size, mtime and content hash of every fingerprinted static file, see
+    fingerprint_assets. image_sizes caches the size and content hash of
+    every static image, see scan_image_sizes.
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_MANIFEST_PATH,
+        pages=None,
+        assets=None,
+        dependencies=None,
+        fingerprints=None,
+        image_sizes=None,
+    ):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        self.dependencies = DependencyGraph(dependencies)
+        self.fingerprints = fingerprints if fingerprints is not None else {}
+        self.image_sizes = image_sizes if image_sizes is not None else {}
+        self.seen = set()
+        # Whether this manifest was read from disk, see load
+        self.loaded = False
+
+    @classmethod
+    def load(cls, path=DEFAULT_MANIFEST_PATH):
+        """
+        Load a manifest from disk. A missing, unreadable or outdated manifest
+        yields an empty one, which simply means every page gets rebuilt; only
+        a manifest read from disk has loaded set.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if data.get("generator_version") != GENERATOR_VERSION:
+            return cls(path)
+
+        manifest = cls(
+            path,
+            data.get("pages", {}),
+            data.get("assets", {}),
+            data.get("dependencies", {}),
+            data.get("fingerprints", {}),
+            data.get("image_sizes", {}),
+        )
+        manifest.loaded = True
+        return manifest
+
+    def save(self):
+        """
+        Write the manifest atomically so an interrupted build never leaves a
+        truncated file behind.
+        """
+        manifest_dir = os.path.dirname(self.path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "generator_version": GENERATOR_VERSION,
+                    "pages": self.pages,
+                    "assets": self.assets,
+                    "dependencies": self.dependencies.outputs,
+                    "fingerprints": self.fingerprints,
+                    "image_sizes": self.image_sizes,
+                },
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
+
+    def is_page_fresh(self, from_path, dest_path, template_hash, basepath):
+        """
+        Check whether the output for from_path is still up to date.
+
+        The cheap size/mtime comparison is tried first; the source is only
+        hashed when those differ (e.g. after a checkout or a touch).
+        """
+        self.seen.add(from_path)
+
+        entry = self.pages.get(from_path)
+        if entry is None:
+            return False
+        if (
+            entry.get("stale")
+            or entry["output"] != dest_path
+            or entry["template_hash"] != template_hash
+            or entry["basepath"] != basepath
+            or entry["generator_version"] != GENERATOR_VERSION
+        ):
+            return False
+        if not os.path.exists(dest_path):
+            return False
+
+        try:
+            stat = os.stat(from_path)
+        except OSError:
+            return False
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+
+        if hash_file(from_path) != entry["hash"]:
+            return False
+
+        # Content is unchanged, remember the new stat so the next check is cheap
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def record_page(
+        self,
+        from_path,
+        dest_path,
+        source_hash,
+        template_hash,
+        basepath,
+        template_path=None,
+        urls=(),
+    ):
+        """
+        Record the inputs of a page that has just been generated. With
+        template_path, the page's input files (source, template and the
+        static assets among urls) are added to the dependency graph.
+        """
+        self.seen.add(from_path)
+        stat = os.stat(from_path)
+        self.pages[from_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": source_hash,
+            "template_hash": template_hash,
+            "basepath": basepath,
+            "generator_version": GENERATOR_VERSION,
+            "output": dest_path,
+        }
+        if template_path is not None:
+            self.dependencies.record_page(dest_path, from_path, template_path, urls)
+
+    def invalidate_dependents(self, changed_inputs, exclude=()):
+        """
+        Mark every page built from one of changed_inputs as out of date, so
+        the next freshness check regenerates it.
+
+        Args:
+            changed_inputs (iterable): Changed input paths
+            exclude (iterable): Output paths already rebuilt from the
+                changed inputs, which stay fresh
+
+        Returns:
+            set: Output paths that were invalidated
+        """
+        affected = self.dependencies.affected_outputs(changed_inputs)
+        affected.difference_update(exclude)
+        for entry in self.pages.values():
+            if entry["output"] in affected:
+                entry["stale"] = True
+        return affected
+
+    def remove_stale_pages(self):
+        """
+        Delete outputs whose source markdown was not seen during this build
+        and drop them from the manifest.
+
+        Returns:
+            list: Output paths that were removed
+        """
+        return [
+            self.remove_page(from_path)
+            for from_path in list(self.pages)
+            if from_path not in self.seen
+        ]
+
+    def remove_page(self, from_path):
+        """
+        Delete the output of from_path and drop it from the manifest.
+
+        Returns:
+            str: The output path that was removed
+        """
+        output = self.pages.pop(from_path)["output"]
+        self.dependencies.remove_output(output)
+        if os.path.exists(output):
+            print(f"Removing stale page: {output}")
+            os.remove(output)
+        return output
+
+    def remove_untracked_outputs(self, output_dir, keep=()):
+        """
+        Delete every file in output_dir that is neither the output of a
+        recorded page nor a synced asset, along with the directories left
+        empty.
+
+        Without a loaded manifest (e.g. in a fresh clone, where .ssg-cache
+        is missing), remove_stale_pages and the orphan pruning of
+        sync_static do not know the outputs of sources removed since the
+        last build; calling this after the build drops them instead.
+
+        Args:
+            output_dir (str): Output directory
+            keep (iterable): Other paths to keep, relative to output_dir; the
+                ".gz" siblings of kept files (see precompress_output) are
+                kept as well
+
+        Returns:
+            list: Sorted paths, relative to output_dir, that were removed
+        """
+        kept = set(self.assets)
+        kept.update(
+            os.path.relpath(entry["output"], output_dir)
+            for entry in self.pages.values()
+        )
+        kept.update(keep)
+
+        removed = []
+        for root, dirs, files in os.walk(output_dir, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, output_dir)
+                if rel_path in kept or (
+                    rel_path.endswith(".gz") and rel_path[:-3] in kept
+                ):
+                    continue
+                print(f"Removing untracked output: {path}")
+                os.remove(path)
+                removed.append(rel_path)
+            if root != output_dir and not os.listdir(root):
+                os.rmdir(root)
+        return sorted(removed)
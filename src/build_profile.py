@@ -0,0 +1,95 @@
+import time
+
+STAGES = (
+    "fingerprint",
+    "image_sizes",
+    "copy_static",
+    "read",
+    "render_cache",
+    "parse",
+    "render",
+    "title",
+    "write",
+    "precompress",
+)
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "page", "start")
+
+    def __init__(self, profile, name, page):
+        self.profile = profile
+        self.name = name
+        self.page = page
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.record(self.name, time.perf_counter() - self.start, self.page)
+        return False
+
+
+class BuildProfile:
+    """
+    Wall-clock time of a build, aggregated per stage and per page.
+
+    Callers only create a BuildProfile when profiling was requested and pass
+    None otherwise, so a normal build pays a single "is None" check per page.
+    """
+
+    def __init__(self):
+        self.stage_totals = {}
+        self.page_totals = {}
+
+    def stage(self, name, page=None):
+        """
+        Time a block of code under the given stage name.
+
+        Args:
+            name (str): Stage name, see STAGES
+            page (str): Source path the time is attributed to, if any
+
+        Returns:
+            A context manager recording the elapsed time on exit
+        """
+        return _Stage(self, name, page)
+
+    def record(self, name, seconds, page=None):
+        self.stage_totals[name] = self.stage_totals.get(name, 0.0) + seconds
+        if page is not None:
+            self.page_totals[page] = self.page_totals.get(page, 0.0) + seconds
+
+    def slowest_pages(self, count=10):
+        """
+        Returns:
+            list: Up to count (source path, seconds) pairs, slowest first
+        """
+        pages = sorted(self.page_totals.items(), key=lambda item: (-item[1], item[0]))
+        return pages[:count]
+
+    def report(self, top=10):
+        """
+        Format the per-stage totals and the slowest pages as a text table.
+        """
+        total = sum(self.stage_totals.values())
+        names = [name for name in STAGES if name in self.stage_totals]
+        names += sorted(set(self.stage_totals) - set(STAGES))
+
+        lines = [
+            f"Build profile: {len(self.page_totals)} pages, {total:.4f}s in stages",
+            f"{'stage':<24}{'seconds':>10}{'share':>9}",
+        ]
+        for name in names:
+            seconds = self.stage_totals[name]
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"{name:<24}{seconds:>10.4f}{share:>8.1f}%")
+
+        slowest = self.slowest_pages(top)
+        if slowest:
+            lines.append(f"Slowest {len(slowest)} pages:")
+            for page, seconds in slowest:
+                lines.append(f"{seconds:>10.4f}s  {page}")
+
+        return "\n".join(lines)
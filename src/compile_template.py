@@ -0,0 +1,221 @@
+import re
+
+from build_manifest import hash_bytes
+from minify import HtmlMinifier
+from url_resolver import resolve_url, url_resolver
+
+TITLE_SLOT = "{{ Title }}"
+CONTENT_SLOT = "{{ Content }}"
+
+_SLOT_PATTERN = re.compile(r"(\{\{ Title \}\}|\{\{ Content \}\})")
+_URL_ATTRIBUTE = re.compile(r'\b(href|src)="([^"<>]*)"')
+
+
+def rewrite_basepath(html, basepath):
+    """
+    Point root-relative href/src attribute values at basepath, using the
+    same rules as rendered links and images (see resolve_url).
+    """
+    if basepath == "/":
+        return html
+    return rewrite_urls(html, lambda url: resolve_url(url, basepath))
+
+
+def rewrite_urls(html, resolve):
+    """
+    Replace every href/src attribute value in html with resolve(value).
+    """
+    return _URL_ATTRIBUTE.sub(
+        lambda match: f'{match.group(1)}="{resolve(match.group(2))}"', html
+    )
+
+
+class CompiledTemplate:
+    """
+    A page template split into static segments and slots.
+
+    The template is parsed and its static segments get the basepath rewrite
+    exactly once; rendering a page is then a single join of those segments
+    with the slot values.
+
+    Pages filled into the template resolve their URLs with resolve_url,
+    which applies the same basepath and asset map (see url_resolver), and
+    give their images the sizes in image_sizes (see PageImages). With
+    minify, write_page and render_page minify the pages they write.
+    """
+
+    def __init__(
+        self,
+        segments,
+        slots,
+        basepath="/",
+        source_hash=None,
+        assets=None,
+        minify=False,
+        image_sizes=None,
+    ):
+        # segments has one more entry than slots: s0 slot0 s1 slot1 ... sN
+        self.segments = segments
+        self.slots = slots
+        self.basepath = basepath
+        self.source_hash = source_hash
+        self.assets = assets
+        self.minify = minify
+        self.image_sizes = image_sizes
+        self.resolve_url = url_resolver(basepath, assets)
+        self._encoded_segments = [segment.encode("utf-8") for segment in segments]
+
+    def _values(self, title, content):
+        return {TITLE_SLOT: title, CONTENT_SLOT: content}
+
+    def render(self, title, content):
+        """
+        Fill the template slots.
+
+        Returns:
+            str: The complete page
+        """
+        values = self._values(title, content)
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(values[slot])
+            parts.append(segment)
+        return "".join(parts)
+
+    def stream(self, write, title, write_content):
+        """
+        Write the page fragment by fragment.
+
+        Args:
+            write (callable): Receives each str fragment, e.g. a file's write
+            title (str): Value of the title slot
+            write_content (callable): Called with write at each content slot
+                to emit the page content
+        """
+        write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            if slot == CONTENT_SLOT:
+                write_content(write)
+            else:
+                write(title)
+            write(segment)
+
+    def render_bytes(self, title, content):
+        """
+        Fill the template slots, returning UTF-8 encoded bytes. Static
+        segments are encoded once at compile time, and each slot value is
+        encoded once even if the slot appears several times.
+        """
+        values = {
+            slot: value.encode("utf-8")
+            for slot, value in self._values(title, content).items()
+        }
+        parts = [self._encoded_segments[0]]
+        for slot, segment in zip(self.slots, self._encoded_segments[1:]):
+            parts.append(values[slot])
+            parts.append(segment)
+        return b"".join(parts)
+
+    def write_page(self, write, title, parts):
+        """
+        Write the page filled with the title and the content fragments in
+        parts to write, fragment by fragment like stream, so it is never
+        joined in memory. With minify, the fragments stream through an
+        HtmlMinifier on their way out.
+        """
+
+        def write_content(write):
+            for part in parts:
+                write(part)
+
+        if not self.minify:
+            self.stream(write, title, write_content)
+            return
+        minifier = HtmlMinifier(write)
+        self.stream(minifier.feed, title, write_content)
+        minifier.close()
+
+    def render_page(self, title, parts):
+        """
+        Like write_page, returning the page as UTF-8 encoded bytes.
+        """
+        page = []
+        self.write_page(page.append, title, parts)
+        return "".join(page).encode("utf-8")
+
+
+def compile_template(
+    template_content,
+    basepath="/",
+    source_hash=None,
+    assets=None,
+    minify=False,
+    image_sizes=None,
+):
+    """
+    Compile template text into a CompiledTemplate.
+
+    Args:
+        template_content (str): The template HTML
+        basepath (str): Base path applied to href/src attributes of the template
+        source_hash (str): Optional hash identifying the template source
+        assets (AssetMap): Optional fingerprinted names of static files,
+            applied to href/src attributes of the template and of the pages
+        minify (bool): Minify rendered pages, see write_page
+        image_sizes (ImageSizes): Optional sizes of static images, applied
+            to the images of the pages
+
+    Returns:
+        CompiledTemplate: The compiled template. With assets, its
+        source_hash also covers the fingerprinted URLs the template uses, so
+        pages are regenerated when one of them changes, or when
+        fingerprinting is turned on or off; likewise, minify and image_sizes
+        change it. Pages showing an image whose size changed are not
+        covered; see DependencyGraph.
+    """
+    pieces = _SLOT_PATTERN.split(template_content)
+    if assets is None:
+        segments = [rewrite_basepath(piece, basepath) for piece in pieces[0::2]]
+    else:
+        resolve = url_resolver(basepath, assets)
+        segments = [rewrite_urls(piece, resolve) for piece in pieces[0::2]]
+        if source_hash is not None:
+            urls = [url for _, url in _URL_ATTRIBUTE.findall("".join(segments))]
+            parts = ["assets", source_hash, *urls]
+            source_hash = hash_bytes("\0".join(parts).encode("utf-8"))
+    if minify and source_hash is not None:
+        source_hash = hash_bytes(f"minify\0{source_hash}".encode("utf-8"))
+    if image_sizes is not None and source_hash is not None:
+        source_hash = hash_bytes(f"images\0{source_hash}".encode("utf-8"))
+    slots = pieces[1::2]
+    return CompiledTemplate(
+        segments, slots, basepath, source_hash, assets, minify, image_sizes
+    )
+
+
+def load_template(
+    template_path, basepath="/", assets=None, minify=False, image_sizes=None
+):
+    """
+    Read and compile a template file.
+
+    Args:
+        template_path (str): Path to the HTML template file
+        basepath (str): Base path applied to href/src attributes of the template
+        assets (AssetMap): Optional fingerprinted names of static files, see
+            compile_template
+        minify (bool): Minify rendered pages
+        image_sizes (ImageSizes): Optional sizes of static images
+
+    Returns:
+        CompiledTemplate: The compiled template, with source_hash set to the
+        hash of the file contents (and the fingerprinted URLs it uses)
+    """
+    with open(template_path, "rb") as f:
+        data = f.read()
+    text = data.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return compile_template(
+        text, basepath, hash_bytes(data), assets, minify, image_sizes
+    )
@@ -0,0 +1,104 @@
+import os
+
+
+class DependencyGraph:
+    """
+    Maps every generated output file to the input files it was built from:
+    its markdown source, the template and the static assets it references
+    through links and images.
+
+    A reverse index answers "what depends on this input?", so a change to
+    one shared input only invalidates the outputs that actually use it.
+    """
+
+    def __init__(self, outputs=None, static_dir="static"):
+        # output path -> sorted list of input paths
+        self.outputs = outputs if outputs is not None else {}
+        self.static_dir = static_dir
+        self._dependents = {}
+        for output, inputs in self.outputs.items():
+            for input_path in inputs:
+                self._dependents.setdefault(input_path, set()).add(output)
+
+    def asset_path(self, url):
+        """
+        Resolve a root-relative URL to the static file it points at. The
+        file need not exist yet: a page referencing an asset that is added
+        later must be regenerated when it appears. A missing path counts as
+        an asset only if its name has an extension, which tells it apart
+        from links to pages ("/blog/tom").
+
+        Returns:
+            str | None: Path of the file below static_dir, or None if the URL
+            is external, relative, names a static directory or a page
+        """
+        if not url.startswith("/") or url.startswith("//"):
+            return None
+        rel_path = url.split("#", 1)[0].split("?", 1)[0].strip("/")
+        if not rel_path:
+            return None
+        path = os.path.join(self.static_dir, *rel_path.split("/"))
+        if os.path.isfile(path):
+            return path
+        if os.path.isdir(path) or not os.path.splitext(path)[1]:
+            return None
+        return path
+
+    def set_inputs(self, output, inputs):
+        """
+        Replace the recorded inputs of output.
+        """
+        self.remove_output(output)
+        inputs = sorted(set(inputs))
+        self.outputs[output] = inputs
+        for input_path in inputs:
+            self._dependents.setdefault(input_path, set()).add(output)
+
+    def record_page(self, output, source_path, template_path, urls=()):
+        """
+        Record the inputs of a generated page: its source, its template and
+        every static asset among the URLs it references, whether or not it
+        exists yet.
+        """
+        inputs = [source_path, template_path]
+        for url in urls:
+            asset = self.asset_path(url)
+            if asset is not None:
+                inputs.append(asset)
+        self.set_inputs(output, inputs)
+
+    def remove_output(self, output):
+        for input_path in self.outputs.pop(output, ()):
+            dependents = self._dependents[input_path]
+            dependents.discard(output)
+            if not dependents:
+                del self._dependents[input_path]
+
+    def inputs(self, output):
+        """
+        Returns:
+            list: Input paths output was built from
+        """
+        return list(self.outputs.get(output, ()))
+
+    def dependents(self, input_path):
+        """
+        Returns:
+            list: Sorted output paths built from input_path
+        """
+        return sorted(self._dependents.get(input_path, ()))
+
+    def affected_outputs(self, changed_inputs):
+        """
+        Compute the outputs that must be regenerated after changed_inputs.
+
+        Args:
+            changed_inputs (iterable): Changed input paths
+
+        Returns:
+            set: Every output depending on at least one changed input
+        """
+        affected = set()
+        for input_path in changed_inputs:
+            affected.update(self._dependents.get(input_path, ()))
+        return affected
@@ -0,0 +1,196 @@
+import os
+import shutil
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from build_manifest import hash_bytes, hash_file
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# ioctl(2) request cloning a whole file on copy-on-write filesystems
+# (btrfs, XFS with reflink, bcachefs)
+_FICLONE = 0x40049409
+
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+COPY_FILE_RANGE = "copy_file_range"
+COPY = "copy"
+
+
+def _copy_data(src, dst):
+    """
+    Copy file contents using the cheapest primitive that works for this pair
+    of files, returning its name.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        src_fd = fsrc.fileno()
+        dst_fd = fdst.fileno()
+
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                return REFLINK
+            except OSError:
+                pass
+
+        if hasattr(os, "copy_file_range"):
+            remaining = os.fstat(src_fd).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return COPY_FILE_RANGE
+            except OSError:
+                # e.g. EXDEV on older kernels; start over with shutil
+                pass
+
+    shutil.copyfile(src, dst)
+    return COPY
+
+
+def copy_file(src, dst, link=False):
+    """
+    Copy src to dst, preserving permissions and timestamps like shutil.copy2.
+
+    The data is copied with the cheapest primitive available: a hard link
+    if link=True and both paths are on the same filesystem, a reflink on
+    copy-on-write filesystems, os.copy_file_range on Linux, and shutil
+    otherwise. The copy is written to a temporary file and renamed over
+    dst, so an existing dst is replaced atomically and never written
+    through (it may itself be a hard link).
+
+    Returns:
+        str: The primitive used: "hardlink", "reflink", "copy_file_range"
+        or "copy"
+    """
+    tmp = os.path.join(
+        os.path.dirname(dst),
+        f".{os.path.basename(dst)}.{os.getpid()}.{threading.get_ident()}.tmp",
+    )
+    try:
+        if link:
+            try:
+                os.link(src, tmp)
+                os.replace(tmp, dst)
+                return HARDLINK
+            except OSError:
+                # Different filesystem or links not supported; copy instead
+                pass
+
+        method = _copy_data(src, tmp)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+        return method
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _head_hash(path, size=64 * 1024):
+    with open(path, "rb") as f:
+        return hash_bytes(f.read(size))
+
+
+def find_duplicates(paths):
+    """
+    Group files with identical contents. Candidates are narrowed down by
+    size, then by a hash of their first 64 KiB, and only files still
+    colliding after that are hashed in full, so unique files are read
+    little or not at all.
+
+    Returns:
+        dict: Path of every duplicate -> path of the first file (in the
+        order given) with the same contents
+    """
+    candidates = [paths]
+    for key in (os.path.getsize, _head_hash, hash_file):
+        narrowed = []
+        for group in candidates:
+            by_key = {}
+            for path in group:
+                by_key.setdefault(key(path), []).append(path)
+            narrowed.extend(same for same in by_key.values() if len(same) > 1)
+        candidates = narrowed
+
+    duplicates = {}
+    for same in candidates:
+        for path in same[1:]:
+            duplicates[path] = same[0]
+    return duplicates
+
+
+def _run_bounded(executor, jobs, tasks):
+    """
+    Run (func, *args) tasks with at most two per worker in flight and
+    collect their results in completion order.
+    """
+    results = []
+    pending = set()
+    for func, *args in tasks:
+        if len(pending) >= jobs * 2:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            results.extend(future.result() for future in done)
+        pending.add(executor.submit(func, *args))
+    done, _ = wait(pending)
+    results.extend(future.result() for future in done)
+    return results
+
+
+def copy_files(pairs, jobs=None, link=False, dedupe=False):
+    """
+    Copy many files concurrently with copy_file.
+
+    With dedupe=True, sources with identical contents are copied once: the
+    first is copied from its source and the others are cloned from that
+    first output (keeping their own timestamps and permissions), so on
+    reflink-capable filesystems they share storage. Finding them means
+    hashing every source whose size matches another one, which costs more
+    than it saves on filesystems without reflinks.
+
+    Args:
+        pairs (list): (source path, destination path) pairs; destination
+            directories must exist
+        jobs (int): Number of copy threads (default: CPUs + 4, at most 32,
+            like ThreadPoolExecutor)
+        link (bool): Hard link sources instead of copying where possible
+        dedupe (bool): Deduplicate identical sources by content hash
+
+    Returns:
+        dict: Number of files copied with each primitive, plus "deduplicated"
+        for files cloned from an identical output
+    """
+    pairs = list(pairs)
+    duplicates = {}
+    if dedupe and not link and len(pairs) > 1:
+        duplicates = find_duplicates([src for src, _ in pairs])
+
+    dest_of = {src: dst for src, dst in pairs}
+    first_wave = [(src, dst) for src, dst in pairs if src not in duplicates]
+    second_wave = [
+        (dest_of[duplicates[src]], src, dst) for src, dst in pairs if src in duplicates
+    ]
+
+    def clone(copied_dst, src, dst):
+        copy_file(copied_dst, dst)
+        shutil.copystat(src, dst)
+        return "deduplicated"
+
+    jobs = jobs or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        methods = _run_bounded(
+            executor, jobs, [(copy_file, src, dst, link) for src, dst in first_wave]
+        )
+        # Duplicates are cloned once their first copy exists
+        clones = [(clone, *task) for task in second_wave]
+        methods += _run_bounded(executor, jobs, clones)
+
+    counts = {}
+    for method in methods:
+        counts[method] = counts.get(method, 0) + 1
+    return counts
@@ -1,56 +1,320 @@
+import multiprocessing
 import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import partial
+from itertools import islice
 
+from asset_fingerprint import AssetMap
+from build_manifest import hash_bytes
+from compile_template import load_template
 from extract_title import extract_title
-from markdown_to_html_node import markdown_to_html_node
+from image_size import ImageSizes
+from inline_cache import InlineCache
+from markdown_to_html import write_markdown_html
+from output_changes import stream_if_changed
+from page_result import PageResult
+from render_cache import RenderCache
+from scan_blocks import scan_blocks
+from write_behind import WriteBehind
 
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def read_markdown(from_path):
     """
-    Generate a page from markdown content using a template.
+    Read a markdown source file.
 
-    Args:
-        from_path (str): Path to the markdown file
-        template_path (str): Path to the HTML template file
-        dest_path (str): Path where the generated HTML should be written
-        basepath (str): Base path for URLs (default: "/")
+    Returns:
+        tuple: The decoded text (with newlines normalized like text mode
+        reading does) and the hash of the raw file bytes
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    with open(from_path, "rb") as f:
+        data = f.read()
 
-    # Read the markdown file
-    with open(from_path, "r", encoding="utf-8") as f:
-        markdown_content = f.read()
+    text = data.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
 
-    # Read the template file
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
+    return text, hash_bytes(data)
 
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
 
-    # Extract the title
-    title = extract_title(markdown_content)
+def _page_title(page, markdown):
+    """
+    The page title: the first level 1 heading block found while parsing, or,
+    if no heading block has level 1, extract_title's line-based rules (which
+    also raise the missing-title error).
+
+    Only heading blocks count, so "# " lines inside code blocks and
+    paragraphs and bare "#" lines before the first heading are skipped,
+    and a "#x text" heading block is titled "text".
+    """
+    if page.title is not None:
+        return page.title
+    return extract_title(markdown)
+
+
+def _render_content(
+    markdown_content,
+    source_hash,
+    template,
+    inline_cache=None,
+    render_cache=None,
+    defer=None,
+):
+    """
+    Render the content of a page, or fetch it from the render cache. URLs
+    are resolved like the template's (see CompiledTemplate). New cache
+    entries are stored through defer(func, *args) if given, e.g.
+    WriteBehind.call, and right away otherwise.
+
+    Returns:
+        tuple: The content HTML as a list of fragments, the PageResult of
+        the page and its title
+    """
+    cached = None
+    if render_cache is not None:
+        cache_key = render_cache.key(
+            source_hash, template.basepath, template.assets, template.image_sizes
+        )
+        cached = render_cache.get(cache_key)
+
+    if cached is not None:
+        html_content, page = cached
+        parts = [html_content]
+    else:
+        # Render the content once, collecting the title and the link and
+        # image URLs in the same pass. Link and image URLs are resolved as
+        # they are rendered, and the template's own URLs at compile time, so
+        # the page is never rescanned. The template needs the title before
+        # the content, so the fragments are kept until the page is written.
+        page = PageResult()
+        parts = []
+        write_markdown_html(
+            markdown_content,
+            parts.append,
+            page,
+            template.resolve_url,
+            inline_cache,
+            template.image_sizes,
+        )
+        if render_cache is not None:
+            parts = ["".join(parts)]
+            if defer is None:
+                render_cache.put(cache_key, parts[0], page)
+            else:
+                defer(render_cache.put, cache_key, parts[0], page)
 
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
+    return parts, page, _page_title(page, markdown_content)
 
-    # Replace absolute URLs with basepath
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
+
+def _write_page(from_path, dest_path, template, inline_cache=None, render_cache=None):
+    """
+    Render a page and write it to dest_path, unless the file already holds
+    the same HTML.
+
+    Returns:
+        tuple: Hash of the markdown source, the PageResult of the page and
+        the write status (see stream_if_changed)
+    """
+    # Read the markdown file
+    markdown_content, source_hash = read_markdown(from_path)
+
+    parts, page, title = _render_content(
+        markdown_content, source_hash, template, inline_cache, render_cache
+    )
 
     # Create destination directory if it doesn't exist
     dest_dir = os.path.dirname(dest_path)
     if dest_dir:
         os.makedirs(dest_dir, exist_ok=True)
 
-    # Write the final HTML to file
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(final_html)
+    # The page streams into the file; it is never joined in memory
+    status = stream_if_changed(
+        dest_path, partial(template.write_page, title=title, parts=parts)
+    )
+
+    return source_hash, page, status
+
+
+def _write_page_profiled(
+    from_path,
+    dest_path,
+    template,
+    profile,
+    inline_cache=None,
+    render_cache=None,
+):
+    """
+    Render a page stage by stage, timing each stage. The page goes through
+    the same write_markdown_html fast path as generate_page's, and the output
+    is identical; its blocks are scanned up front so that block parsing and
+    rendering (inline parsing and HTML generation) show up as separate
+    stages.
+
+    Returns:
+        tuple: Hash of the markdown source, the PageResult of the page and
+        the write status (see stream_if_changed)
+    """
+    with profile.stage("read", from_path):
+        markdown_content, source_hash = read_markdown(from_path)
+
+    cached = None
+    if render_cache is not None:
+        with profile.stage("render_cache", from_path):
+            cache_key = render_cache.key(
+                source_hash,
+                template.basepath,
+                template.assets,
+                template.image_sizes,
+            )
+            cached = render_cache.get(cache_key)
+
+    if cached is not None:
+        html_content, page = cached
+        parts = [html_content]
+    else:
+        with profile.stage("parse", from_path):
+            blocks = list(scan_blocks(markdown_content))
+
+        page = PageResult()
+        parts = []
+        with profile.stage("render", from_path):
+            write_markdown_html(
+                markdown_content,
+                parts.append,
+                page,
+                template.resolve_url,
+                inline_cache,
+                template.image_sizes,
+                blocks,
+            )
+
+        if render_cache is not None:
+            with profile.stage("render_cache", from_path):
+                parts = ["".join(parts)]
+                render_cache.put(cache_key, parts[0], page)
+
+    # Includes the extract_title fallback for pages without an H1 block
+    with profile.stage("title", from_path):
+        title = _page_title(page, markdown_content)
+
+    # The template is filled while the page streams into the file
+    with profile.stage("write", from_path):
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        status = stream_if_changed(
+            dest_path, partial(template.write_page, title=title, parts=parts)
+        )
+
+    return source_hash, page, status
+
+
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    basepath="/",
+    manifest=None,
+    template=None,
+    profile=None,
+    inline_cache=None,
+    render_cache=None,
+    changes=None,
+    assets=None,
+    minify=False,
+    image_sizes=None,
+):
+    """
+    Generate a page from markdown content using a template. An output file
+    that already holds the generated HTML is left untouched.
+
+    Args:
+        from_path (str): Path to the markdown file
+        template_path (str): Path to the HTML template file
+        dest_path (str): Path where the generated HTML should be written
+        basepath (str): Base path for URLs (default: "/")
+        manifest (BuildManifest): Optional build manifest; when given, the
+            page is skipped if none of its inputs changed since the last build
+        template (CompiledTemplate): Optional template already compiled from
+            template_path for this basepath, assets and image sizes, so it is
+            not re-read per page
+        profile (BuildProfile): Optional profile receiving per-stage timings
+        inline_cache (InlineCache): Optional cache of rendered inline
+            fragments shared by all pages
+        render_cache (RenderCache): Optional on-disk cache of rendered
+            content, looked up before the markdown is parsed
+        changes (OutputChanges): Optional record of added and changed
+            output files
+        assets (AssetMap): Optional fingerprinted names of static files,
+            applied to the URLs of the pages and the template
+        minify (bool): Minify the pages' HTML as they are written
+        image_sizes (ImageSizes): Optional sizes of static images, applied
+            to the images of the pages
+
+    Returns:
+        str | None: Hash of the rendered markdown source, or None if the page
+        was up to date and skipped
+    """
+    if template is None:
+        template = load_template(template_path, basepath, assets, minify, image_sizes)
+
+    if manifest is not None and manifest.is_page_fresh(
+        from_path, dest_path, template.source_hash, basepath
+    ):
+        return None
+
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+
+    if profile is None:
+        source_hash, page, status = _write_page(
+            from_path, dest_path, template, inline_cache, render_cache
+        )
+    else:
+        source_hash, page, status = _write_page_profiled(
+            from_path,
+            dest_path,
+            template,
+            profile,
+            inline_cache,
+            render_cache,
+        )
+
+    if changes is not None:
+        changes.record(dest_path, status)
+
+    if manifest is not None:
+        manifest.record_page(
+            from_path,
+            dest_path,
+            source_hash,
+            template.source_hash,
+            basepath,
+            template_path,
+            page.urls,
+        )
+
+    return source_hash
 
 
 def generate_pages_recursive(
-    dir_path_content, template_path, dest_dir_path, basepath="/"
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath="/",
+    manifest=None,
+    template=None,
+    profile=None,
+    inline_cache=None,
+    render_cache=None,
+    changes=None,
+    assets=None,
+    minify=False,
+    image_sizes=None,
 ):
     """
     Recursively generate pages from all markdown files in a directory tree.
@@ -60,7 +324,26 @@ def generate_pages_recursive(
         template_path (str): Path to the HTML template file
         dest_dir_path (str): Path to the destination directory for generated HTML files
         basepath (str): Base path for URLs (default: "/")
+        manifest (BuildManifest): Optional build manifest used to skip pages
+            whose inputs are unchanged
+        template (CompiledTemplate): Optional precompiled template; compiled
+            once here and shared by all pages otherwise
+        profile (BuildProfile): Optional profile receiving per-stage timings
+        inline_cache (InlineCache): Optional cache of rendered inline
+            fragments shared by all pages
+        render_cache (RenderCache): Optional on-disk cache of rendered
+            content
+        changes (OutputChanges): Optional record of added and changed
+            output files
+        assets (AssetMap): Optional fingerprinted names of static files,
+            applied to the URLs of the pages and the template
+        minify (bool): Minify the pages' HTML as they are written
+        image_sizes (ImageSizes): Optional sizes of static images, applied
+            to the images of the pages
     """
+    if template is None:
+        template = load_template(template_path, basepath, assets, minify, image_sizes)
+
     # Get all items in the content directory
     for item in os.listdir(dir_path_content):
         item_path = os.path.join(dir_path_content, item)
@@ -75,7 +358,21 @@ def generate_pages_recursive(
                 dest_file_path = os.path.join(dest_dir_path, html_filename)
 
                 # Generate the page
-                generate_page(item_path, template_path, dest_file_path, basepath)
+                generate_page(
+                    item_path,
+                    template_path,
+                    dest_file_path,
+                    basepath,
+                    manifest,
+                    template,
+                    profile,
+                    inline_cache,
+                    render_cache,
+                    changes,
+                    assets,
+                    minify,
+                    image_sizes,
+                )
 
         elif os.path.isdir(item_path):
             # It's a directory - recursively process it
@@ -84,4 +381,356 @@ def generate_pages_recursive(
             dest_subdir = os.path.join(dest_dir_path, relative_dir)
 
             # Recursively process the subdirectory
-            generate_pages_recursive(item_path, template_path, dest_subdir, basepath)
+            generate_pages_recursive(
+                item_path,
+                template_path,
+                dest_subdir,
+                basepath,
+                manifest,
+                template,
+                profile,
+                inline_cache,
+                render_cache,
+                changes,
+                assets,
+                minify,
+                image_sizes,
+            )
+
+
+def find_markdown_pages(dir_path_content, dest_dir_path):
+    """
+    Find all markdown files in a directory tree.
+
+    Args:
+        dir_path_content (str): Path to the content directory containing markdown files
+        dest_dir_path (str): Path to the destination directory for generated HTML files
+
+    Returns:
+        list: (markdown path, HTML path) pairs, in the same order as
+        generate_pages_recursive visits them
+    """
+    pages = []
+    for item in os.listdir(dir_path_content):
+        item_path = os.path.join(dir_path_content, item)
+
+        if os.path.isfile(item_path):
+            if item_path.endswith(".md"):
+                html_filename = item.replace(".md", ".html")
+                pages.append((item_path, os.path.join(dest_dir_path, html_filename)))
+
+        elif os.path.isdir(item_path):
+            dest_subdir = os.path.join(dest_dir_path, item)
+            pages.extend(find_markdown_pages(item_path, dest_subdir))
+
+    return pages
+
+
+_worker_template = None
+_worker_inline_cache = None
+_worker_render_cache = None
+
+
+def _init_worker(
+    template_path,
+    basepath,
+    inline_cache_size=None,
+    render_cache_args=None,
+    asset_names=None,
+    minify=False,
+    sizes=None,
+):
+    global _worker_template, _worker_inline_cache, _worker_render_cache
+    assets = AssetMap(asset_names) if asset_names is not None else None
+    image_sizes = ImageSizes(sizes) if sizes is not None else None
+    _worker_template = load_template(
+        template_path, basepath, assets, minify, image_sizes
+    )
+    if inline_cache_size:
+        _worker_inline_cache = InlineCache(inline_cache_size)
+    if render_cache_args is not None:
+        _worker_render_cache = RenderCache(*render_cache_args)
+
+
+def _worker_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _generate_page_in_worker(from_path, template_path, dest_path, basepath):
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    inline_cache = _worker_inline_cache
+    render_cache = _worker_render_cache
+    inline_before = inline_cache.counters() if inline_cache is not None else None
+    render_hits = render_cache.hits if render_cache is not None else 0
+
+    source_hash, page, status = _write_page(
+        from_path, dest_path, _worker_template, inline_cache, render_cache
+    )
+
+    # Only the URLs and this page's cache statistics go back to the parent
+    counters = None
+    if inline_cache is not None:
+        counters = tuple(
+            now - then for now, then in zip(inline_cache.counters(), inline_before)
+        )
+    render_hit = None
+    if render_cache is not None:
+        render_hit = render_cache.hits > render_hits
+    return source_hash, page.urls, counters, render_hit, status
+
+
+def generate_pages_parallel(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath="/",
+    manifest=None,
+    jobs=None,
+    inline_cache=None,
+    render_cache=None,
+    changes=None,
+    assets=None,
+    minify=False,
+    image_sizes=None,
+):
+    """
+    Generate pages from all markdown files in a directory tree using a
+    process pool.
+
+    All markdown files are discovered first; workers then receive only
+    paths and write their page themselves; each worker compiles the template
+    once when it starts. At most two pages per worker are
+    in flight at any time, so memory use does not grow with the site size.
+    The output is identical to generate_pages_recursive.
+
+    Workers are started with forkserver (spawn where it is unavailable),
+    never by forking this process: the build runs other threads meanwhile,
+    such as the static copy, and a forked child could inherit their locks
+    held.
+
+    Args:
+        dir_path_content (str): Path to the content directory containing markdown files
+        template_path (str): Path to the HTML template file
+        dest_dir_path (str): Path to the destination directory for generated HTML files
+        basepath (str): Base path for URLs (default: "/")
+        manifest (BuildManifest): Optional build manifest used to skip pages
+            whose inputs are unchanged
+        jobs (int): Number of worker processes (default: number of CPUs)
+        inline_cache (InlineCache): Optional inline cache; every worker
+            renders with its own cache of the same size, and their counters
+            are added to this one
+        render_cache (RenderCache): Optional on-disk render cache, shared by
+            the workers; their hits and misses are counted on this one
+        changes (OutputChanges): Optional record of added and changed
+            output files
+        assets (AssetMap): Optional fingerprinted names of static files,
+            applied to the URLs of the pages and the template
+        minify (bool): Minify the pages' HTML as they are written
+        image_sizes (ImageSizes): Optional sizes of static images, applied
+            to the images of the pages
+
+    Returns:
+        list: Output paths of the pages rendered (not skipped as fresh)
+
+    Raises:
+        RuntimeError: If a page fails to render, naming its source file
+    """
+    pages = find_markdown_pages(dir_path_content, dest_dir_path)
+    template_hash = load_template(
+        template_path, basepath, assets, minify, image_sizes
+    ).source_hash
+
+    if manifest is not None:
+        pages = [
+            (from_path, dest_path)
+            for from_path, dest_path in pages
+            if not manifest.is_page_fresh(from_path, dest_path, template_hash, basepath)
+        ]
+
+    jobs = jobs or os.cpu_count() or 1
+    max_in_flight = jobs * 2
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            from_path, dest_path = pending.pop(future)
+            try:
+                source_hash, urls, counters, render_hit, status = future.result()
+            except Exception as e:
+                raise RuntimeError(
+                    f"Failed to generate page from {from_path}: {e}"
+                ) from e
+            if counters is not None:
+                inline_cache.add_counters(counters)
+            if render_hit is not None:
+                render_cache.record(render_hit)
+            if changes is not None:
+                changes.record(dest_path, status)
+            if manifest is not None:
+                manifest.record_page(
+                    from_path,
+                    dest_path,
+                    source_hash,
+                    template_hash,
+                    basepath,
+                    template_path,
+                    urls,
+                )
+
+    executor = ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=_worker_context(),
+        initializer=_init_worker,
+        initargs=(
+            template_path,
+            basepath,
+            inline_cache.maxsize if inline_cache is not None else None,
+            (
+                (render_cache.directory, render_cache.max_bytes)
+                if render_cache is not None
+                else None
+            ),
+            assets.names if assets is not None else None,
+            minify,
+            image_sizes.sizes if image_sizes is not None else None,
+        ),
+    )
+    try:
+        for from_path, dest_path in pages:
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            future = executor.submit(
+                _generate_page_in_worker,
+                from_path,
+                template_path,
+                dest_path,
+                basepath,
+            )
+            pending[future] = (from_path, dest_path)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    return [dest_path for _, dest_path in pages]
+
+
+def _prefetch(executor, func, items, window):
+    """
+    Yield func(item) for every item, in order, with up to window calls
+    running ahead in the executor.
+    """
+    items = iter(items)
+    pending = deque(executor.submit(func, item) for item in islice(items, window))
+    while pending:
+        future = pending.popleft()
+        for item in islice(items, 1):
+            pending.append(executor.submit(func, item))
+        yield future.result()
+
+
+def generate_pages_pipelined(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath="/",
+    manifest=None,
+    template=None,
+    io_threads=4,
+    inline_cache=None,
+    render_cache=None,
+    changes=None,
+    assets=None,
+    minify=False,
+    image_sizes=None,
+):
+    """
+    Generate pages from all markdown files in a directory tree, overlapping
+    file I/O with rendering.
+
+    Reader threads prefetch the markdown sources a few pages ahead, pages
+    are rendered in this thread, and finished pages are handed to
+    write-behind threads through a bounded queue (see WriteBehind), so
+    rendering never waits on a slow read, write or directory creation.
+    Pages are rendered in the same order as generate_pages_recursive, and
+    the output is identical.
+
+    Args:
+        dir_path_content (str): Path to the content directory containing markdown files
+        template_path (str): Path to the HTML template file
+        dest_dir_path (str): Path to the destination directory for generated HTML files
+        basepath (str): Base path for URLs (default: "/")
+        manifest (BuildManifest): Optional build manifest used to skip pages
+            whose inputs are unchanged
+        template (CompiledTemplate): Optional precompiled template
+        io_threads (int): Number of reader threads, and of writer threads
+        inline_cache (InlineCache): Optional cache of rendered inline
+            fragments shared by all pages
+        render_cache (RenderCache): Optional on-disk cache of rendered
+            content
+        changes (OutputChanges): Optional record of added and changed
+            output files
+        assets (AssetMap): Optional fingerprinted names of static files,
+            applied to the URLs of the pages and the template
+        minify (bool): Minify the pages' HTML as they are written
+        image_sizes (ImageSizes): Optional sizes of static images, applied
+            to the images of the pages
+
+    Returns:
+        list: Output paths of the pages rendered (not skipped as fresh)
+
+    Raises:
+        RuntimeError: If an output file cannot be written, naming its path
+    """
+    if template is None:
+        template = load_template(template_path, basepath, assets, minify, image_sizes)
+
+    pages = find_markdown_pages(dir_path_content, dest_dir_path)
+    if manifest is not None:
+        pages = [
+            (from_path, dest_path)
+            for from_path, dest_path in pages
+            if not manifest.is_page_fresh(
+                from_path, dest_path, template.source_hash, basepath
+            )
+        ]
+
+    from_paths = [from_path for from_path, _ in pages]
+    readers = ThreadPoolExecutor(io_threads)
+    with readers, WriteBehind(io_threads, io_threads * 4, changes) as writer:
+        sources = _prefetch(readers, read_markdown, from_paths, io_threads * 2)
+        for (from_path, dest_path), source in zip(pages, sources):
+            markdown_content, source_hash = source
+            print(
+                f"Generating page from {from_path} to {dest_path} using {template_path}"
+            )
+            parts, page, title = _render_content(
+                markdown_content,
+                source_hash,
+                template,
+                inline_cache,
+                render_cache,
+                writer.call,
+            )
+            writer.stream(
+                dest_path, partial(template.write_page, title=title, parts=parts)
+            )
+
+            if manifest is not None:
+                manifest.record_page(
+                    from_path,
+                    dest_path,
+                    source_hash,
+                    template.source_hash,
+                    basepath,
+                    template_path,
+                    page.urls,
+                )
+
+    return [dest_path for _, dest_path in pages]
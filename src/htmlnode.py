@@ -1,17 +1,41 @@
+import sys
+
+
 class HTMLNode:
+    # Nodes are allocated per inline span, so keep them dict-free
+    __slots__ = ("tag", "value", "children", "_props", "_props_html")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if tag is not None else None
         self.value = value
         self.children = children
         self.props = props
 
+    @property
+    def props(self):
+        return self._props
+
+    @props.setter
+    def props(self, props):
+        self._props = props
+        self._props_html = None
+
     def to_html(self):
         raise NotImplementedError()
 
+    def render(self, write):
+        write(self.to_html())
+
     def props_to_html(self):
-        if not self.props:
-            return ""
-        return "".join([f' {key}="{value}"' for key, value in self.props.items()])
+        # Rendered once and cached; assigning node.props resets the cache
+        if self._props_html is None:
+            if not self._props:
+                self._props_html = ""
+            else:
+                self._props_html = "".join(
+                    [f' {key}="{value}"' for key, value in self._props.items()]
+                )
+        return self._props_html
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
@@ -0,0 +1,207 @@
+import json
+import os
+import struct
+
+from build_manifest import hash_bytes, hash_file
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Start of frame markers: baseline, progressive, lossless and arithmetic
+# coded variants. 0xC4 (Huffman tables), 0xC8 (reserved) and 0xCC
+# (arithmetic conditioning) share the range but carry no frame size.
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Markers that stand alone, without a length: TEM, RST0-7, SOI and EOI
+_JPEG_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xDA)})
+
+IMAGE_SIZE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg"})
+
+# Attributes of every image after the first one on a page, which is most
+# likely in view when the page loads
+LAZY_ATTRIBUTES = {"loading": "lazy", "decoding": "async"}
+
+
+def _png_size(f):
+    header = f.read(24)
+    if len(header) < 24 or header[:8] != _PNG_SIGNATURE or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _jpeg_size(f):
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            # Entropy coded data or padding between segments
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker == 0 or marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        length = struct.unpack(">H", length)[0]
+        if marker in _JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_size(path):
+    """
+    Read the pixel size of a PNG or JPEG image from its header (the PNG
+    IHDR chunk or the JPEG start of frame segment) without decoding it.
+
+    Returns:
+        tuple | None: (width, height), or None if path is not a PNG or JPEG
+        image or its header is truncated
+    """
+    with open(path, "rb") as f:
+        if f.read(8) == _PNG_SIGNATURE:
+            f.seek(0)
+            size = _png_size(f)
+        else:
+            f.seek(0)
+            size = _jpeg_size(f)
+    if size is None or 0 in size:
+        return None
+    return size
+
+
+class ImageSizes:
+    """
+    Maps the URL paths of static images (relative to the static directory,
+    with "/" separators) to their (width, height).
+
+    Renderers look up root-relative image URLs in it before resolving them
+    (see PageImages). The map is immutable once built, and digest identifies
+    its contents, e.g. in render cache keys.
+    """
+
+    def __init__(self, sizes=None):
+        self.sizes = {path: tuple(size) for path, size in (sizes or {}).items()}
+        self.digest = hash_bytes(json.dumps(sorted(self.sizes.items())).encode())
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def get(self, url):
+        """
+        Returns:
+            tuple | None: (width, height) of the static image a root-relative
+            URL (query and fragment ignored) points at, or None
+        """
+        if not url.startswith("/") or url.startswith("//"):
+            return None
+        end = len(url)
+        for separator in "?#":
+            index = url.find(separator)
+            if index != -1:
+                end = min(end, index)
+        return self.sizes.get(url[1:end])
+
+
+class PageImages:
+    """
+    The extra attributes of the images of one page, in page order: width
+    and height for local images of known size, so browsers reserve their
+    space before they load, and LAZY_ATTRIBUTES for all but the first.
+
+    Renderers create one per page; seen is set once an image was rendered.
+    """
+
+    __slots__ = ("sizes", "seen")
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.seen = False
+
+    def props(self, url):
+        """
+        Args:
+            url (str): Image URL as written in the markdown, before
+                resolve_url
+
+        Returns:
+            dict: Attributes to add to the next image of the page
+        """
+        props = {}
+        size = self.sizes.get(url)
+        if size is not None:
+            props["width"], props["height"] = str(size[0]), str(size[1])
+        if self.seen:
+            props.update(LAZY_ATTRIBUTES)
+        self.seen = True
+        return props
+
+
+def scan_image_sizes(static_dir, records=None):
+    """
+    Read the size of every PNG and JPEG image in static_dir and build the
+    ImageSizes map.
+
+    Sizes are cached by content hash: a file whose size and mtime match its
+    record is not opened at all, and one that changed is only read again
+    if no record has its hash (a touched or duplicated image is not).
+
+    Args:
+        static_dir (str): Static source directory
+        records (dict): Optional rel_path -> [size, mtime_ns, hash, width,
+            height] of the previous run, updated in place; width and height
+            are null for unreadable images
+
+    Returns:
+        tuple: The ImageSizes and the sorted paths, relative to static_dir,
+        of the images added, resized or removed since records were taken
+    """
+    if records is None:
+        records = {}
+    by_hash = {record[2]: record[3:] for record in records.values()}
+    sizes = {}
+    changed = []
+    seen = set()
+
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() not in IMAGE_SIZE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, static_dir)
+            seen.add(rel_path)
+            stat = os.stat(path)
+
+            record = records.get(rel_path)
+            if record is not None and record[:2] == [stat.st_size, stat.st_mtime_ns]:
+                size = record[3:]
+            else:
+                digest = hash_file(path)
+                size = by_hash.get(digest)
+                if size is None:
+                    size = list(read_image_size(path) or (None, None))
+                    by_hash[digest] = size
+                if record is None or record[3:] != size:
+                    changed.append(rel_path)
+                records[rel_path] = [stat.st_size, stat.st_mtime_ns, digest, *size]
+
+            if size[0] is not None:
+                sizes[rel_path.replace(os.sep, "/")] = size
+
+    for rel_path in list(records):
+        if rel_path not in seen:
+            del records[rel_path]
+            changed.append(rel_path)
+
+    return ImageSizes(sizes), sorted(changed)
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+
+class InlineCache:
+    """
+    Size-bounded LRU cache of rendered inline fragments.
+
+    Renderers key entries on the fragment text (plus whatever else the
+    rendering depends on, such as the URL resolver) and store immutable
+    values only: HTML strings, or tuples of (tag, value, props) node specs
+    that every lookup turns into fresh nodes, together with the (text type,
+    URL) pairs of their links and images.
+    Repeated fragments (navigation lists, footers, recurring list items)
+    are then tokenized and rendered once.
+
+    Fragments longer than max_fragment_length characters bypass the cache:
+    long paragraphs rarely repeat, and caching them would only add the miss
+    overhead and push out the short fragments that do. Those bypasses are
+    not counted as lookups.
+
+    Hit, miss and eviction counters help pick maxsize. The cache is not
+    thread-safe; every process renders with its own.
+    """
+
+    def __init__(self, maxsize=4096, max_fragment_length=200):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.max_fragment_length = max_fragment_length
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns:
+            The cached value, marked as most recently used, or None on a miss
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store value, evicting the least recently used entry when full.
+        """
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def counters(self):
+        """
+        Returns:
+            tuple: (hits, misses, evictions)
+        """
+        return self.hits, self.misses, self.evictions
+
+    def add_counters(self, counters):
+        """
+        Add (hits, misses, evictions) counted by another cache, e.g. one in a
+        worker process.
+        """
+        hits, misses, evictions = counters
+        self.hits += hits
+        self.misses += misses
+        self.evictions += evictions
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return (
+            f"Inline cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.evictions} evictions, size {self.maxsize} "
+            f"({self.hit_rate() * 100:.1f}% hit rate)"
+        )
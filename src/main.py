@@ -1,15 +1,82 @@
+import argparse
+import cProfile
 import os
+import pstats
 import shutil
-import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
-from generate_page import generate_pages_recursive
+from asset_fingerprint import DEFAULT_ASSET_MANIFEST_NAME, fingerprint_assets
+from build_manifest import BuildManifest
+from build_profile import BuildProfile
+from fast_copy import copy_files
+from generate_page import (
+    generate_pages_parallel,
+    generate_pages_pipelined,
+    generate_pages_recursive,
+)
+from image_size import scan_image_sizes
+from inline_cache import InlineCache
+from output_changes import (
+    DEFAULT_CHANGES_PATH,
+    DELETED,
+    UNCHANGED,
+    OutputChanges,
+    write_if_changed,
+)
+from precompress import DEFAULT_ETAGS_NAME, precompress_output, remove_precompressed
+from render_cache import RenderCache
+from static_sync import sync_static
+from watch import watch_site
 
 
-def copy_static_to_public(src_dir="static", dest_dir="docs"):
+def copy_static_to_public(
+    src_dir="static",
+    dest_dir="docs",
+    sync=False,
+    manifest=None,
+    checksum=False,
+    link=False,
+    dedupe=False,
+    rename=None,
+    minify=False,
+    rewrite_css=None,
+):
     """
     Recursively copies all contents from source directory to destination directory.
     First deletes all contents of destination directory for a clean copy.
+
+    With sync=True the destination is not deleted; only new or changed files
+    are copied and assets removed from the source are pruned (see
+    sync_static). Returns the SyncStats in that case. rename (see
+    sync_static) gives files other output names, rewrite_css rewrites the
+    references of stylesheets and minify=True writes them minified; all
+    require sync=True.
+
+    Files are copied concurrently with the cheapest primitive available (see
+    copy_files); link=True hard links them instead where possible, and
+    dedupe=True copies files with identical contents only once.
     """
+    if sync:
+        stats = sync_static(
+            src_dir,
+            dest_dir,
+            manifest,
+            checksum,
+            link=link,
+            dedupe=dedupe,
+            rename=rename,
+            minify=minify,
+            rewrite_css=rewrite_css,
+        )
+        print(
+            f"Static sync: copied {stats.files_copied} files "
+            f"({stats.bytes_copied} bytes), skipped {stats.files_skipped} files "
+            f"({stats.bytes_skipped} bytes), removed {stats.files_removed} files"
+            f"{_format_copy_methods(stats.copy_methods)}"
+        )
+        return stats
+
     # Delete destination directory if it exists
     if os.path.exists(dest_dir):
         print(f"Deleting existing directory: {dest_dir}")
@@ -20,56 +87,442 @@ def copy_static_to_public(src_dir="static", dest_dir="docs"):
     os.makedirs(dest_dir, exist_ok=True)
 
     # Copy all contents from source to destination
-    _copy_directory_contents(src_dir, dest_dir)
+    _copy_directory_contents(src_dir, dest_dir, link, dedupe)
 
 
-def _copy_directory_contents(src_dir, dest_dir):
+def _format_copy_methods(copy_methods):
+    if not copy_methods:
+        return ""
+    methods = ", ".join(
+        f"{method}: {count}" for method, count in sorted(copy_methods.items())
+    )
+    return f" ({methods})"
+
+
+def _copy_directory_contents(src_dir, dest_dir, link=False, dedupe=False):
     """
     Recursively copies contents of src_dir to dest_dir.
     Helper function for copy_static_to_public.
+
+    The directory tree is created first, then all files are copied in a
+    thread pool.
     """
     if not os.path.exists(src_dir):
         print(f"Source directory does not exist: {src_dir}")
         return
 
-    # Get all items in source directory
-    items = os.listdir(src_dir)
+    pairs = []
+    for root, dirs, files in os.walk(src_dir):
+        rel_root = os.path.relpath(root, src_dir)
+        dest_root = dest_dir if rel_root == "." else os.path.join(dest_dir, rel_root)
 
-    for item in items:
-        src_path = os.path.join(src_dir, item)
-        dest_path = os.path.join(dest_dir, item)
-
-        if os.path.isfile(src_path):
-            # It's a file - copy it
-            print(f"Copying file: {src_path} -> {dest_path}")
-            shutil.copy(src_path, dest_path)
-        else:
-            # It's a directory - create it and recursively copy contents
+        for name in sorted(dirs):
+            # It's a directory - create it, its contents follow in the walk
+            dest_path = os.path.join(dest_root, name)
             print(f"Creating directory: {dest_path}")
             os.makedirs(dest_path, exist_ok=True)
-            _copy_directory_contents(src_path, dest_path)
+
+        for name in sorted(files):
+            pairs.append((os.path.join(root, name), os.path.join(dest_root, name)))
+
+    copy_methods = copy_files(pairs, link=link, dedupe=dedupe)
+    print(f"Copied {len(pairs)} files{_format_copy_methods(copy_methods)}")
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument(
+        "basepath", nargs="?", default="/", help='Base URL path (default: "/")'
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Delete the output directory and rebuild everything from scratch",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="Compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--link-static",
+        action="store_true",
+        help="Hard link static files into the output instead of copying them "
+        "when both are on the same filesystem",
+    )
+    parser.add_argument(
+        "--dedupe-static",
+        action="store_true",
+        help="Copy static files with identical contents only once and clone "
+        "the duplicates (saves space on reflink-capable filesystems)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Render pages in N worker processes (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=4,
+        metavar="N",
+        help="With -j 1, read sources and write pages in N background threads "
+        "each while rendering, and copy static files concurrently (0 = do "
+        "everything in order, default: 4)",
+    )
+    parser.add_argument(
+        "--inline-cache",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Cache up to N rendered inline fragments (repeated list items, "
+        "link lists, footers) and report hits, misses and evictions "
+        "(default: 0, off)",
+    )
+    parser.add_argument(
+        "--render-cache-size",
+        type=int,
+        default=0,
+        metavar="MB",
+        help="Keep rendered page content in .ssg-cache/render, evicting the "
+        "least recently used entries beyond MB megabytes; pays off when "
+        ".ssg-cache is kept between builds (default: 0, off)",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Copy CSS, JS, images and fonts from static/ under content-hashed "
+        "names (index.0123456789.css), point links, images and template "
+        "references at those names and write docs/assets.json mapping the "
+        "original names to them",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Collapse insignificant whitespace in generated pages as they are "
+        "written (keeping pre, code, textarea, script and style content) and "
+        "strip comments and whitespace from CSS files copied from static/",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="After building, write .gz siblings of HTML, CSS and other text "
+        "files in docs and an ETag manifest (docs/etags.json); only files "
+        "whose content changed are recompressed",
+    )
+    parser.add_argument(
+        "--gzip-level",
+        type=int,
+        default=9,
+        choices=range(1, 10),
+        metavar="N",
+        help="zlib compression level for --gzip, 1 (fastest) to 9 (default)",
+    )
+    parser.add_argument(
+        "--changes-file",
+        default=DEFAULT_CHANGES_PATH,
+        metavar="FILE",
+        help="Write the output files added, changed and deleted by this build "
+        f"to FILE as JSON, for deploys (default: {DEFAULT_CHANGES_PATH})",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each build stage and page and print a report (implies -j 1)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Number of slowest pages listed in the profile report (default: 10)",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        help="With --profile, also run cProfile and write pstats data to FILE",
+    )
+    parser.add_argument(
+        "--depends-on",
+        metavar="PATH",
+        help="List the outputs built from the input file PATH (as recorded by "
+        "the last build) and exit without building",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After building, watch content/, static/ and template.html and "
+        "rebuild only the affected outputs on every change",
+    )
+    args = parser.parse_args(argv)
+    if args.fingerprint and args.watch:
+        parser.error("--fingerprint cannot be combined with --watch")
+    if args.gzip and args.watch:
+        # The watcher does not recompress, so .gz siblings would go stale
+        parser.error("--gzip cannot be combined with --watch")
+    return args
+
+
+def _stage(profile, name):
+    """
+    Time a build-wide stage with profile, if the build is profiled.
+    """
+    if profile is None:
+        return nullcontext()
+    return profile.stage(name)
+
+
+def _changed_assets(stats):
+    return [os.path.join("static", rel_path) for rel_path in stats.changed_paths]
+
+
+def _generate_pages(
+    args,
+    basepath,
+    manifest,
+    profile,
+    inline_cache,
+    render_cache,
+    changes,
+    assets,
+    image_sizes,
+):
+    """
+    Generate all pages, skipping pages whose inputs are unchanged. Stage
+    timings are collected in this process, so profiling builds serially.
+
+    Returns:
+        list: Output paths of the rendered pages
+    """
+    if profile is not None or (args.jobs == 1 and args.io_threads == 0):
+        generate_pages_recursive(
+            "content",
+            "template.html",
+            "docs",
+            basepath,
+            manifest,
+            profile=profile,
+            inline_cache=inline_cache,
+            render_cache=render_cache,
+            changes=changes,
+            assets=assets,
+            minify=args.minify,
+            image_sizes=image_sizes,
+        )
+        return []
+    if args.jobs == 1:
+        return generate_pages_pipelined(
+            "content",
+            "template.html",
+            "docs",
+            basepath,
+            manifest,
+            io_threads=args.io_threads,
+            inline_cache=inline_cache,
+            render_cache=render_cache,
+            changes=changes,
+            assets=assets,
+            minify=args.minify,
+            image_sizes=image_sizes,
+        )
+    return generate_pages_parallel(
+        "content",
+        "template.html",
+        "docs",
+        basepath,
+        manifest,
+        args.jobs or None,
+        inline_cache,
+        render_cache,
+        changes,
+        assets,
+        args.minify,
+        image_sizes,
+    )
+
+
+def _write_asset_manifest(assets, changes):
+    """
+    Write docs/assets.json for fingerprinted builds, or remove one left
+    behind by an earlier build.
+    """
+    path = os.path.join("docs", DEFAULT_ASSET_MANIFEST_NAME)
+    if assets is not None:
+        status = write_if_changed(path, assets.to_json())
+        if status != UNCHANGED:
+            changes.record(path, status)
+    elif os.path.exists(path):
+        os.remove(path)
+        changes.record(path, DELETED)
+
+
+def main(argv=None):
     """
     Main function to run the static site generator.
     """
-    print("Starting static site generator...")
+    args = parse_args(argv)
+    basepath = args.basepath
 
-    # Get basepath from command line argument, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    if args.depends_on:
+        dependents = BuildManifest.load().dependencies.dependents(
+            os.path.normpath(args.depends_on)
+        )
+        for output in dependents:
+            print(output)
+        if not dependents:
+            print(f"No recorded outputs depend on {args.depends_on}")
+        return
 
+    print("Starting static site generator...")
     print(f"Using basepath: {basepath}")
 
-    # Delete anything in the docs directory and copy static files
-    copy_static_to_public()
+    manifest = BuildManifest.load()
+
+    profile = None
+    profiler = None
+    if args.profile:
+        profile = BuildProfile()
+        if args.profile_output:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+    if args.clean and os.path.exists("docs"):
+        print("Deleting existing directory: docs")
+        shutil.rmtree("docs")
+
+    inline_cache = InlineCache(args.inline_cache) if args.inline_cache > 0 else None
+    render_cache = None
+    if args.render_cache_size > 0:
+        render_cache = RenderCache(max_bytes=args.render_cache_size * 1024 * 1024)
+
+    # Only copy new or changed static files, keep generated pages
+    static_args = dict(
+        sync=True,
+        manifest=manifest,
+        checksum=args.checksum,
+        link=args.link_static,
+        dedupe=args.dedupe_static,
+        minify=args.minify,
+    )
+
+    assets = None
+    if args.fingerprint:
+        with _stage(profile, "fingerprint"):
+            assets, changed = fingerprint_assets(
+                "static", manifest.fingerprints, args.minify
+            )
+        static_args["rename"] = assets.output_name
+        static_args["rewrite_css"] = assets.rewrite_css
+        # Pages referencing a changed asset must point at its new name
+        manifest.invalidate_dependents(
+            [os.path.join("static", rel_path) for rel_path in changed]
+        )
+    else:
+        manifest.fingerprints = {}
 
-    # Generate all pages recursively
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+    # Images get their width and height; pages showing a resized image
+    # must be regenerated
+    with _stage(profile, "image_sizes"):
+        image_sizes, resized = scan_image_sizes("static", manifest.image_sizes)
+    manifest.invalidate_dependents(
+        [os.path.join("static", rel_path) for rel_path in resized]
+    )
+
+    changes = OutputChanges("docs")
+    generate_args = (
+        args,
+        basepath,
+        manifest,
+        profile,
+        inline_cache,
+        render_cache,
+        changes,
+        assets,
+        image_sizes,
+    )
+
+    if profile is not None or (args.jobs == 1 and args.io_threads == 0):
+        # One stage after the other; the profile times each of them
+        with _stage(profile, "copy_static"):
+            stats = copy_static_to_public(**static_args)
+
+        # Pages referencing a changed asset are rebuilt even if their own
+        # sources are unchanged
+        manifest.invalidate_dependents(_changed_assets(stats))
+        _generate_pages(*generate_args)
+    else:
+        # Copy static files while the pages render. Pages referencing a
+        # changed asset that were skipped as fresh are rendered afterwards.
+        with ThreadPoolExecutor(max_workers=1) as static_executor:
+            static_future = static_executor.submit(copy_static_to_public, **static_args)
+            rendered = _generate_pages(*generate_args)
+            stats = static_future.result()
+        if manifest.invalidate_dependents(_changed_assets(stats), exclude=rendered):
+            _generate_pages(*generate_args)
+
+    changes.add_sync_stats(stats)
+
+    # Drop outputs of markdown files removed since the last build
+    for output in manifest.remove_stale_pages():
+        changes.record(output, DELETED)
+    _write_asset_manifest(assets, changes)
+    if not manifest.loaded:
+        # Without a manifest (a fresh clone or CI checkout) the outputs of
+        # removed pages and assets are only found by what this build made
+        keep = (DEFAULT_ASSET_MANIFEST_NAME, DEFAULT_ETAGS_NAME)
+        for rel_path in manifest.remove_untracked_outputs("docs", keep):
+            changes.record_relative(rel_path, DELETED)
+
+    if args.gzip:
+        with _stage(profile, "precompress"):
+            gzip_stats = precompress_output("docs", args.gzip_level, changes=changes)
+        print(
+            f"Precompressed {gzip_stats.files_compressed} files "
+            f"({gzip_stats.bytes_in} -> {gzip_stats.bytes_out} bytes), "
+            f"skipped {gzip_stats.files_skipped} unchanged files, "
+            f"removed {gzip_stats.files_removed} stale .gz files"
+        )
+    else:
+        # Servers would keep serving .gz files of an earlier --gzip build
+        removed = remove_precompressed("docs", changes=changes)
+        if removed:
+            print(f"Removed {removed} .gz files of an earlier --gzip build")
+
+    manifest.save()
+    changes.save(args.changes_file)
 
     print("Site generation completed successfully!")
+    print(changes.report())
+
+    if inline_cache is not None:
+        print(inline_cache.report())
+    if render_cache is not None:
+        render_cache.prune()
+        print(render_cache.report())
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile_output)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+        print(f"Wrote cProfile data to {args.profile_output}")
+
+    if profile is not None:
+        print(profile.report(args.profile_top))
+
+    if args.watch:
+        watch_site(
+            "content",
+            "static",
+            "template.html",
+            "docs",
+            basepath,
+            manifest,
+            render_cache=render_cache,
+            minify=args.minify,
+        )
 
 
 if __name__ == "__main__":
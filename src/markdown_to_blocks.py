@@ -1,12 +1,5 @@
-def markdown_to_blocks(markdown):
-    raw_blocks = markdown.split("\n\n")
-
-    blocks = []
+from scan_blocks import scan_blocks
 
-    for block in raw_blocks:
-        clean = block.strip()
 
-        if clean:
-            blocks.append(clean)
-
-    return blocks
+def markdown_to_blocks(markdown):
+    return [block.text for block in scan_blocks(markdown)]
@@ -0,0 +1,173 @@
+from block_to_block_type import BlockType
+from image_size import PageImages
+from markdown_to_html_node import code_block_content, split_heading
+from scan_blocks import scan_blocks
+from scan_inline import inline_tokens
+from textnode import TextType
+
+
+def _render_inline(text, write, add_url, resolve_url, images=None):
+    for value, text_type, url in inline_tokens(text):
+        if text_type == TextType.TEXT:
+            write(value)
+        elif text_type == TextType.BOLD:
+            write(f"<b>{value}</b>")
+        elif text_type == TextType.ITALIC:
+            write(f"<i>{value}</i>")
+        elif text_type == TextType.CODE:
+            write(f"<code>{value}</code>")
+        else:
+            if add_url is not None:
+                add_url(text_type, url)
+            props = ""
+            if images is not None and text_type == TextType.IMAGE:
+                props = "".join(
+                    [f' {name}="{prop}"' for name, prop in images.props(url).items()]
+                )
+            if resolve_url is not None:
+                url = resolve_url(url)
+            if text_type == TextType.LINK:
+                write(f'<a href="{url}">{value}</a>')
+            elif text_type == TextType.IMAGE:
+                write(f'<img src="{url}" alt="{value}"{props} />')
+
+
+def _write_inline(text, write, page, resolve_url, inline_cache, images=None):
+    if page is not None:
+        page.add_text(text)
+
+    if inline_cache is None or len(text) > inline_cache.max_fragment_length:
+        add_url = page.add_url if page is not None else None
+        _render_inline(text, write, add_url, resolve_url, images)
+        return
+
+    key = ("html", text, resolve_url)
+    if images is not None:
+        # Image attributes depend on whether the page had an image before
+        key += (images.sizes, images.seen)
+    entry = inline_cache.get(key)
+    if entry is None:
+        parts = []
+        urls = []
+        _render_inline(
+            text, parts.append, lambda *pair: urls.append(pair), resolve_url, images
+        )
+        entry = ("".join(parts), tuple(urls))
+        inline_cache.put(key, entry)
+
+    html, urls = entry
+    if page is not None:
+        for text_type, url in urls:
+            page.add_url(text_type, url)
+    if images is not None and not images.seen:
+        images.seen = any(text_type == TextType.IMAGE for text_type, _ in urls)
+    write(html)
+
+
+def _write_element(tag, text, write, page, resolve_url, inline_cache, images):
+    write(f"<{tag}>")
+    _write_inline(text, write, page, resolve_url, inline_cache, images)
+    write(f"</{tag}>")
+
+
+def write_markdown_html(
+    markdown,
+    write,
+    page=None,
+    resolve_url=None,
+    inline_cache=None,
+    image_sizes=None,
+    blocks=None,
+):
+    """
+    Render markdown straight to HTML fragments without building the node tree.
+
+    Produces exactly markdown_to_html_node(markdown).to_html(), emitted
+    piece by piece through write.
+
+    Args:
+        markdown (str | iterable): Markdown text, or an iterable of lines
+        write (callable): Receives each str fragment
+        page (PageResult): Optional result collecting the title, outline,
+            word count and URLs as markdown_to_page does; its html_node is
+            left unset
+        resolve_url (callable): Optional function applied to every link and
+            image URL, see url_resolver
+        inline_cache (InlineCache): Optional cache of rendered inline
+            fragments, shared across documents
+        image_sizes (ImageSizes): Optional sizes of static images; images
+            then get width/height and lazy loading attributes, see
+            PageImages
+        blocks (list): Optional blocks already scanned from markdown with
+            scan_blocks, e.g. to time the block scan on its own
+    """
+    images = PageImages(image_sizes) if image_sizes is not None else None
+    if blocks is None:
+        blocks = scan_blocks(markdown)
+    write("<div>")
+
+    for block in blocks:
+        block_type = block.block_type
+        lines = block.lines
+
+        if block_type == BlockType.PARAGRAPH:
+            text = " ".join([line.strip() for line in lines])
+            _write_element("p", text, write, page, resolve_url, inline_cache, images)
+
+        elif block_type == BlockType.HEADING:
+            level, text = split_heading(block.text)
+            if page is not None:
+                page.add_heading(level, text)
+            _write_element(
+                f"h{level}", text, write, page, resolve_url, inline_cache, images
+            )
+
+        elif block_type == BlockType.CODE:
+            inner = code_block_content(lines)
+            if page is not None:
+                page.add_text(inner)
+            write(f"<pre><code>{inner}</code></pre>")
+
+        elif block_type == BlockType.QUOTE:
+            text = " ".join([line.lstrip("> ").strip() for line in lines])
+            _write_element(
+                "blockquote", text, write, page, resolve_url, inline_cache, images
+            )
+
+        elif block_type == BlockType.UNORDERED_LIST:
+            write("<ul>")
+            for line in lines:
+                _write_element(
+                    "li", line[2:], write, page, resolve_url, inline_cache, images
+                )
+            write("</ul>")
+
+        elif block_type == BlockType.ORDERED_LIST:
+            write("<ol>")
+            for line in lines:
+                parts = line.split(". ", 1)
+                if len(parts) == 2:
+                    _write_element(
+                        "li", parts[1], write, page, resolve_url, inline_cache, images
+                    )
+            write("</ol>")
+
+        else:
+            raise ValueError(f"Unknown block type: {block_type}")
+
+    write("</div>")
+
+
+def markdown_to_html(markdown, resolve_url=None, image_sizes=None):
+    """
+    Fast path for markdown_to_html_node(markdown, resolve_url=...,
+    image_sizes=...).to_html().
+
+    Goes from blocks and inline tokens directly to an HTML string, without
+    allocating TextNode, LeafNode or ParentNode objects.
+    """
+    parts = []
+    write_markdown_html(
+        markdown, parts.append, resolve_url=resolve_url, image_sizes=image_sizes
+    )
+    return "".join(parts)
@@ -1,95 +1,240 @@
-from block_to_block_type import BlockType, block_to_block_type
+from block_to_block_type import BlockType
+from image_size import PageImages
 from leafnode import LeafNode
-from markdown_to_blocks import markdown_to_blocks
+from page_result import PageResult
 from parentnode import ParentNode
+from scan_blocks import Block, scan_blocks
 from text_to_html import text_node_to_html_node
 from text_to_textnodes import text_to_textnodes
-
-
-def text_to_children(text):
-    nodes = text_to_textnodes(text)
-    return [text_node_to_html_node(n) for n in nodes]
-
-
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+from textnode import TextType
+
+
+def _inline_children(text, inline_engine, resolve_url, images):
+    # Node specs rather than nodes: every lookup builds fresh LeafNodes, so a
+    # caller changing one cannot change the tree of another page
+    nodes = text_to_textnodes(text, inline_engine)
+    specs = []
+    for n in nodes:
+        child = text_node_to_html_node(n, resolve_url, images)
+        props = tuple(child.props.items()) if child.props else None
+        specs.append((child.tag, child.value, props))
+    urls = tuple((n.text_type, n.url) for n in nodes if n.url is not None)
+    return tuple(specs), urls
+
+
+def text_to_children(
+    text,
+    inline_engine="scan",
+    resolve_url=None,
+    page=None,
+    inline_cache=None,
+    images=None,
+):
+    if inline_cache is None or len(text) > inline_cache.max_fragment_length:
+        nodes = text_to_textnodes(text, inline_engine)
+        if page is not None:
+            page.add_text(text)
+            for n in nodes:
+                if n.url is not None:
+                    page.add_url(n.text_type, n.url)
+        return [text_node_to_html_node(n, resolve_url, images) for n in nodes]
+
+    key = ("nodes", text, inline_engine, resolve_url)
+    if images is not None:
+        # Image attributes depend on whether the page had an image before
+        key += (images.sizes, images.seen)
+    entry = inline_cache.get(key)
+    if entry is None:
+        entry = _inline_children(text, inline_engine, resolve_url, images)
+        inline_cache.put(key, entry)
+    specs, urls = entry
+
+    if page is not None:
+        page.add_text(text)
+        for text_type, url in urls:
+            page.add_url(text_type, url)
+    if images is not None and not images.seen:
+        images.seen = any(text_type == TextType.IMAGE for text_type, _ in urls)
+    return [
+        LeafNode(tag, value, dict(props) if props is not None else None)
+        for tag, value, props in specs
+    ]
+
+
+def split_heading(text):
+    """
+    Split a heading block into its level and its text.
+    """
+    # count how many # characters at the start
+    level = 0
+    for c in text:
+        if c == "#":
+            level += 1
+        else:
+            break
+    return level, text[level + 1 :]  # skip # and the space
+
+
+def code_block_content(lines):
+    """
+    Text inside a code block: fence lines dropped, indentation stripped.
+    """
+    # Find start and end of actual code content
+    start_idx = 0
+    end_idx = len(lines)
+
+    # Skip opening ```
+    if lines[start_idx].strip().startswith("```"):
+        start_idx += 1
+
+    # Skip closing ```
+    if end_idx > start_idx and lines[end_idx - 1].strip() == "```":
+        end_idx -= 1
+
+    # Get the code content lines
+    code_lines = lines[start_idx:end_idx]
+
+    # Strip leading whitespace but preserve structure
+    if code_lines:
+        # Remove common leading whitespace
+        stripped_lines = [line.lstrip() for line in code_lines]
+        inner = "\n".join(stripped_lines) + "\n"  # Always add trailing newline
+    else:
+        inner = ""
+
+    return inner
+
+
+def block_to_html_node(
+    block,
+    inline_engine="scan",
+    resolve_url=None,
+    page=None,
+    inline_cache=None,
+    images=None,
+):
+    # Accept raw block text as well as a Block from scan_blocks
+    if isinstance(block, str):
+        block = Block(block.split("\n"))
+
+    block_type = block.block_type
+    lines = block.lines
 
     if block_type == BlockType.PARAGRAPH:
         # Join lines in the paragraph and normalize whitespace
-        lines = [line.strip() for line in block.split("\n")]
-        text = " ".join(lines)
-        children = text_to_children(text)
+        text = " ".join([line.strip() for line in lines])
+        children = text_to_children(
+            text, inline_engine, resolve_url, page, inline_cache, images
+        )
         return ParentNode("p", children)
 
     if block_type == BlockType.HEADING:
-        # count how many # characters at the start
-        level = 0
-        for c in block:
-            if c == "#":
-                level += 1
-            else:
-                break
-        text = block[level + 1 :]  # skip # and the space
-        children = text_to_children(text)
+        level, text = split_heading(block.text)
+        if page is not None:
+            page.add_heading(level, text)
+        children = text_to_children(
+            text, inline_engine, resolve_url, page, inline_cache, images
+        )
         return ParentNode(f"h{level}", children)
 
     if block_type == BlockType.CODE:
-        # Split into lines
-        lines = block.split("\n")
-
-        # Find start and end of actual code content
-        start_idx = 0
-        end_idx = len(lines)
-
-        # Skip opening ```
-        if lines[start_idx].strip().startswith("```"):
-            start_idx += 1
-
-        # Skip closing ```
-        if end_idx > start_idx and lines[end_idx - 1].strip() == "```":
-            end_idx -= 1
-
-        # Get the code content lines
-        code_lines = lines[start_idx:end_idx]
-
-        # Strip leading whitespace but preserve structure
-        if code_lines:
-            # Remove common leading whitespace
-            stripped_lines = [line.lstrip() for line in code_lines]
-            inner = "\n".join(stripped_lines) + "\n"  # Always add trailing newline
-        else:
-            inner = ""
-
+        inner = code_block_content(lines)
+        if page is not None:
+            page.add_text(inner)
         return ParentNode("pre", [ParentNode("code", [LeafNode(None, inner)])])
 
     if block_type == BlockType.QUOTE:
         # remove leading ">" from each line
-        lines = [line.lstrip("> ").strip() for line in block.split("\n")]
-        text = " ".join(lines)
-        children = text_to_children(text)
+        text = " ".join([line.lstrip("> ").strip() for line in lines])
+        children = text_to_children(
+            text, inline_engine, resolve_url, page, inline_cache, images
+        )
         return ParentNode("blockquote", children)
 
     if block_type == BlockType.UNORDERED_LIST:
         items = []
-        for line in block.split("\n"):
+        for line in lines:
             item_text = line[2:]  # remove "- "
-            items.append(ParentNode("li", text_to_children(item_text)))
+            children = text_to_children(
+                item_text, inline_engine, resolve_url, page, inline_cache, images
+            )
+            items.append(ParentNode("li", children))
         return ParentNode("ul", items)
 
     if block_type == BlockType.ORDERED_LIST:
         items = []
-        for line in block.split("\n"):
+        for line in lines:
             # remove "1. ", "2. ", etc.
             parts = line.split(". ", 1)
             if len(parts) == 2:
                 item_text = parts[1]
-                items.append(ParentNode("li", text_to_children(item_text)))
+                children = text_to_children(
+                    item_text, inline_engine, resolve_url, page, inline_cache, images
+                )
+                items.append(ParentNode("li", children))
         return ParentNode("ol", items)
 
     raise ValueError(f"Unknown block type: {block_type}")
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = [block_to_html_node(block) for block in blocks]
+def markdown_to_html_node(
+    markdown,
+    inline_engine="scan",
+    resolve_url=None,
+    inline_cache=None,
+    image_sizes=None,
+):
+    """
+    Parse markdown into a "div" ParentNode with one child per block.
+
+    Args:
+        markdown (str | iterable): Markdown text, or an iterable of lines
+        inline_engine (str): Inline tokenizer, see text_to_textnodes
+        resolve_url (callable): Optional function applied to every link and
+            image URL, see url_resolver
+        inline_cache (InlineCache): Optional cache of inline children,
+            shared across documents; cached nodes are shared between trees
+        image_sizes (ImageSizes): Optional sizes of static images; images
+            then get width/height and lazy loading attributes, see
+            PageImages
+    """
+    images = PageImages(image_sizes) if image_sizes is not None else None
+    children = [
+        block_to_html_node(
+            block, inline_engine, resolve_url, None, inline_cache, images
+        )
+        for block in scan_blocks(markdown)
+    ]
     return ParentNode("div", children)
+
+
+def markdown_to_page(
+    markdown,
+    inline_engine="scan",
+    resolve_url=None,
+    inline_cache=None,
+    image_sizes=None,
+):
+    """
+    Parse markdown into a PageResult: the node tree markdown_to_html_node
+    returns, plus the title, heading outline, word count and link and image
+    URLs collected while the blocks are parsed.
+
+    Args:
+        markdown (str | iterable): Markdown text, or an iterable of lines
+        inline_engine (str): Inline tokenizer, see text_to_textnodes
+        resolve_url (callable): Optional function applied to every link and
+            image URL; the page records the URLs as written in the markdown
+        image_sizes (ImageSizes): Optional sizes of static images, see
+            markdown_to_html_node
+    """
+    page = PageResult()
+    images = PageImages(image_sizes) if image_sizes is not None else None
+    children = [
+        block_to_html_node(
+            block, inline_engine, resolve_url, page, inline_cache, images
+        )
+        for block in scan_blocks(markdown)
+    ]
+    page.html_node = ParentNode("div", children)
+    return page
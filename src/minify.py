@@ -0,0 +1,140 @@
+import re
+
+# Elements whose content is shown or run as written
+_PROTECTED_TAGS = "pre|code|textarea|script|style"
+
+# A protected element, comment or tag is kept as is (group 1); a "<" that
+# starts no tag is text. A whitespace run with a line break becomes that
+# line break (group 3), any other run of two or more whitespace characters
+# its first character (group 4).
+_HTML_TOKEN = re.compile(
+    rf"(<({_PROTECTED_TAGS})\b.*?</\2\s*>|<!--.*?-->|<[a-zA-Z/!?][^<>]*>)"
+    r"|[^\S\n]*(\n)\s*|(\s)\s+",
+    re.IGNORECASE | re.DOTALL,
+)
+_HTML_REPLACEMENT = r"\1\3\4"
+
+_PROTECTED_BOUNDARY = re.compile(rf"<(/?)({_PROTECTED_TAGS})\b", re.IGNORECASE)
+
+# Whitespace including comments
+_CSS_SPACE = r"(?:\s|/\*.*?\*/)"
+_CSS_TOKEN = re.compile(
+    r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')"""
+    rf"|{_CSS_SPACE}*;{_CSS_SPACE}*(?=\}})"
+    rf"|{_CSS_SPACE}*([{{}};,]){_CSS_SPACE}*"
+    rf"|(:){_CSS_SPACE}+"
+    rf"|({_CSS_SPACE}+)",
+    re.DOTALL,
+)
+
+
+def minify_html(html):
+    """
+    Collapse insignificant whitespace in HTML: every whitespace run outside
+    tags becomes a single character (a line break if it had one), which
+    renders the same. The content of pre, code, textarea, script and style
+    elements, comments and whitespace inside tags are left untouched.
+
+    Args:
+        html (str): A complete document or fragment; see HtmlMinifier for
+            HTML arriving in pieces
+
+    Returns:
+        str: The minified HTML
+    """
+    return _HTML_TOKEN.sub(_HTML_REPLACEMENT, html)
+
+
+class HtmlMinifier:
+    """
+    Streaming minify_html: HTML is fed in pieces and the minified output
+    passed to write as soon as it is final.
+
+    A piece may end inside a tag, a comment, a protected element or a
+    whitespace run; that tail is held back until the next piece (or close)
+    completes it, so for well-formed HTML the output is the same as
+    minify_html of the whole text.
+    """
+
+    def __init__(self, write):
+        self._write = write
+        self._buffer = ""
+
+    def _safe_end(self, buffer):
+        """
+        Returns:
+            int: Length of the prefix of buffer that can be minified without
+            seeing what follows
+        """
+        end = len(buffer.rstrip())
+        while True:
+            # Each rule can only move the end back; repeat until none does
+            safe = end
+            tag = buffer.rfind("<", 0, safe)
+            if tag != -1 and buffer.find(">", tag, safe) == -1:
+                safe = tag
+            comment = buffer.find("<!--", 0, safe)
+            while comment != -1:
+                comment_end = buffer.find("-->", comment + 4, safe)
+                if comment_end == -1:
+                    safe = comment
+                    break
+                comment = buffer.find("<!--", comment_end + 3, safe)
+
+            open_at = open_tag = None
+            for match in _PROTECTED_BOUNDARY.finditer(buffer, 0, safe):
+                closing, name = match.groups()
+                name = name.lower()
+                if open_at is None:
+                    if not closing:
+                        open_at, open_tag = match.start(), name
+                elif closing and name == open_tag:
+                    open_at = None
+            if open_at is not None:
+                safe = open_at
+
+            if safe == end:
+                return end
+            end = safe
+
+    def feed(self, html):
+        buffer = self._buffer + html
+        end = self._safe_end(buffer)
+        if end:
+            self._write(minify_html(buffer[:end]))
+        self._buffer = buffer[end:]
+
+    def close(self):
+        """
+        Minify and write whatever is still held back.
+        """
+        if self._buffer:
+            self._write(minify_html(self._buffer))
+            self._buffer = ""
+
+
+def _css_replacement(match):
+    string, punctuation, colon, space = match.groups()
+    if string is not None:
+        return string
+    if punctuation is not None:
+        return punctuation
+    if colon is not None:
+        return colon
+    if space is not None:
+        return " "
+    # A semicolon before a closing brace
+    return ""
+
+
+def minify_css(css):
+    """
+    Strip comments and insignificant whitespace from CSS: whitespace around
+    braces, semicolons and commas and after colons is removed, the last
+    semicolon of a block is dropped, and other whitespace runs (including
+    comments) become one space. Strings are left untouched.
+
+    Returns:
+        str: The minified CSS
+    """
+    return _CSS_TOKEN.sub(_css_replacement, css).strip()
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import threading
+
+from build_manifest import hash_bytes, hash_file
+
+DEFAULT_CHANGES_PATH = os.path.join(".ssg-cache", "changes.json")
+
+ADDED = "added"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+DELETED = "deleted"
+
+
+def write_if_changed(path, data, replace=False):
+    """
+    Write data (bytes) to path unless the file already holds exactly that
+    content, so unchanged outputs keep their mtime. The existing file is
+    only read and hashed when its size matches.
+
+    With replace=True the data is written to a temporary file that is
+    renamed over path, like copy_file does, so an existing path that is a
+    hard link (e.g. to a static source file) is never written through.
+
+    Returns:
+        str: ADDED if path did not exist, CHANGED if it was rewritten, or
+        UNCHANGED if the write was skipped
+    """
+    try:
+        size = os.stat(path).st_size
+    except FileNotFoundError:
+        status = ADDED
+    else:
+        if size == len(data) and hash_file(path) == hash_bytes(data):
+            return UNCHANGED
+        status = CHANGED
+
+    if not replace:
+        with open(path, "wb") as f:
+            f.write(data)
+        return status
+
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return status
+
+
+def _temp_path(path):
+    # Next to path, so os.replace stays on one filesystem; unique per writer
+    return os.path.join(
+        os.path.dirname(path),
+        f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp",
+    )
+
+
+def stream_if_changed(path, write_content):
+    """
+    Like write_if_changed, for content produced piece by piece, without
+    holding all of it in memory.
+
+    write_content(write) is called with a function taking str fragments,
+    which are encoded as UTF-8, hashed and written to a temporary file next
+    to path as they come. The temporary file then replaces path, or is
+    discarded if path already holds the same content.
+
+    Returns:
+        str: ADDED if path did not exist, CHANGED if it was replaced, or
+        UNCHANGED if it was left untouched
+    """
+    tmp = _temp_path(path)
+    digest = hashlib.sha256()
+    try:
+        with open(tmp, "wb") as f:
+            write_file = f.write
+            update = digest.update
+
+            def write(text):
+                data = text.encode("utf-8")
+                update(data)
+                write_file(data)
+
+            write_content(write)
+            size = f.tell()
+
+        try:
+            status = CHANGED if os.stat(path).st_size != size else None
+        except FileNotFoundError:
+            status = ADDED
+        if status is None:
+            if hash_file(path) == digest.hexdigest():
+                os.remove(tmp)
+                return UNCHANGED
+            status = CHANGED
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return status
+
+
+class OutputChanges:
+    """
+    The output files a build added, changed and deleted, so a deploy step
+    can upload and purge only those instead of the whole output directory.
+
+    Paths are recorded relative to output_dir. Writer threads may record
+    concurrently. A path deleted and written again in the same build counts
+    as changed; one added and deleted again is left out.
+    """
+
+    def __init__(self, output_dir="docs"):
+        self.output_dir = output_dir
+        self.added = set()
+        self.changed = set()
+        self.deleted = set()
+        self.unchanged = 0
+        self._lock = threading.Lock()
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.output_dir)
+
+    def record(self, path, status):
+        """
+        Record the outcome of writing or deleting the output file path.
+
+        Args:
+            path (str): Output path, including output_dir
+            status (str): ADDED, CHANGED, UNCHANGED or DELETED
+        """
+        self.record_relative(self._relative(path), status)
+
+    def record_relative(self, rel_path, status):
+        """
+        Like record, for a path relative to output_dir.
+        """
+        with self._lock:
+            if status == UNCHANGED:
+                self.unchanged += 1
+            elif status == DELETED:
+                if rel_path in self.added:
+                    self.added.discard(rel_path)
+                else:
+                    self.changed.discard(rel_path)
+                    self.deleted.add(rel_path)
+            elif rel_path in self.deleted:
+                self.deleted.discard(rel_path)
+                self.changed.add(rel_path)
+            elif status == ADDED:
+                self.added.add(rel_path)
+            elif rel_path not in self.added:
+                self.changed.add(rel_path)
+
+    def add_sync_stats(self, stats):
+        """
+        Record the static files copied and removed by sync_static.
+        """
+        added = set(stats.added_paths)
+        removed = set(stats.removed_paths)
+        for rel_path in stats.changed_paths:
+            if rel_path in removed:
+                self.record_relative(rel_path, DELETED)
+            else:
+                self.record_relative(rel_path, ADDED if rel_path in added else CHANGED)
+        with self._lock:
+            self.unchanged += stats.files_skipped
+
+    def to_dict(self):
+        return {
+            "output_dir": self.output_dir,
+            "added": sorted(self.added),
+            "changed": sorted(self.changed),
+            "deleted": sorted(self.deleted),
+        }
+
+    def save(self, path=DEFAULT_CHANGES_PATH):
+        """
+        Write the changes as JSON, atomically like BuildManifest.save.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    def report(self):
+        return (
+            f"Output changes: {len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.deleted)} deleted, {self.unchanged} unchanged"
+        )
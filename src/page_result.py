@@ -0,0 +1,74 @@
+from textnode import TextType
+
+
+class PageResult:
+    """
+    A parsed page: the rendered HTML node tree plus metadata gathered in the
+    same pass over the document.
+
+    Attributes:
+        html_node (ParentNode): The "div" node of the page, or None when the
+            page was rendered straight to HTML fragments
+        title (str): Text of the first level 1 heading, or None if there is
+            none
+        outline (list): (level, text) of every heading, in document order
+        word_count (int): Whitespace-separated words in the text of every
+            block, code blocks included, counted before inline markup is
+            removed
+        links (list): Link URLs, in document order, as written in the markdown
+        images (list): Image URLs, in document order, as written in the
+            markdown
+    """
+
+    def __init__(self, html_node=None):
+        self.html_node = html_node
+        self.title = None
+        self.outline = []
+        self.word_count = 0
+        self.links = []
+        self.images = []
+
+    @property
+    def urls(self):
+        """
+        Returns:
+            list: Link URLs followed by image URLs
+        """
+        return self.links + self.images
+
+    def to_dict(self):
+        """
+        The metadata as a JSON-serializable dict (the node tree is left out).
+        """
+        return {
+            "title": self.title,
+            "outline": self.outline,
+            "word_count": self.word_count,
+            "links": self.links,
+            "images": self.images,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        page = cls()
+        page.title = data["title"]
+        page.outline = [(level, text) for level, text in data["outline"]]
+        page.word_count = data["word_count"]
+        page.links = list(data["links"])
+        page.images = list(data["images"])
+        return page
+
+    def add_heading(self, level, text):
+        self.outline.append((level, text.strip()))
+        if level == 1 and self.title is None:
+            # Like extract_title, only the heading's first line is the title
+            self.title = text.split("\n", 1)[0].strip()
+
+    def add_text(self, text):
+        self.word_count += len(text.split())
+
+    def add_url(self, text_type, url):
+        if text_type == TextType.LINK:
+            self.links.append(url)
+        elif text_type == TextType.IMAGE:
+            self.images.append(url)
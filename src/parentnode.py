@@ -2,16 +2,45 @@ from htmlnode import HTMLNode
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, value=None, children=children, props=props)
 
-    def to_html(self):
+    def start_tag(self):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         if self.children is None:
             raise ValueError("ParentNode mus have children")
 
         props_str = "" if self.props is None else f" {self.props_to_html()}"
-        result = f"<{self.tag}{props_str}>{''.join(child.to_html() for child in self.children)}</{self.tag}>"
+        return f"<{self.tag}{props_str}>"
+
+    def render(self, write):
+        """
+        Emit the HTML for this subtree fragment by fragment.
 
-        return result
+        The tree is walked with an explicit stack instead of recursion, so
+        deeply nested nodes cannot hit the recursion limit and no level
+        builds a copy of its subtree's HTML. Children may be any iterable,
+        including a generator producing nodes lazily.
+        """
+        write(self.start_tag())
+        stack = [(iter(self.children), f"</{self.tag}>")]
+
+        while stack:
+            children, end_tag = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    write(child.start_tag())
+                    stack.append((iter(child.children), f"</{child.tag}>"))
+                    break
+                write(child.to_html())
+            else:
+                stack.pop()
+                write(end_tag)
+
+    def to_html(self):
+        parts = []
+        self.render(parts.append)
+        return "".join(parts)
@@ -0,0 +1,250 @@
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from build_manifest import hash_bytes
+from output_changes import DELETED, UNCHANGED, write_if_changed
+
+# Text formats worth serving precompressed; images and fonts are already
+# compressed
+COMPRESSIBLE_EXTENSIONS = frozenset(
+    {".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt"}
+)
+
+DEFAULT_ETAGS_NAME = "etags.json"
+
+# Bump when the layout of the ETag manifest changes
+_MANIFEST_FORMAT = 1
+
+
+def gzip_bytes(data, level=9):
+    """
+    Returns:
+        bytes: data compressed in the gzip format with zlib. The header holds
+        no timestamp or file name, so equal inputs give equal outputs.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def etag(digest):
+    """
+    Returns:
+        str: Strong ETag (quotes included) for content with the given hash
+    """
+    return f'"{digest[:20]}"'
+
+
+class PrecompressStats:
+    def __init__(self):
+        self.files_compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.files_skipped = 0
+        self.files_removed = 0
+
+    def __repr__(self):
+        return (
+            f"PrecompressStats(compressed={self.files_compressed} files/"
+            f"{self.bytes_in} -> {self.bytes_out} bytes, "
+            f"skipped={self.files_skipped} files, removed={self.files_removed} files)"
+        )
+
+
+def _load_manifest(path, level):
+    """
+    The entries of the previous ETag manifest, or none if it is missing,
+    unreadable, outdated or was written for another compression level.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("format") != _MANIFEST_FORMAT or data.get("level") != level:
+        return {}
+    return data.get("files", {})
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def _compress_file(path, stat, level):
+    """
+    Hash path and write its gzip sibling, or remove the sibling when
+    compression does not make the file smaller.
+
+    Returns:
+        tuple: The manifest entry of path and the status of the sibling
+        (see write_if_changed; DELETED if removed, None if there was none)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hash_bytes(data)
+
+    compressed = gzip_bytes(data, level)
+    gz_path = path + ".gz"
+    if len(compressed) < len(data):
+        status = write_if_changed(gz_path, compressed)
+        gzip_size = len(compressed)
+    else:
+        status = DELETED if _remove(gz_path) else None
+        gzip_size = None
+
+    entry = {
+        "etag": etag(digest),
+        "hash": digest,
+        "size": len(data),
+        "mtime_ns": stat.st_mtime_ns,
+        "gzip_size": gzip_size,
+    }
+    return entry, status
+
+
+def _is_unchanged(path, stat, entry):
+    """
+    Whether path still has the content entry was recorded for. Size and
+    mtime are compared first; the file is only hashed when those differ.
+    """
+    if entry is None or stat.st_size != entry["size"]:
+        return False
+    if entry["gzip_size"] is not None and not os.path.exists(path + ".gz"):
+        return False
+    if stat.st_mtime_ns == entry["mtime_ns"]:
+        return True
+    with open(path, "rb") as f:
+        if hash_bytes(f.read()) != entry["hash"]:
+            return False
+    entry["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def remove_precompressed(output_dir, manifest_path=None, changes=None):
+    """
+    Undo precompress_output: delete the gzip siblings listed in the ETag
+    manifest and the manifest itself, so a build without precompression
+    leaves no stale .gz files for servers to prefer over changed pages.
+
+    Args:
+        output_dir (str): Output directory
+        manifest_path (str): Path of the ETag manifest (default: etags.json
+            in output_dir)
+        changes (OutputChanges): Optional record of the files deleted
+
+    Returns:
+        int: Number of gzip siblings removed
+    """
+    if manifest_path is None:
+        manifest_path = os.path.join(output_dir, DEFAULT_ETAGS_NAME)
+    if not os.path.exists(manifest_path):
+        return 0
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            files = json.load(f).get("files", {})
+    except (OSError, ValueError, AttributeError):
+        files = {}
+
+    removed = 0
+    for rel_path in files:
+        gz_path = os.path.join(output_dir, rel_path + ".gz")
+        if _remove(gz_path):
+            removed += 1
+            if changes is not None:
+                changes.record(gz_path, DELETED)
+    if _remove(manifest_path) and changes is not None:
+        changes.record(manifest_path, DELETED)
+    return removed
+
+
+def precompress_output(
+    output_dir, level=9, jobs=None, manifest_path=None, changes=None
+):
+    """
+    Write a gzip sibling (index.html.gz next to index.html) for every text
+    file in output_dir that compression makes smaller, and an ETag manifest
+    for static servers.
+
+    Files whose content did not change since the last run (per the previous
+    manifest, see _is_unchanged) are not recompressed. The others are
+    compressed concurrently; zlib releases the GIL while it works. Siblings
+    of files that no longer exist are removed.
+
+    The manifest maps every text file's path, relative to output_dir, to
+    its ETag, content hash, size and compressed size (null without a
+    sibling), plus the mtime used to skip unchanged files.
+
+    Args:
+        output_dir (str): Output directory
+        level (int): zlib compression level, 1 (fastest) to 9 (smallest)
+        jobs (int): Number of compression threads (default: like
+            ThreadPoolExecutor)
+        manifest_path (str): Where to write the ETag manifest (default:
+            etags.json in output_dir)
+        changes (OutputChanges): Optional record of the siblings and the
+            manifest added, changed and deleted
+
+    Returns:
+        PrecompressStats: Number of files and bytes compressed, skipped and
+        removed
+    """
+    if manifest_path is None:
+        manifest_path = os.path.join(output_dir, DEFAULT_ETAGS_NAME)
+    previous = _load_manifest(manifest_path, level)
+    stats = PrecompressStats()
+    files = {}
+    to_compress = []
+
+    for root, dirs, names in os.walk(output_dir):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            if os.path.abspath(path) == os.path.abspath(manifest_path):
+                continue
+            rel_path = os.path.relpath(path, output_dir)
+            stat = os.stat(path)
+            entry = previous.get(rel_path)
+            if _is_unchanged(path, stat, entry):
+                files[rel_path] = entry
+                stats.files_skipped += 1
+            else:
+                to_compress.append((rel_path, path, stat))
+
+    with ThreadPoolExecutor(jobs) as executor:
+        results = executor.map(
+            lambda item: _compress_file(item[1], item[2], level), to_compress
+        )
+        for (rel_path, path, _), (entry, status) in zip(to_compress, results):
+            files[rel_path] = entry
+            stats.files_compressed += 1
+            stats.bytes_in += entry["size"]
+            stats.bytes_out += entry["gzip_size"] or entry["size"]
+            if changes is not None and status not in (None, UNCHANGED):
+                changes.record(path + ".gz", status)
+
+    for rel_path in previous:
+        if rel_path in files:
+            continue
+        gz_path = os.path.join(output_dir, rel_path + ".gz")
+        if _remove(gz_path):
+            stats.files_removed += 1
+            if changes is not None:
+                changes.record(gz_path, DELETED)
+
+    data = json.dumps(
+        {"format": _MANIFEST_FORMAT, "level": level, "files": files},
+        indent=1,
+        sort_keys=True,
+    ).encode("utf-8")
+    status = write_if_changed(manifest_path, data)
+    if changes is not None and status != UNCHANGED:
+        changes.record(manifest_path, status)
+
+    return stats
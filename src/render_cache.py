@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+
+from build_manifest import GENERATOR_VERSION, hash_bytes
+from page_result import PageResult
+
+DEFAULT_RENDER_CACHE_DIR = os.path.join(".ssg-cache", "render")
+DEFAULT_RENDER_CACHE_SIZE = 64 * 1024 * 1024
+
+# Bump when the layout of cache entries changes
+_ENTRY_FORMAT = "1"
+
+# Temporary files older than this were left behind by a killed writer
+_STALE_TMP_SECONDS = 3600
+
+
+class RenderCache:
+    """
+    Content-addressed on-disk cache of rendered page content.
+
+    An entry maps a key to the content HTML and the page's metadata (see
+    PageResult). The key is derived from the markdown bytes, the entry
+    format, the generator version and the render options: the basepath
+    URLs are resolved against, the fingerprinted asset names and the image
+    sizes, if any. The template is not part of the key, so a template
+    change re-renders pages from cached content.
+
+    Entries are written to a temporary file and renamed into place, so
+    concurrent writers (parallel build workers) never expose partial entries;
+    two writers of one key write identical content. A hit refreshes the
+    entry's mtime, and prune evicts the least recently used entries once
+    the cache grows past max_bytes.
+    """
+
+    def __init__(
+        self, directory=DEFAULT_RENDER_CACHE_DIR, max_bytes=DEFAULT_RENDER_CACHE_SIZE
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, source_hash, basepath, assets=None, image_sizes=None):
+        """
+        Returns:
+            str: Cache key of a markdown source (by the hash of its bytes)
+            rendered for basepath, with the AssetMap assets and the
+            ImageSizes image_sizes if given
+        """
+        parts = [_ENTRY_FORMAT, GENERATOR_VERSION, source_hash, basepath]
+        if assets is not None:
+            parts.append(assets.digest)
+        if image_sizes is not None:
+            parts += ["images", image_sizes.digest]
+        return hash_bytes("\0".join(parts).encode("utf-8"))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """
+        Look up rendered content.
+
+        Returns:
+            tuple | None: (content HTML, PageResult without a node tree), or
+            None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                metadata = json.loads(f.readline())
+                html = f.read()
+            page = PageResult.from_dict(metadata)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, evicted by a concurrent prune, or unreadable
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return html, page
+
+    def put(self, key, html, page):
+        """
+        Store rendered content atomically. Failures are ignored: the cache is
+        an optimization and the page has been rendered anyway.
+        """
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = json.dumps(page.to_dict()) + "\n" + html
+        try:
+            try:
+                f = open(tmp, "w", encoding="utf-8", newline="")
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                f = open(tmp, "w", encoding="utf-8", newline="")
+            with f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def record(self, hit):
+        """
+        Count a lookup made by another process, e.g. a build worker.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def prune(self):
+        """
+        Evict least recently used entries until the cache fits in
+        max_bytes, and delete temporary files abandoned by killed writers.
+
+        Returns:
+            int: Total size of the remaining entries in bytes
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith(".tmp"):
+                    if now - stat.st_mtime > _STALE_TMP_SECONDS:
+                        _remove(path)
+                    continue
+                entries.append((stat.st_mtime_ns, path, stat.st_size))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            entries.sort()
+            for _, path, size in entries:
+                if total <= self.max_bytes:
+                    break
+                if _remove(path):
+                    total -= size
+                    self.evictions += 1
+        return total
+
+    def report(self):
+        return (
+            f"Render cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate() * 100:.1f}% hit rate), {self.evictions} evictions"
+        )
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
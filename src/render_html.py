@@ -0,0 +1,19 @@
+def render_html(node, writer):
+    """
+    Serialize an HTMLNode tree straight into a writer.
+
+    Args:
+        node (HTMLNode): Root of the tree
+        writer: A file object or io.StringIO (anything with write()), a list
+            that fragments are appended to, or a callable taking a fragment
+    """
+    if isinstance(writer, list):
+        write = writer.append
+    elif hasattr(writer, "write"):
+        write = writer.write
+    elif callable(writer):
+        write = writer
+    else:
+        raise TypeError(f"Unsupported writer: {writer!r}")
+
+    node.render(write)
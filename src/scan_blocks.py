@@ -0,0 +1,86 @@
+import re
+from itertools import groupby
+
+from block_to_block_type import block_type_from_lines
+
+# A maximal run of non-empty lines
+_BLOCK_PATTERN = re.compile(r"[^\n]+(?:\n[^\n]+)*")
+
+
+class Block:
+    __slots__ = ("lines", "block_type")
+
+    def __init__(self, lines, block_type=None):
+        self.lines = lines
+        self.block_type = (
+            block_type if block_type is not None else block_type_from_lines(lines)
+        )
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return False
+        return self.lines == other.lines and self.block_type == other.block_type
+
+    def __repr__(self):
+        return f"Block({self.block_type.value}, {self.lines})"
+
+
+def _strip_block(lines):
+    """
+    Strip a block the way str.strip() strips the joined text: whitespace-only
+    lines at either end disappear entirely, then the first and last remaining
+    lines lose their leading/trailing whitespace.
+    """
+    if not lines[0][0].isspace() and not lines[-1][-1].isspace():
+        return lines
+
+    start = 0
+    end = len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    if start == end:
+        return None
+
+    lines = lines[start:end]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines
+
+
+def scan_blocks(markdown):
+    """
+    Split markdown into blocks in a single pass over its lines.
+
+    Blocks are separated by empty lines; any run of them counts as one
+    separator. Both LF and CRLF line endings are accepted.
+
+    Args:
+        markdown (str | iterable): Markdown text, or an iterable of lines
+            such as an open file
+
+    Yields:
+        Block: Each block with its stripped lines and its BlockType
+    """
+    if isinstance(markdown, str):
+        if "\r" in markdown:
+            markdown = markdown.replace("\r\n", "\n")
+        for match in _BLOCK_PATTERN.finditer(markdown):
+            text = match.group().strip()
+            if text:
+                yield Block(text.split("\n"))
+        return
+
+    lines = (line.rstrip("\r\n") for line in markdown)
+
+    # groupby(bool) yields alternating runs of empty and non-empty lines
+    for not_empty, run in groupby(lines, bool):
+        if not_empty:
+            block_lines = _strip_block(list(run))
+            if block_lines:
+                yield Block(block_lines)
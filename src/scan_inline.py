@@ -0,0 +1,116 @@
+import re
+
+from textnode import TextNode, TextType
+
+# One alternation covers every inline token. Link and image bodies may not
+# contain "_", "`" or "**", because the delimiter passes of the split
+# pipeline always cut text there before links are looked for.
+_INLINE_TOKEN = re.compile(
+    r"\*\*|_|`|(!?)\[((?:[^\[\]_`*]|\*(?!\*))*)\]\(((?:[^\(\)_`*]|\*(?!\*))*)\)"
+)
+
+_ERROR_PRIORITY = ("**", "_", "`")
+
+
+def inline_tokens(text):
+    """
+    Tokenize inline markdown in a single left-to-right scan.
+
+    Returns the tokens as (text, text_type, url) tuples, the same fields
+    TextNode takes, for callers that do not need node objects. The token
+    sequence is exactly the TextNode list of the split pipeline
+    (bold -> italic -> code -> images -> links), including its precedence
+    rules: "**" is recognized everywhere, "_" only outside bold, "`" only
+    in plain text, and links/images only in plain text.
+
+    Raises:
+        ValueError: On an unbalanced delimiter, with the same message the
+            split pipeline would raise
+    """
+    tokens = []
+    errors = set()
+    bold = italic = code = False
+    start = 0
+
+    for match in _INLINE_TOKEN.finditer(text):
+        pos = match.start()
+        first = text[pos]
+
+        if first == "*":
+            if bold:
+                if pos > start:
+                    tokens.append((text[start:pos], TextType.BOLD, None))
+                bold = False
+            else:
+                if italic:
+                    errors.add("_")
+                elif code:
+                    errors.add("`")
+                elif pos > start:
+                    tokens.append((text[start:pos], TextType.TEXT, None))
+                bold = True
+                italic = code = False
+            start = match.end()
+
+        elif bold:
+            continue
+
+        elif first == "_":
+            if italic:
+                if pos > start:
+                    tokens.append((text[start:pos], TextType.ITALIC, None))
+                italic = False
+            else:
+                if code:
+                    errors.add("`")
+                elif pos > start:
+                    tokens.append((text[start:pos], TextType.TEXT, None))
+                italic = True
+                code = False
+            start = match.end()
+
+        elif italic:
+            continue
+
+        elif first == "`":
+            if pos > start:
+                text_type = TextType.CODE if code else TextType.TEXT
+                tokens.append((text[start:pos], text_type, None))
+            code = not code
+            start = match.end()
+
+        elif code:
+            continue
+
+        else:
+            if pos > start:
+                tokens.append((text[start:pos], TextType.TEXT, None))
+            bang, label, url = match.groups()
+            text_type = TextType.IMAGE if bang else TextType.LINK
+            tokens.append((label, text_type, url))
+            start = match.end()
+
+    if bold:
+        errors.add("**")
+    elif italic:
+        errors.add("_")
+    elif code:
+        errors.add("`")
+    elif start < len(text):
+        tokens.append((text[start:], TextType.TEXT, None))
+
+    for delimiter in _ERROR_PRIORITY:
+        if delimiter in errors:
+            raise ValueError(
+                f"Invalid Markdown syntax, unbalanced delimiter: {delimiter}"
+            )
+
+    return tokens
+
+
+def scan_inline(text):
+    """
+    Tokenize inline markdown in a single pass, producing the same TextNode
+    list as the split pipeline. See inline_tokens for the rules.
+    """
+    return [TextNode(*token) for token in inline_tokens(text)]
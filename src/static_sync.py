@@ -0,0 +1,289 @@
+import os
+
+from build_manifest import hash_file
+from fast_copy import copy_file, copy_files
+from minify import minify_css
+from output_changes import ADDED, UNCHANGED, write_if_changed
+
+# copy_methods keys counting stylesheets written minified, or with their
+# references rewritten (see sync_static)
+MINIFIED = "minified"
+REWRITTEN = "rewritten"
+
+
+class SyncStats:
+    def __init__(self):
+        self.files_copied = 0
+        self.bytes_copied = 0
+        self.files_skipped = 0
+        self.bytes_skipped = 0
+        self.files_removed = 0
+        # Paths, relative to the output directory, copied or removed
+        self.changed_paths = []
+        # The copied paths that did not exist before, and the removed paths
+        self.added_paths = []
+        self.removed_paths = []
+        # Copy primitive -> number of files it copied, see copy_files
+        self.copy_methods = {}
+
+    def __repr__(self):
+        return (
+            f"SyncStats(copied={self.files_copied} files/{self.bytes_copied} bytes, "
+            f"skipped={self.files_skipped} files/{self.bytes_skipped} bytes, "
+            f"removed={self.files_removed} files)"
+        )
+
+
+def _is_unchanged(src_path, dest_path, src_stat, checksum):
+    try:
+        dest_stat = os.stat(dest_path)
+    except OSError:
+        return False
+
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(src_path) == hash_file(dest_path)
+    return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def _is_stylesheet(path):
+    return os.path.splitext(path)[1].lower() == ".css"
+
+
+def _sync_stylesheet(
+    stats, src_path, dest_path, rel_path, size, minify, rewrite_css, src_rel_path
+):
+    """
+    Write the stylesheet at src_path to dest_path with its references
+    rewritten (rewrite_css(css, src_rel_path), if given) and minified (if
+    minify), unless dest_path already holds exactly that, and count the
+    outcome in stats. The output is replaced rather than written through,
+    since an earlier build with link=True may have left it hard linked to
+    src_path.
+    """
+    with open(
+        src_path, "r", encoding="utf-8", errors="surrogateescape", newline=""
+    ) as f:
+        css = f.read()
+    if rewrite_css is not None:
+        css = rewrite_css(css, src_rel_path)
+    if minify:
+        css = minify_css(css)
+    status = write_if_changed(
+        dest_path, css.encode("utf-8", "surrogateescape"), replace=True
+    )
+    if status == UNCHANGED:
+        stats.files_skipped += 1
+        stats.bytes_skipped += size
+        return
+    stats.files_copied += 1
+    stats.bytes_copied += size
+    stats.changed_paths.append(rel_path)
+    if status == ADDED:
+        stats.added_paths.append(rel_path)
+    method = MINIFIED if minify else REWRITTEN
+    stats.copy_methods[method] = stats.copy_methods.get(method, 0) + 1
+
+
+def sync_static(
+    src_dir,
+    dest_dir,
+    manifest=None,
+    checksum=False,
+    jobs=None,
+    link=False,
+    dedupe=False,
+    rename=None,
+    minify=False,
+    rewrite_css=None,
+):
+    """
+    Incrementally mirror src_dir into dest_dir.
+
+    Only new or changed files are copied; a file is unchanged when size and
+    mtime match (or size and content hash with checksum=True). Files that
+    were synced on a previous run but no longer exist in src_dir are
+    removed. Anything else in dest_dir, such as generated pages, is left
+    alone. Changed files are copied concurrently with copy_files.
+
+    Args:
+        src_dir (str): Static source directory
+        dest_dir (str): Output directory
+        manifest (BuildManifest): Optional manifest remembering which output
+            files came from src_dir; needed to detect orphans
+        checksum (bool): Compare content hashes instead of mtimes
+        jobs (int): Number of copy threads (default: see copy_files)
+        link (bool): Hard link assets instead of copying them where
+            source and output are on the same filesystem
+        dedupe (bool): Copy identical files only once, see copy_files
+        rename (callable): Optional function mapping a path relative to
+            src_dir to its path relative to dest_dir, e.g.
+            AssetMap.output_name; files keep their path otherwise
+        minify (bool): Write stylesheets minified (see minify_css); they
+            are minified on every sync and only written when the result
+            differs from the output
+        rewrite_css (callable): Optional function(css, rel_path) returning
+            the text of the stylesheet at rel_path (relative to src_dir) to
+            write, e.g. AssetMap.rewrite_css; like minify, stylesheets are
+            then rewritten on every sync
+
+    Returns:
+        SyncStats: Number of files and bytes copied, skipped and removed
+    """
+    stats = SyncStats()
+    synced = {}
+    to_copy = []
+    to_rewrite = []
+
+    if not os.path.exists(src_dir):
+        print(f"Source directory does not exist: {src_dir}")
+        return stats
+
+    for root, dirs, files in os.walk(src_dir):
+        dirs.sort()
+        rel_root = os.path.relpath(root, src_dir)
+        dest_root = dest_dir if rel_root == "." else os.path.join(dest_dir, rel_root)
+        os.makedirs(dest_root, exist_ok=True)
+
+        for name in sorted(files):
+            src_path = os.path.join(root, name)
+            if rename is None:
+                dest_path = os.path.join(dest_root, name)
+            else:
+                dest_path = os.path.join(
+                    dest_dir, rename(os.path.relpath(src_path, src_dir))
+                )
+            src_stat = os.stat(src_path)
+
+            if _is_stylesheet(name) and (minify or rewrite_css is not None):
+                to_rewrite.append((src_path, dest_path, src_stat.st_size))
+            elif _is_unchanged(src_path, dest_path, src_stat, checksum):
+                stats.files_skipped += 1
+                stats.bytes_skipped += src_stat.st_size
+            else:
+                to_copy.append((src_path, dest_path))
+                stats.files_copied += 1
+                stats.bytes_copied += src_stat.st_size
+                rel_path = os.path.relpath(dest_path, dest_dir)
+                stats.changed_paths.append(rel_path)
+                if not os.path.lexists(dest_path):
+                    stats.added_paths.append(rel_path)
+
+            synced[os.path.relpath(dest_path, dest_dir)] = src_stat.st_size
+
+    if to_copy:
+        stats.copy_methods = copy_files(to_copy, jobs, link, dedupe)
+    for src_path, dest_path, size in to_rewrite:
+        _sync_stylesheet(
+            stats,
+            src_path,
+            dest_path,
+            os.path.relpath(dest_path, dest_dir),
+            size,
+            minify,
+            rewrite_css,
+            os.path.relpath(src_path, src_dir),
+        )
+
+    if manifest is not None:
+        for rel_path in manifest.assets:
+            if rel_path in synced:
+                continue
+            orphan = os.path.join(dest_dir, rel_path)
+            if os.path.isfile(orphan):
+                print(f"Removing orphaned asset: {orphan}")
+                os.remove(orphan)
+                stats.files_removed += 1
+                stats.changed_paths.append(rel_path)
+                stats.removed_paths.append(rel_path)
+        manifest.assets = synced
+
+    return stats
+
+
+def sync_static_path(
+    src_dir, dest_dir, rel_path, manifest=None, checksum=False, minify=False
+):
+    """
+    Bring a single static path up to date: copy it if it is a new or changed
+    file, copy the changed files below it if it is a directory, and remove
+    previously synced outputs that no longer have a source.
+
+    Args:
+        src_dir (str): Static source directory
+        dest_dir (str): Output directory
+        rel_path (str): Path relative to src_dir that changed ("" for all)
+        manifest (BuildManifest): Optional manifest remembering which output
+            files came from src_dir; needed to remove deleted assets
+        checksum (bool): Compare content hashes instead of mtimes
+        minify (bool): Write stylesheets minified, see sync_static
+
+    Returns:
+        SyncStats: Number of files and bytes copied, skipped and removed
+    """
+    stats = SyncStats()
+    src_path = os.path.join(src_dir, rel_path)
+
+    if os.path.isdir(src_path):
+        rel_paths = [
+            os.path.relpath(os.path.join(root, name), src_dir)
+            for root, _, files in os.walk(src_path)
+            for name in files
+        ]
+    elif os.path.isfile(src_path):
+        rel_paths = [rel_path]
+    else:
+        rel_paths = []
+
+    for rel_file in sorted(rel_paths):
+        src_file = os.path.join(src_dir, rel_file)
+        dest_file = os.path.join(dest_dir, rel_file)
+        src_stat = os.stat(src_file)
+
+        if minify and _is_stylesheet(src_file):
+            os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+            _sync_stylesheet(
+                stats,
+                src_file,
+                dest_file,
+                rel_file,
+                src_stat.st_size,
+                minify,
+                None,
+                rel_file,
+            )
+        elif _is_unchanged(src_file, dest_file, src_stat, checksum):
+            stats.files_skipped += 1
+            stats.bytes_skipped += src_stat.st_size
+        else:
+            print(f"Copying file: {src_file} -> {dest_file}")
+            if not os.path.lexists(dest_file):
+                stats.added_paths.append(rel_file)
+            os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+            method = copy_file(src_file, dest_file)
+            stats.copy_methods[method] = stats.copy_methods.get(method, 0) + 1
+            stats.files_copied += 1
+            stats.bytes_copied += src_stat.st_size
+            stats.changed_paths.append(rel_file)
+
+        if manifest is not None:
+            manifest.assets[rel_file] = src_stat.st_size
+
+    if manifest is not None:
+        prefix = rel_path + os.sep
+        for asset in list(manifest.assets):
+            if rel_path and asset != rel_path and not asset.startswith(prefix):
+                continue
+            if os.path.isfile(os.path.join(src_dir, asset)):
+                continue
+            orphan = os.path.join(dest_dir, asset)
+            if os.path.isfile(orphan):
+                print(f"Removing orphaned asset: {orphan}")
+                os.remove(orphan)
+                stats.files_removed += 1
+                stats.changed_paths.append(asset)
+                stats.removed_paths.append(asset)
+            del manifest.assets[asset]
+
+    return stats
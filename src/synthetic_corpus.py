@@ -0,0 +1,147 @@
+import os
+import random
+
+WORDS = (
+    "the ring hobbit shire wizard elf dwarf mountain river forest road tower "
+    "king sword council journey shadow light star song tale gate bridge hall "
+    "fire stone tree horse ship harbour city wall map letter friend enemy"
+).split()
+
+
+class CorpusOptions:
+    """
+    Shape of a synthetic corpus. Densities and ratios are probabilities in
+    the range 0..1; boilerplate is the number of blocks (link lists and
+    footers) repeated verbatim at the end of every page.
+    """
+
+    def __init__(
+        self,
+        pages=100,
+        blocks_per_page=20,
+        paragraph_words=60,
+        link_density=0.05,
+        image_density=0.01,
+        list_ratio=0.2,
+        code_ratio=0.1,
+        nesting=2,
+        boilerplate=0,
+        seed=0,
+    ):
+        self.pages = pages
+        self.blocks_per_page = blocks_per_page
+        self.paragraph_words = paragraph_words
+        self.link_density = link_density
+        self.image_density = image_density
+        self.list_ratio = list_ratio
+        self.code_ratio = code_ratio
+        self.nesting = nesting
+        self.boilerplate = boilerplate
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _inline_text(rng, options, word_count):
+    words = []
+    for _ in range(word_count):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < options.link_density:
+            words.append(f"[{word}](/blog/{rng.choice(WORDS)})")
+        elif roll < options.link_density + options.image_density:
+            words.append(f"![{word}](/images/{word}.png)")
+        elif roll < options.link_density + options.image_density + 0.05:
+            words.append(rng.choice(("**{}**", "_{}_", "`{}`")).format(word))
+        else:
+            words.append(word)
+    return " ".join(words)
+
+
+def _block(rng, options):
+    roll = rng.random()
+
+    if roll < options.code_ratio:
+        lines = [
+            f"func {rng.choice(WORDS)}() {{ return {rng.randint(0, 99)} }}"
+            for _ in range(rng.randint(2, 8))
+        ]
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    if roll < options.code_ratio + options.list_ratio:
+        count = rng.randint(2, 8)
+        if rng.random() < 0.5:
+            items = [f"- {_inline_text(rng, options, 6)}" for _ in range(count)]
+        else:
+            items = [f"{i + 1}. {_inline_text(rng, options, 6)}" for i in range(count)]
+        return "\n".join(items)
+
+    if roll < options.code_ratio + options.list_ratio + 0.05:
+        return f"> {_inline_text(rng, options, 12)}\n> {_inline_text(rng, options, 12)}"
+
+    if roll < options.code_ratio + options.list_ratio + 0.15:
+        return f"## {_inline_text(rng, options, 4)}"
+
+    # Paragraph, wrapped over several lines like hand-written markdown
+    text = _inline_text(rng, options, max(1, options.paragraph_words))
+    words = text.split(" ")
+    return "\n".join(" ".join(words[i : i + 12]) for i in range(0, len(words), 12))
+
+
+def _boilerplate_blocks(rng, options):
+    """
+    Blocks shared by every page, like navigation link lists and footers.
+    """
+    blocks = []
+    for i in range(options.boilerplate):
+        if i % 2 == 0:
+            links = [f"- [{word.title()}](/{word})" for word in rng.sample(WORDS, 5)]
+            blocks.append("\n".join(links))
+        else:
+            blocks.append(_inline_text(rng, options, 12))
+    return blocks
+
+
+def generate_page_markdown(rng, options):
+    """
+    Generate one markdown page: an H1 title followed by a mix of blocks.
+    """
+    blocks = [f"# {rng.choice(WORDS).title()} {rng.choice(WORDS)}"]
+    for _ in range(options.blocks_per_page):
+        blocks.append(_block(rng, options))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(options):
+    """
+    Generate a deterministic corpus for the given options.
+
+    Returns:
+        list: (relative path, markdown) pairs; pages are spread over
+        directories up to options.nesting levels deep
+    """
+    rng = random.Random(options.seed)
+    # Drawn from a separate generator so pages do not depend on boilerplate
+    boilerplate = _boilerplate_blocks(random.Random(-options.seed - 1), options)
+    corpus = []
+    for i in range(options.pages):
+        depth = rng.randint(0, options.nesting) if options.nesting > 0 else 0
+        dirs = [f"section{rng.randint(0, 3)}" for _ in range(depth)]
+        rel_path = os.path.join(*dirs, f"page{i}.md")
+        markdown = generate_page_markdown(rng, options)
+        if boilerplate:
+            markdown += "\n" + "\n\n".join(boilerplate) + "\n"
+        corpus.append((rel_path, markdown))
+    return corpus
+
+
+def write_corpus(corpus, dest_dir):
+    """
+    Write a generated corpus into dest_dir as a content directory.
+    """
+    for rel_path, markdown in corpus:
+        path = os.path.join(dest_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from asset_fingerprint import AssetMap, fingerprint_assets, fingerprinted_name
+from compile_template import compile_template
+from generate_page import generate_pages_pipelined
+from static_sync import sync_static
+from url_resolver import url_resolver
+
+ASSETS = AssetMap(
+    {"index.css": "index.0123456789.css", "images/a.png": "images/a.abcdef0123.png"}
+)
+
+
+class TestAssetMap(unittest.TestCase):
+    def test_fingerprinted_name(self):
+        self.assertEqual(
+            fingerprinted_name("images/tom.png", "0123456789abcdef"),
+            "images/tom.0123456789.png",
+        )
+
+    def test_resolve(self):
+        self.assertEqual(ASSETS.resolve("/index.css"), "/index.0123456789.css")
+        self.assertEqual(
+            ASSETS.resolve("/images/a.png?v=1#top"), "/images/a.abcdef0123.png?v=1#top"
+        )
+        for url in ("/blog", "index.css", "//cdn/index.css", "https://x/index.css"):
+            self.assertEqual(ASSETS.resolve(url), url)
+
+    def test_output_name(self):
+        self.assertEqual(
+            ASSETS.output_name(os.path.join("images", "a.png")),
+            os.path.join("images", "a.abcdef0123.png"),
+        )
+        self.assertEqual(ASSETS.output_name("robots.txt"), "robots.txt")
+
+    def test_url_resolver_applies_assets_before_basepath(self):
+        resolve = url_resolver("/site/", ASSETS)
+        self.assertEqual(resolve("/images/a.png"), "/site/images/a.abcdef0123.png")
+        self.assertEqual(resolve("/blog"), "/site/blog")
+        self.assertEqual(
+            url_resolver("/", ASSETS)("/index.css"), ASSETS.resolve("/index.css")
+        )
+
+    def test_rewrite_css(self):
+        assets = AssetMap(
+            {
+                "css/site.css": "css/site.1111111111.css",
+                "images/a.png": "images/a.abcdef0123.png",
+                "fonts/f.woff2": "fonts/f.2222222222.woff2",
+            }
+        )
+        css = (
+            '@import "site.css";\n'
+            "body { background: url(/images/a.png?v=1) }\n"
+            "@font-face { src: url('../fonts/f.woff2#x') }\n"
+            'p { background: url( "../images/a.png" ) }\n'
+            "a { background: url(data:image/png;base64,AA) url(/missing.png) }\n"
+            "b { background: url(//cdn/images/a.png) url(../../images/a.png) }"
+        )
+        self.assertEqual(
+            assets.rewrite_css(css, os.path.join("css", "main.css")),
+            '@import "site.1111111111.css";\n'
+            "body { background: url(/images/a.abcdef0123.png?v=1) }\n"
+            "@font-face { src: url('../fonts/f.2222222222.woff2#x') }\n"
+            'p { background: url( "../images/a.abcdef0123.png" ) }\n'
+            "a { background: url(data:image/png;base64,AA) url(/missing.png) }\n"
+            "b { background: url(//cdn/images/a.png) url(../../images/a.png) }",
+        )
+
+    def test_template_references(self):
+        html = '<link href="/index.css"><a href="/">{{ Content }}</a>'
+        template = compile_template(html, "/site/", "hash", ASSETS)
+        self.assertEqual(
+            template.render("", "x"),
+            '<link href="/site/index.0123456789.css"><a href="/site/">x</a>',
+        )
+        self.assertNotEqual(template.source_hash, "hash")
+        renamed = AssetMap({"index.css": "index.9999999999.css"})
+        self.assertNotEqual(
+            compile_template(html, "/site/", "hash", renamed).source_hash,
+            template.source_hash,
+        )
+        self.assertEqual(compile_template(html, "/site/", "hash").source_hash, "hash")
+
+
+class TestFingerprintAssets(unittest.TestCase):
+    def setUp(self):
+        """Set up a static tree, content and a template"""
+        self.test_dir = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.test_dir, "static")
+        self.content_dir = os.path.join(self.test_dir, "content")
+        self.public_dir = os.path.join(self.test_dir, "public")
+        os.makedirs(os.path.join(self.static_dir, "images"))
+        os.makedirs(self.content_dir)
+        self._write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self._write(os.path.join(self.static_dir, "images", "a.png"), "png")
+        self._write(os.path.join(self.static_dir, "robots.txt"), "User-agent: *")
+        self._write(
+            os.path.join(self.content_dir, "index.md"), "# Home\n\n![a](/images/a.png)"
+        )
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        self._write(self.template_path, '<link href="/index.css">{{ Content }}')
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_changed_files_are_reported(self):
+        records = {}
+        assets, changed = fingerprint_assets(self.static_dir, records)
+        self.assertEqual(sorted(assets.names), ["images/a.png", "index.css"])
+        self.assertEqual(changed, [os.path.join("images", "a.png"), "index.css"])
+
+        self.assertEqual(fingerprint_assets(self.static_dir, records)[1], [])
+
+        self._write(os.path.join(self.static_dir, "index.css"), "body { margin: 0 }")
+        os.remove(os.path.join(self.static_dir, "images", "a.png"))
+        new_assets, changed = fingerprint_assets(self.static_dir, records)
+        self.assertEqual(changed, [os.path.join("images", "a.png"), "index.css"])
+        self.assertNotEqual(new_assets.names["index.css"], assets.names["index.css"])
+        self.assertNotEqual(new_assets.digest, assets.digest)
+
+    def test_minify_renames_stylesheets(self):
+        records = {}
+        assets, _ = fingerprint_assets(self.static_dir, records)
+        minified, changed = fingerprint_assets(self.static_dir, records, minify=True)
+        self.assertEqual(changed, ["index.css"])
+        self.assertNotEqual(minified.names["index.css"], assets.names["index.css"])
+        self.assertEqual(minified.names["images/a.png"], assets.names["images/a.png"])
+
+    def test_stylesheet_name_covers_referenced_assets(self):
+        records = {}
+        css_path = os.path.join(self.static_dir, "index.css")
+        self._write(css_path, "body { background: url(images/a.png) }")
+        assets, _ = fingerprint_assets(self.static_dir, records)
+
+        self._write(os.path.join(self.static_dir, "images", "a.png"), "new png")
+        renamed, changed = fingerprint_assets(self.static_dir, records)
+        self.assertEqual(changed, [os.path.join("images", "a.png"), "index.css"])
+        self.assertNotEqual(renamed.names["index.css"], assets.names["index.css"])
+
+    def test_build_with_fingerprints(self):
+        self._write(
+            os.path.join(self.static_dir, "index.css"),
+            "body { background: url(/images/a.png) }",
+        )
+        assets, _ = fingerprint_assets(self.static_dir)
+        sync_static(
+            self.static_dir,
+            self.public_dir,
+            rename=assets.output_name,
+            rewrite_css=assets.rewrite_css,
+        )
+        generate_pages_pipelined(
+            self.content_dir,
+            self.template_path,
+            self.public_dir,
+            "/site/",
+            assets=assets,
+        )
+
+        css = assets.names["index.css"]
+        png = assets.names["images/a.png"]
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, css)))
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, png)))
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "robots.txt")))
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "index.css")))
+        with open(os.path.join(self.public_dir, "index.html")) as f:
+            html = f.read()
+        self.assertIn(f'href="/site/{css}"', html)
+        self.assertIn(f'src="/site/{png}"', html)
+        with open(os.path.join(self.public_dir, css)) as f:
+            self.assertEqual(f.read(), f"body {{ background: url(/{png}) }}")
+
+
+if __name__ == "__main__":
+    unittest.main()
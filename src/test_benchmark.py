@@ -0,0 +1,34 @@
+import json
+import unittest
+
+from benchmark import run_benchmarks
+from synthetic_corpus import CorpusOptions
+
+STAGES = [
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "text_node_to_html_node",
+    "to_html",
+    "markdown_to_html_inline_cache",
+    "extract_title",
+    "template_fill",
+    "file_io",
+]
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_benchmarks(self):
+        results = run_benchmarks(CorpusOptions(pages=3, blocks_per_page=5), repeat=1)
+
+        # Results must be machine-readable
+        self.assertEqual(json.loads(json.dumps(results)), results)
+        self.assertEqual(results["corpus"]["pages"], 3)
+        for stage in STAGES:
+            self.assertIn(stage, results["stages"])
+            self.assertGreaterEqual(results["stages"][stage]["seconds"], 0)
+        self.assertGreater(results["inline_cache"]["misses"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
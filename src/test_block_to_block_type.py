@@ -1,11 +1,32 @@
+import random
 import unittest
 
 from block_to_block_type import (  # adjust filename if needed
     BlockType,
+    _is_heading,
     block_to_block_type,
+    block_type_from_lines,
 )
 
 
+def _reference_block_type(lines):
+    """
+    The original multi-pass classifier, kept to check the table-driven one.
+    """
+    first = lines[0]
+    if first.startswith("#") and _is_heading(lines):
+        return BlockType.HEADING
+    if first.startswith("```") and lines[-1].endswith("```"):
+        return BlockType.CODE
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") for line in lines):
+        return BlockType.UNORDERED_LIST
+    if all(line.startswith(str(i + 1) + ". ") for i, line in enumerate(lines)):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading(self):
         block = "# This is a heading"
@@ -31,6 +52,47 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "This is just a normal paragraph with no markdown syntax."
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_heading_needs_text_after_hashes(self):
+        self.assertEqual(block_to_block_type("#######  x"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("# "), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("###### x"), BlockType.HEADING)
+
+    def test_block_type_from_lines(self):
+        self.assertEqual(
+            block_type_from_lines(["1. one", "2. two"]), BlockType.ORDERED_LIST
+        )
+        self.assertEqual(
+            block_type_from_lines(["1. one", "3. three"]), BlockType.PARAGRAPH
+        )
+
+    def test_ruled_out_by_a_later_line(self):
+        self.assertEqual(block_to_block_type("> a\nb"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("- a\n-b"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("```\ncode"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("-a"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
+
+    def test_long_ordered_list(self):
+        lines = [f"{i}. item" for i in range(1, 131)]
+        self.assertEqual(block_type_from_lines(lines), BlockType.ORDERED_LIST)
+        lines[120] = "999. item"
+        self.assertEqual(block_type_from_lines(lines), BlockType.PARAGRAPH)
+
+    def test_matches_reference_classifier(self):
+        pieces = [
+            "#", "# ", "##", "####### ", "```", ">", "> ", "-", "- ", "1. ",
+            "2. ", "3. ", "1.", "10. ", " ", "a", "x y",
+        ]  # fmt: skip
+        rng = random.Random(5)
+        for _ in range(5000):
+            lines = [
+                "".join(rng.choice(pieces) for _ in range(rng.randint(0, 4)))
+                for _ in range(rng.randint(1, 4))
+            ]
+            self.assertEqual(
+                block_type_from_lines(lines), _reference_block_type(lines), lines
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
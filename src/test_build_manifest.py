@@ -0,0 +1,179 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary directory with one source and one output"""
+        self.test_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.test_dir, "cache", "manifest.json")
+        self.source = os.path.join(self.test_dir, "page.md")
+        self.output = os.path.join(self.test_dir, "page.html")
+        with open(self.source, "w") as f:
+            f.write("# Page")
+        with open(self.output, "w") as f:
+            f.write("<h1>Page</h1>")
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _record(self, manifest):
+        manifest.record_page(
+            self.source, self.output, hash_file(self.source), "tpl", "/"
+        )
+
+    def test_unknown_page_is_not_fresh(self):
+        manifest = BuildManifest(self.manifest_path)
+        self.assertFalse(manifest.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+    def test_recorded_page_is_fresh(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        self.assertTrue(manifest.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+    def test_changed_inputs_are_not_fresh(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        self.assertFalse(manifest.is_page_fresh(self.source, self.output, "new", "/"))
+        self.assertFalse(
+            manifest.is_page_fresh(self.source, self.output, "tpl", "/site/")
+        )
+
+    def test_touched_but_identical_source_is_fresh(self):
+        """A changed mtime falls back to the content hash"""
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertTrue(manifest.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+    def test_edited_source_is_not_fresh(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        with open(self.source, "w") as f:
+            f.write("# Changed page")
+        self.assertFalse(manifest.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+    def test_missing_output_is_not_fresh(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        os.remove(self.output)
+        self.assertFalse(manifest.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+    def test_save_and_load_roundtrip(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        manifest.save()
+
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertEqual(loaded.pages, manifest.pages)
+        self.assertTrue(loaded.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+    def test_dependents_are_invalidated_and_persisted(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record_page(
+            self.source,
+            self.output,
+            hash_file(self.source),
+            "tpl",
+            "/",
+            "template.html",
+        )
+        manifest.save()
+
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertEqual(loaded.dependencies.dependents("template.html"), [self.output])
+        self.assertEqual(loaded.invalidate_dependents(["other.html"]), set())
+        self.assertTrue(loaded.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+        # Outputs already rebuilt from the changed input stay fresh
+        self.assertEqual(
+            loaded.invalidate_dependents(["template.html"], exclude=[self.output]),
+            set(),
+        )
+        self.assertTrue(loaded.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+        self.assertEqual(loaded.invalidate_dependents(["template.html"]), {self.output})
+        self.assertFalse(loaded.is_page_fresh(self.source, self.output, "tpl", "/"))
+
+        # Removing the page drops it from the graph as well
+        loaded.remove_page(self.source)
+        self.assertEqual(loaded.dependencies.outputs, {})
+
+    def test_load_missing_or_corrupt_manifest(self):
+        self.assertEqual(BuildManifest.load(self.manifest_path).pages, {})
+
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(BuildManifest.load(self.manifest_path).pages, {})
+
+    def test_remove_stale_pages(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        manifest.save()
+
+        # Next build never sees the source again
+        loaded = BuildManifest.load(self.manifest_path)
+        removed = loaded.remove_stale_pages()
+
+        self.assertEqual(removed, [self.output])
+        self.assertFalse(os.path.exists(self.output))
+        self.assertEqual(loaded.pages, {})
+
+    def test_only_manifests_read_from_disk_are_loaded(self):
+        self.assertFalse(BuildManifest.load(self.manifest_path).loaded)
+        BuildManifest(self.manifest_path).save()
+        self.assertTrue(BuildManifest.load(self.manifest_path).loaded)
+
+    def test_remove_untracked_outputs(self):
+        """Without a manifest, outputs of removed sources are found by walking"""
+        output_dir = os.path.join(self.test_dir, "docs")
+        files = {
+            "index.html": "page",
+            "index.html.gz": "gz",
+            "index.css": "css",
+            "assets.json": "{}",
+            os.path.join("contact", "index.html"): "removed page",
+            os.path.join("contact", "index.html.gz"): "removed gz",
+            os.path.join("images", "tom.png"): "removed asset",
+            os.path.join("images", "a.png"): "asset",
+        }
+        for rel_path, content in files.items():
+            path = os.path.join(output_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.record_page(
+            self.source,
+            os.path.join(output_dir, "index.html"),
+            hash_file(self.source),
+            "tpl",
+            "/",
+        )
+        manifest.assets = {"index.css": 3, os.path.join("images", "a.png"): 5}
+        removed = manifest.remove_untracked_outputs(output_dir, ["assets.json"])
+
+        self.assertEqual(
+            removed,
+            [
+                os.path.join("contact", "index.html"),
+                os.path.join("contact", "index.html.gz"),
+                os.path.join("images", "tom.png"),
+            ],
+        )
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "contact")))
+        for rel_path in ("index.html", "index.html.gz", "index.css", "assets.json"):
+            self.assertTrue(os.path.exists(os.path.join(output_dir, rel_path)))
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "images", "a.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from build_profile import BuildProfile
+
+
+class TestBuildProfile(unittest.TestCase):
+    def test_record_aggregates_stages_and_pages(self):
+        profile = BuildProfile()
+        profile.record("read", 0.5, "a.md")
+        profile.record("to_html", 1.0, "a.md")
+        profile.record("read", 0.25, "b.md")
+        profile.record("copy_static", 2.0)
+
+        self.assertEqual(
+            profile.stage_totals, {"read": 0.75, "to_html": 1.0, "copy_static": 2.0}
+        )
+        self.assertEqual(profile.page_totals, {"a.md": 1.5, "b.md": 0.25})
+        self.assertEqual(profile.slowest_pages(1), [("a.md", 1.5)])
+
+    def test_stage_times_block(self):
+        profile = BuildProfile()
+        with profile.stage("write", "a.md"):
+            pass
+
+        self.assertGreaterEqual(profile.stage_totals["write"], 0)
+        self.assertIn("a.md", profile.page_totals)
+
+    def test_stage_records_on_exception(self):
+        profile = BuildProfile()
+        with self.assertRaises(ValueError):
+            with profile.stage("read", "a.md"):
+                raise ValueError("boom")
+
+        self.assertIn("read", profile.stage_totals)
+
+    def test_report(self):
+        profile = BuildProfile()
+        profile.record("write", 1.0, "a.md")
+        profile.record("read", 3.0, "b.md")
+        report = profile.report(top=1)
+
+        self.assertIn("2 pages", report)
+        # Stages are listed in pipeline order, not by time
+        self.assertLess(report.index("read"), report.index("write"))
+        self.assertIn("75.0%", report)
+        self.assertIn("Slowest 1 pages:", report)
+        self.assertIn("b.md", report)
+        self.assertNotIn("a.md", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
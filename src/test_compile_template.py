@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from compile_template import compile_template, load_template, rewrite_basepath
+
+
+class TestCompileTemplate(unittest.TestCase):
+    def test_segments_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}!")
+        self.assertEqual(template.segments, ["<title>", "</title>", "!"])
+        self.assertEqual(template.slots, ["{{ Title }}", "{{ Content }}"])
+
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title><p>{{ Content }}</p>")
+        self.assertEqual(
+            template.render("Hi", "<b>x</b>"), "<title>Hi</title><p><b>x</b></p>"
+        )
+
+    def test_repeated_slots(self):
+        template = compile_template("{{ Title }}|{{ Content }}|{{ Title }}")
+        self.assertEqual(template.render("T", "C"), "T|C|T")
+
+    def test_no_slots(self):
+        template = compile_template("<html></html>")
+        self.assertEqual(template.render("T", "C"), "<html></html>")
+
+    def test_render_bytes_matches_render(self):
+        template = compile_template("<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(
+            template.render_bytes("Café", "naïve"),
+            template.render("Café", "naïve").encode("utf-8"),
+        )
+
+    def test_stream(self):
+        template = compile_template("<h1>{{ Title }}</h1>{{ Content }}<hr>")
+        parts = []
+        template.stream(parts.append, "T", lambda write: write("<p>x</p>"))
+        self.assertEqual("".join(parts), template.render("T", "<p>x</p>"))
+
+    def test_basepath_rewritten_at_compile_time(self):
+        template = compile_template(
+            '<link href="/a.css"><img src="/b.png">{{ Content }}', "/site/"
+        )
+        self.assertEqual(
+            template.segments[0], '<link href="/site/a.css"><img src="/site/b.png">'
+        )
+        # Slot values are inserted as-is
+        self.assertEqual(template.render("", 'href="/x"')[-9:], 'href="/x"')
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(rewrite_basepath('<a href="/x">', "/"), '<a href="/x">')
+        self.assertEqual(
+            rewrite_basepath('<a href="/x"><img src="/y">', "/s/"),
+            '<a href="/s/x"><img src="/s/y">',
+        )
+        # Only attribute values are rewritten, and only root-relative ones
+        self.assertEqual(
+            rewrite_basepath(
+                '<a href="//cdn/x">href="/</a><script src="https://a/b.js">', "/s/"
+            ),
+            '<a href="//cdn/x">href="/</a><script src="https://a/b.js">',
+        )
+
+    def test_load_template(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, "template.html")
+            with open(path, "w") as f:
+                f.write("<title>{{ Title }}</title>")
+
+            first = load_template(path)
+            self.assertEqual(first.render("X", ""), "<title>X</title>")
+            self.assertEqual(load_template(path).source_hash, first.source_hash)
+
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            self.assertNotEqual(load_template(path).source_hash, first.source_hash)
+        finally:
+            shutil.rmtree(test_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dependency_graph import DependencyGraph
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        """Set up a static directory with two assets"""
+        self.test_dir = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.test_dir, "static")
+        os.makedirs(os.path.join(self.static_dir, "images"))
+        for name in ("index.css", os.path.join("images", "tom.png")):
+            with open(os.path.join(self.static_dir, name), "w") as f:
+                f.write("data")
+        self.tom = os.path.join(self.static_dir, "images", "tom.png")
+        self.css = os.path.join(self.static_dir, "index.css")
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def test_asset_path(self):
+        graph = DependencyGraph(static_dir=self.static_dir)
+        self.assertEqual(graph.asset_path("/images/tom.png"), self.tom)
+        self.assertEqual(graph.asset_path("/index.css?v=2#top"), self.css)
+        self.assertEqual(
+            graph.asset_path("/images/missing.png"),
+            os.path.join(self.static_dir, "images", "missing.png"),
+        )
+        self.assertIsNone(graph.asset_path("/images"))
+        self.assertIsNone(graph.asset_path("/"))
+        self.assertIsNone(graph.asset_path("images/tom.png"))
+        self.assertIsNone(graph.asset_path("//cdn.example.com/images/tom.png"))
+        self.assertIsNone(graph.asset_path("https://example.com/index.css"))
+
+    def test_asset_added_later_invalidates_page(self):
+        graph = DependencyGraph(static_dir=self.static_dir)
+        graph.record_page("docs/a.html", "a.md", "t.html", ["/images/new.png"])
+        new = os.path.join(self.static_dir, "images", "new.png")
+        self.assertEqual(graph.affected_outputs([new]), {"docs/a.html"})
+
+    def test_record_page_and_queries(self):
+        graph = DependencyGraph(static_dir=self.static_dir)
+        graph.record_page(
+            "docs/tom.html",
+            "content/tom.md",
+            "template.html",
+            [
+                "/images/tom.png",
+                "/blog/majesty",
+                "https://example.com",
+                "/images/tom.png",
+            ],
+        )
+        graph.record_page("docs/index.html", "content/index.md", "template.html")
+
+        self.assertEqual(
+            graph.inputs("docs/tom.html"),
+            sorted(["content/tom.md", "template.html", self.tom]),
+        )
+        self.assertEqual(graph.dependents(self.tom), ["docs/tom.html"])
+        self.assertEqual(
+            graph.dependents("template.html"), ["docs/index.html", "docs/tom.html"]
+        )
+        self.assertEqual(graph.dependents("content/missing.md"), [])
+        self.assertEqual(
+            graph.affected_outputs({"content/index.md", self.tom}),
+            {"docs/index.html", "docs/tom.html"},
+        )
+
+    def test_rerecord_and_remove_update_reverse_index(self):
+        graph = DependencyGraph(static_dir=self.static_dir)
+        graph.record_page("docs/a.html", "a.md", "t.html", ["/images/tom.png"])
+        graph.record_page("docs/a.html", "a.md", "t.html", ["/index.css"])
+
+        self.assertEqual(graph.dependents(self.tom), [])
+        self.assertEqual(graph.dependents(self.css), ["docs/a.html"])
+
+        graph.remove_output("docs/a.html")
+        self.assertEqual(graph.outputs, {})
+        self.assertEqual(graph.affected_outputs({"a.md", "t.html", self.css}), set())
+
+    def test_reverse_index_is_rebuilt_from_outputs(self):
+        graph = DependencyGraph({"docs/a.html": ["a.md", "t.html"]})
+        self.assertEqual(graph.dependents("t.html"), ["docs/a.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
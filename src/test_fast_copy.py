@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fast_copy import copy_file, copy_files, find_duplicates
+
+
+class TestFastCopy(unittest.TestCase):
+    def setUp(self):
+        """Set up a source and an output directory"""
+        self.test_dir = tempfile.mkdtemp()
+        self.src_dir = os.path.join(self.test_dir, "static")
+        self.dest_dir = os.path.join(self.test_dir, "public")
+        os.makedirs(self.src_dir)
+        os.makedirs(self.dest_dir)
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.src_dir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_copy_file_preserves_contents_and_stat(self):
+        src = self._write("a.png", b"x" * 100_000)
+        os.utime(src, ns=(1_000_000_000, 2_000_000_000))
+        dst = os.path.join(self.dest_dir, "a.png")
+
+        method = copy_file(src, dst)
+
+        self.assertIn(method, ("reflink", "copy_file_range", "copy"))
+        self.assertEqual(self._read(dst), b"x" * 100_000)
+        self.assertEqual(os.stat(dst).st_mtime_ns, 2_000_000_000)
+        self.assertEqual(os.listdir(self.dest_dir), ["a.png"])
+
+    def test_copy_file_replaces_instead_of_writing_through(self):
+        src = self._write("a.css", b"old")
+        dst = os.path.join(self.dest_dir, "a.css")
+        copy_file(src, dst, link=True)
+        self.assertTrue(os.path.samefile(src, dst))
+
+        # Overwriting a hard linked output must leave the source alone
+        other = self._write("b.css", b"new")
+        copy_file(other, dst)
+        self.assertEqual(self._read(dst), b"new")
+        self.assertEqual(self._read(src), b"old")
+
+    def test_copy_file_missing_source_leaves_no_temporary_file(self):
+        with self.assertRaises(FileNotFoundError):
+            copy_file(
+                os.path.join(self.src_dir, "missing"),
+                os.path.join(self.dest_dir, "missing"),
+            )
+        self.assertEqual(os.listdir(self.dest_dir), [])
+
+    def test_find_duplicates(self):
+        a = self._write("a", b"same" * 1000)
+        b = self._write("b", b"same" * 1000)
+        c = self._write("c", b"diff" * 1000)
+        d = self._write("d", b"same")
+        e = self._write("e", b"same" * 1000)
+
+        self.assertEqual(find_duplicates([a, b, c, d, e]), {b: a, e: a})
+
+    def test_copy_files(self):
+        pairs = []
+        for name, content in (("a", b"1" * 10), ("b", b"1" * 10), ("c", b"2")):
+            src = self._write(name, content)
+            pairs.append((src, os.path.join(self.dest_dir, name)))
+        os.utime(pairs[1][0], ns=(5_000_000_000, 5_000_000_000))
+
+        counts = copy_files(pairs, jobs=2, dedupe=True)
+
+        self.assertEqual(sum(counts.values()), 3)
+        self.assertEqual(counts["deduplicated"], 1)
+        for src, dst in pairs:
+            self.assertEqual(self._read(dst), self._read(src))
+            self.assertEqual(os.stat(dst).st_mtime_ns, os.stat(src).st_mtime_ns)
+
+    def test_copy_files_with_links(self):
+        src = self._write("a", b"1")
+        dst = os.path.join(self.dest_dir, "a")
+
+        self.assertEqual(copy_files([(src, dst)], link=True), {"hardlink": 1})
+        self.assertTrue(os.path.samefile(src, dst))
+
+
+if __name__ == "__main__":
+    unittest.main()
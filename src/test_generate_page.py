@@ -3,7 +3,18 @@ import shutil
 import tempfile
 import unittest
 
-from generate_page import generate_page, generate_pages_recursive
+from build_manifest import BuildManifest
+from build_profile import BuildProfile
+from output_changes import OutputChanges
+from generate_page import (
+    _worker_context,
+    find_markdown_pages,
+    generate_page,
+    generate_pages_parallel,
+    generate_pages_pipelined,
+    generate_pages_recursive,
+)
+from render_cache import RenderCache
 
 
 class TestGeneratePage(unittest.TestCase):
@@ -221,6 +232,36 @@ This is a test paragraph with [a link](/) and an image:
         self.assertNotIn('href="/"', result)
         self.assertNotIn('src="/"', result)
 
+    def test_generate_page_basepath_leaves_code_untouched(self):
+        """Test that URLs inside code samples keep their text"""
+        markdown_path = os.path.join(self.content_dir, "code.md")
+        with open(markdown_path, "w") as f:
+            f.write(
+                "# Code\n\n"
+                '```\n<a href="/about"><img src="/x.png"></a>\n```\n\n'
+                'Inline `href="/inline"` and a [link](/about)'
+            )
+
+        template_path = os.path.join(self.test_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write('<link href="/a.css">{{ Content }}')
+
+        for profile in (None, BuildProfile()):
+            output_path = os.path.join(self.public_dir, "code.html")
+            generate_page(
+                markdown_path, template_path, output_path, "/mysite/", profile=profile
+            )
+            with open(output_path, "r") as f:
+                result = f.read()
+
+            self.assertIn('<link href="/mysite/a.css">', result)
+            self.assertIn('<a href="/mysite/about">link</a>', result)
+            self.assertIn(
+                '<pre><code><a href="/about"><img src="/x.png"></a>\n</code></pre>',
+                result,
+            )
+            self.assertIn('<code>href="/inline"</code>', result)
+
     def test_generate_page_basepath_default(self):
         """Test page generation with default basepath"""
         # Create test markdown file
@@ -439,6 +480,293 @@ class TestGeneratePagesRecursive(unittest.TestCase):
         self.assertIn("<title>Deep Page</title>", result)
         self.assertIn("<h1>Deep Page</h1>", result)
 
+    def test_generate_pages_recursive_incremental(self):
+        """Test that unchanged pages are skipped and removed pages are deleted"""
+        for name in ("one.md", "two.md"):
+            with open(os.path.join(self.content_dir, name), "w") as f:
+                f.write(f"# {name}\n\nBody.")
+
+        template_path = os.path.join(self.test_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+        manifest_path = os.path.join(self.test_dir, "manifest.json")
+        manifest = BuildManifest.load(manifest_path)
+        generate_pages_recursive(
+            self.content_dir, template_path, self.public_dir, manifest=manifest
+        )
+        manifest.save()
+        self.assertEqual(len(manifest.pages), 2)
+
+        # Second build: edit one page and delete the other
+        with open(os.path.join(self.content_dir, "one.md"), "w") as f:
+            f.write("# Edited\n\nBody.")
+        os.remove(os.path.join(self.content_dir, "two.md"))
+
+        one_md = os.path.join(self.content_dir, "one.md")
+        one_html = os.path.join(self.public_dir, "one.html")
+        two_html = os.path.join(self.public_dir, "two.html")
+
+        manifest = BuildManifest.load(manifest_path)
+        self.assertIsNotNone(
+            generate_page(one_md, template_path, one_html, manifest=manifest)
+        )
+        # Third call with identical inputs is a no-op
+        self.assertIsNone(
+            generate_page(one_md, template_path, one_html, manifest=manifest)
+        )
+        self.assertEqual(manifest.remove_stale_pages(), [two_html])
+
+        self.assertFalse(os.path.exists(two_html))
+        with open(one_html, "r") as f:
+            self.assertIn("<title>Edited</title>", f.read())
+
+
+class TestGeneratePagesParallel(unittest.TestCase):
+    def setUp(self):
+        """Set up a small site and a template"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        os.makedirs(os.path.join(self.content_dir, "blog", "post"))
+
+        files_content = {
+            "index.md": "# Home\n\n[Blog](/blog/post) and ![logo](/logo.png)",
+            "blog/post/index.md": "# Post\n\n- one\n- **two**\n\n> quote",
+            "blog/notes.md": "# Notes\n\n```\ncode here\n```",
+        }
+        for rel_path, content in files_content.items():
+            with open(os.path.join(self.content_dir, rel_path), "w") as f:
+                f.write(content)
+
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write('<link href="/a.css"><title>{{ Title }}</title>{{ Content }}')
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _read_tree(self, root):
+        result = {}
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    result[os.path.relpath(path, root)] = f.read()
+        return result
+
+    def test_find_markdown_pages(self):
+        public_dir = os.path.join(self.test_dir, "public")
+        pages = sorted(find_markdown_pages(self.content_dir, public_dir))
+        self.assertEqual(
+            pages,
+            sorted(
+                [
+                    (
+                        os.path.join(self.content_dir, "index.md"),
+                        os.path.join(public_dir, "index.html"),
+                    ),
+                    (
+                        os.path.join(self.content_dir, "blog", "notes.md"),
+                        os.path.join(public_dir, "blog", "notes.html"),
+                    ),
+                    (
+                        os.path.join(self.content_dir, "blog", "post", "index.md"),
+                        os.path.join(public_dir, "blog", "post", "index.html"),
+                    ),
+                ]
+            ),
+        )
+
+    def test_parallel_matches_serial(self):
+        serial_dir = os.path.join(self.test_dir, "serial")
+        parallel_dir = os.path.join(self.test_dir, "parallel")
+
+        generate_pages_recursive(
+            self.content_dir, self.template_path, serial_dir, "/site/"
+        )
+        generate_pages_parallel(
+            self.content_dir, self.template_path, parallel_dir, "/site/", jobs=2
+        )
+
+        serial = self._read_tree(serial_dir)
+        self.assertEqual(len(serial), 3)
+        self.assertEqual(self._read_tree(parallel_dir), serial)
+
+    def test_workers_are_not_forked(self):
+        # The build copies static files from other threads meanwhile
+        self.assertIn(_worker_context().get_start_method(), ("forkserver", "spawn"))
+
+    def test_pipelined_matches_serial(self):
+        serial_dir = os.path.join(self.test_dir, "serial")
+        pipelined_dir = os.path.join(self.test_dir, "pipelined")
+
+        generate_pages_recursive(
+            self.content_dir, self.template_path, serial_dir, "/site/"
+        )
+        rendered = generate_pages_pipelined(
+            self.content_dir,
+            self.template_path,
+            pipelined_dir,
+            "/site/",
+            io_threads=2,
+            render_cache=RenderCache(os.path.join(self.test_dir, "render")),
+        )
+
+        serial = self._read_tree(serial_dir)
+        self.assertEqual(self._read_tree(pipelined_dir), serial)
+        self.assertEqual(
+            sorted(os.path.relpath(path, pipelined_dir) for path in rendered),
+            sorted(serial),
+        )
+
+    def test_pipelined_skips_fresh_pages(self):
+        public_dir = os.path.join(self.test_dir, "public")
+        manifest = BuildManifest(os.path.join(self.test_dir, "manifest.json"))
+        generate_pages_pipelined(
+            self.content_dir, self.template_path, public_dir, manifest=manifest
+        )
+        with open(os.path.join(self.content_dir, "blog", "notes.md"), "a") as f:
+            f.write("\nMore notes")
+
+        rendered = generate_pages_pipelined(
+            self.content_dir, self.template_path, public_dir, manifest=manifest
+        )
+        self.assertEqual(rendered, [os.path.join(public_dir, "blog", "notes.html")])
+        self.assertIn(
+            os.path.join(public_dir, "blog", "notes.html"),
+            manifest.dependencies.dependents(self.template_path),
+        )
+
+    def test_unchanged_outputs_are_not_rewritten(self):
+        public_dir = os.path.join(self.test_dir, "public")
+        notes = os.path.join(self.content_dir, "blog", "notes.md")
+        builds = {
+            "recursive": lambda changes: generate_pages_recursive(
+                self.content_dir, self.template_path, public_dir, changes=changes
+            ),
+            "pipelined": lambda changes: generate_pages_pipelined(
+                self.content_dir, self.template_path, public_dir, changes=changes
+            ),
+            "parallel": lambda changes: generate_pages_parallel(
+                self.content_dir, self.template_path, public_dir, jobs=2,
+                changes=changes,
+            ),
+        }  # fmt: skip
+        for name, build in builds.items():
+            with self.subTest(name):
+                shutil.rmtree(public_dir, ignore_errors=True)
+                changes = OutputChanges(public_dir)
+                build(changes)
+                self.assertEqual(len(changes.added), 3)
+
+                for path in find_markdown_pages(self.content_dir, public_dir):
+                    os.utime(path[1], (0, 0))
+                with open(notes, "a") as f:
+                    f.write(f"\nMore notes for {name}")
+
+                changes = OutputChanges(public_dir)
+                build(changes)
+                self.assertEqual(
+                    changes.to_dict()["changed"], [os.path.join("blog", "notes.html")]
+                )
+                self.assertEqual(changes.unchanged, 2)
+                self.assertEqual(
+                    os.stat(os.path.join(public_dir, "index.html")).st_mtime, 0
+                )
+
+    def test_pipelined_render_error_is_raised(self):
+        with open(os.path.join(self.content_dir, "blog", "bad.md"), "w") as f:
+            f.write("## No title here")
+
+        with self.assertRaises(Exception) as context:
+            generate_pages_pipelined(
+                self.content_dir,
+                self.template_path,
+                os.path.join(self.test_dir, "public"),
+            )
+        self.assertEqual(str(context.exception), "No H1 header found in markdown")
+
+    def test_profiled_matches_plain(self):
+        for basepath in ("/", "/site/"):
+            plain_dir = os.path.join(self.test_dir, "plain")
+            profiled_dir = os.path.join(self.test_dir, "profiled")
+            profile = BuildProfile()
+
+            generate_pages_recursive(
+                self.content_dir, self.template_path, plain_dir, basepath
+            )
+            generate_pages_recursive(
+                self.content_dir,
+                self.template_path,
+                profiled_dir,
+                basepath,
+                profile=profile,
+            )
+
+            self.assertEqual(self._read_tree(profiled_dir), self._read_tree(plain_dir))
+            self.assertEqual(len(profile.page_totals), 3)
+            for stage in ("read", "parse", "render", "title", "write"):
+                self.assertIn(stage, profile.stage_totals)
+            shutil.rmtree(plain_dir)
+            shutil.rmtree(profiled_dir)
+
+    def test_render_cache_hits_match_plain(self):
+        cache_dir = os.path.join(self.test_dir, "render")
+        plain_dir = os.path.join(self.test_dir, "plain")
+        generate_pages_recursive(
+            self.content_dir, self.template_path, plain_dir, "/site/"
+        )
+        plain = self._read_tree(plain_dir)
+
+        cold = RenderCache(cache_dir)
+        generate_pages_parallel(
+            self.content_dir,
+            self.template_path,
+            os.path.join(self.test_dir, "cold"),
+            "/site/",
+            jobs=2,
+            render_cache=cold,
+        )
+        self.assertEqual((cold.hits, cold.misses), (0, 3))
+
+        for profile in (None, BuildProfile()):
+            warm = RenderCache(cache_dir)
+            manifest = BuildManifest(os.path.join(self.test_dir, "manifest.json"))
+            warm_dir = os.path.join(self.test_dir, "warm")
+            generate_pages_recursive(
+                self.content_dir,
+                self.template_path,
+                warm_dir,
+                "/site/",
+                manifest,
+                profile=profile,
+                render_cache=warm,
+            )
+            self.assertEqual((warm.hits, warm.misses), (3, 0))
+            self.assertEqual(self._read_tree(warm_dir), plain)
+            # URLs of cached pages still reach the dependency graph
+            self.assertIn(
+                os.path.join(warm_dir, "index.html"),
+                manifest.dependencies.dependents(self.template_path),
+            )
+            shutil.rmtree(warm_dir)
+        self.assertEqual(self._read_tree(os.path.join(self.test_dir, "cold")), plain)
+
+    def test_parallel_error_names_source_file(self):
+        bad_path = os.path.join(self.content_dir, "blog", "bad.md")
+        with open(bad_path, "w") as f:
+            f.write("## No title here")
+
+        with self.assertRaises(RuntimeError) as context:
+            generate_pages_parallel(
+                self.content_dir,
+                self.template_path,
+                os.path.join(self.test_dir, "public"),
+                jobs=2,
+            )
+        self.assertIn(bad_path, str(context.exception))
+
 
 if __name__ == "__main__":
     unittest.main()
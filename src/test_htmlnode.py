@@ -24,6 +24,18 @@ class TestHTMLNode(unittest.TestCase):
         self.assertIn("inline text", repr_str)
         self.assertIn("{'class': 'highlight'}", repr_str)
 
+    def test_props_cache_reset_on_assignment(self):
+        node = HTMLNode("a", "x", None, {"href": "/one"})
+        self.assertEqual(node.props_to_html(), ' href="/one"')
+        node.props = {"href": "/two"}
+        self.assertEqual(node.props_to_html(), ' href="/two"')
+
+    def test_slots(self):
+        node = HTMLNode("p", "text")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
 
 if __name__ == "__main__":
     unittest.main()
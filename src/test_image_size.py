@@ -0,0 +1,196 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+from image_size import ImageSizes, read_image_size, scan_image_sizes
+from inline_cache import InlineCache
+from markdown_to_html import markdown_to_html, write_markdown_html
+from markdown_to_html_node import markdown_to_html_node
+from url_resolver import url_resolver
+
+SIZES = ImageSizes({"images/a.png": (640, 480), "b.jpg": (20, 10)})
+
+MARKDOWN = """# Gallery
+
+![first](/images/a.png) and ![second](/b.jpg?v=2)
+
+- ![remote](https://example.com/c.png)
+- ![first](/images/a.png) and ![second](/b.jpg?v=2)
+"""
+
+
+def png(width, height):
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = b"IHDR" + ihdr
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr))
+        + chunk
+        + struct.pack(">I", zlib.crc32(chunk))
+    )
+
+
+def jpeg(width, height, sof=0xC0):
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    frame = struct.pack(">BHHB", 8, height, width, 1) + b"\x01\x11\x00"
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe0"
+        + struct.pack(">H", len(app0) + 2)
+        + app0
+        # Huffman table segment, which shares the SOF marker range
+        + b"\xff\xc4\x00\x03\x00"
+        + bytes([0xFF, sof])
+        + struct.pack(">H", len(frame) + 2)
+        + frame
+        + b"\xff\xd9"
+    )
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_png(self):
+        self.assertEqual(
+            read_image_size(self._write("a.png", png(640, 480))), (640, 480)
+        )
+
+    def test_jpeg(self):
+        self.assertEqual(read_image_size(self._write("a.jpg", jpeg(20, 10))), (20, 10))
+        progressive = self._write("p.jpg", jpeg(300, 200, sof=0xC2))
+        self.assertEqual(read_image_size(progressive), (300, 200))
+
+    def test_invalid_images(self):
+        for data in (b"", b"GIF89a", png(640, 480)[:20], jpeg(20, 10)[:30]):
+            with self.subTest(data=data):
+                self.assertIsNone(read_image_size(self._write("x.png", data)))
+
+
+class TestImageAttributes(unittest.TestCase):
+    def test_get(self):
+        self.assertEqual(SIZES.get("/images/a.png"), (640, 480))
+        self.assertEqual(SIZES.get("/b.jpg?v=2#top"), (20, 10))
+        for url in ("images/a.png", "//cdn/b.jpg", "https://x/b.jpg", "/c.png"):
+            self.assertIsNone(SIZES.get(url))
+
+    def test_sizes_and_lazy_loading(self):
+        html = markdown_to_html(MARKDOWN, url_resolver("/site/"), SIZES)
+        self.assertIn(
+            '<img src="/site/images/a.png" alt="first" width="640" height="480" />',
+            html,
+        )
+        self.assertIn(
+            '<img src="/site/b.jpg?v=2" alt="second" width="20" height="10" '
+            'loading="lazy" decoding="async" />',
+            html,
+        )
+        self.assertIn(
+            '<img src="https://example.com/c.png" alt="remote" '
+            'loading="lazy" decoding="async" />',
+            html,
+        )
+        self.assertEqual(html.count('loading="lazy"'), 4)
+
+    def test_without_sizes_output_is_unchanged(self):
+        self.assertNotIn("width", markdown_to_html(MARKDOWN))
+
+    def test_matches_node_tree_output(self):
+        resolve = url_resolver("/site/")
+        expected = markdown_to_html(MARKDOWN, resolve, SIZES)
+        self.assertEqual(
+            markdown_to_html_node(
+                MARKDOWN, resolve_url=resolve, image_sizes=SIZES
+            ).to_html(),
+            expected,
+        )
+
+    def test_inline_cache_keeps_first_image_eager(self):
+        cache = InlineCache()
+        expected = markdown_to_html(MARKDOWN, image_sizes=SIZES)
+        pages = ["![first](/images/a.png)\n\n" + MARKDOWN, MARKDOWN, MARKDOWN]
+        for markdown in pages:
+            parts = []
+            write_markdown_html(
+                markdown, parts.append, inline_cache=cache, image_sizes=SIZES
+            )
+            html = "".join(parts)
+            self.assertEqual(html, markdown_to_html(markdown, image_sizes=SIZES))
+            node_html = markdown_to_html_node(
+                markdown, inline_cache=cache, image_sizes=SIZES
+            ).to_html()
+            self.assertEqual(node_html, html)
+        self.assertEqual(html, expected)
+        self.assertGreater(cache.hits, 0)
+
+
+class TestScanImageSizes(unittest.TestCase):
+    def setUp(self):
+        """Set up a static tree with images and other files"""
+        self.test_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.test_dir, "images"))
+        self._write(os.path.join("images", "a.png"), png(640, 480))
+        self._write("b.jpg", jpeg(20, 10))
+        self._write("broken.png", b"not an image")
+        self._write("index.css", b"body {}")
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel_path, data):
+        with open(os.path.join(self.test_dir, rel_path), "wb") as f:
+            f.write(data)
+
+    def test_scan(self):
+        records = {}
+        sizes, changed = scan_image_sizes(self.test_dir, records)
+        self.assertEqual(sizes.sizes, {"images/a.png": (640, 480), "b.jpg": (20, 10)})
+        self.assertEqual(
+            changed, ["b.jpg", "broken.png", os.path.join("images", "a.png")]
+        )
+
+        again, changed = scan_image_sizes(self.test_dir, records)
+        self.assertEqual(changed, [])
+        self.assertEqual(again.digest, sizes.digest)
+
+    def test_resized_and_removed_images_are_reported(self):
+        records = {}
+        sizes, _ = scan_image_sizes(self.test_dir, records)
+        self._write("b.jpg", jpeg(40, 10))
+        os.remove(os.path.join(self.test_dir, "images", "a.png"))
+        resized, changed = scan_image_sizes(self.test_dir, records)
+        self.assertEqual(changed, ["b.jpg", os.path.join("images", "a.png")])
+        self.assertEqual(resized.sizes, {"b.jpg": (40, 10)})
+        self.assertNotEqual(resized.digest, sizes.digest)
+
+    def test_known_content_is_not_read_again(self):
+        records = {}
+        scan_image_sizes(self.test_dir, records)
+        # A copy of a known image, and the same image rewritten
+        self._write("c.png", png(640, 480))
+        self._write("b.jpg", jpeg(20, 10))
+        os.utime(os.path.join(self.test_dir, "b.jpg"), ns=(0, 0))
+        with mock.patch("image_size.read_image_size") as read:
+            sizes, changed = scan_image_sizes(self.test_dir, records)
+        read.assert_not_called()
+        self.assertEqual(changed, ["c.png"])
+        self.assertEqual(sizes.sizes["c.png"], (640, 480))
+
+
+if __name__ == "__main__":
+    unittest.main()
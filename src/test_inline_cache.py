@@ -0,0 +1,131 @@
+import random
+import unittest
+
+from inline_cache import InlineCache
+from leafnode import LeafNode
+from markdown_to_html import markdown_to_html, write_markdown_html
+from markdown_to_html_node import markdown_to_html_node, markdown_to_page
+from page_result import PageResult
+from url_resolver import url_resolver
+
+NAV = "- [Home](/)\n- [Blog](/blog)\n- ![Logo](/logo.png) [About](/about)"
+DOCUMENT = f"# Page\n\n{NAV}\n\nSome **text** here.\n\n{NAV}"
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = InlineCache(4)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "A")
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.counters(), (1, 1, 0))
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_evicts_least_recently_used(self):
+        cache = InlineCache(2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.get("c"), "C")
+
+    def test_add_counters(self):
+        cache = InlineCache()
+        cache.add_counters((3, 1, 2))
+        cache.add_counters((1, 1, 0))
+        self.assertEqual(cache.counters(), (4, 2, 2))
+        self.assertEqual(
+            cache.report(),
+            "Inline cache: 4 hits, 2 misses, 2 evictions, size 4096 "
+            "(66.7% hit rate)",
+        )
+
+    def test_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            InlineCache(0)
+
+
+class TestCachedRendering(unittest.TestCase):
+    def test_fast_path_output_unchanged(self):
+        cache = InlineCache()
+        parts = []
+        write_markdown_html(DOCUMENT, parts.append, inline_cache=cache)
+        self.assertEqual("".join(parts), markdown_to_html(DOCUMENT))
+        # The second navigation list is served from the cache
+        self.assertEqual(cache.hits, 3)
+
+    def test_node_tree_output_unchanged(self):
+        cache = InlineCache()
+        for _ in range(2):
+            self.assertEqual(
+                markdown_to_html_node(DOCUMENT, inline_cache=cache).to_html(),
+                markdown_to_html_node(DOCUMENT).to_html(),
+            )
+        self.assertGreater(cache.hits, 0)
+
+    def test_changing_returned_nodes_does_not_change_cache(self):
+        cache = InlineCache()
+        expected = markdown_to_html_node(NAV).to_html()
+        tree = markdown_to_html_node(NAV, inline_cache=cache)
+        link = tree.children[0].children[0].children[0]
+        link.props["href"] = "/changed"
+        link.value = "Changed"
+        tree.children[0].children[0].children.append(LeafNode("b", "extra"))
+        self.assertEqual(
+            markdown_to_html_node(NAV, inline_cache=cache).to_html(), expected
+        )
+        self.assertGreater(cache.hits, 0)
+
+    def test_page_metadata_from_cache(self):
+        cache = InlineCache()
+        expected = markdown_to_page(DOCUMENT)
+        for _ in range(2):
+            page = PageResult()
+            write_markdown_html(DOCUMENT, [].append, page, inline_cache=cache)
+            cached_page = markdown_to_page(DOCUMENT, inline_cache=cache)
+            for result in (page, cached_page):
+                self.assertEqual(result.links, expected.links)
+                self.assertEqual(result.images, expected.images)
+                self.assertEqual(result.word_count, expected.word_count)
+
+    def test_keyed_on_resolver(self):
+        cache = InlineCache()
+        root = markdown_to_html(NAV)
+        parts = []
+        write_markdown_html(NAV, [].append, inline_cache=cache)
+        write_markdown_html(
+            NAV, parts.append, resolve_url=url_resolver("/site/"), inline_cache=cache
+        )
+        self.assertEqual("".join(parts), root.replace('="/', '="/site/'))
+
+    def test_long_fragments_bypass_cache(self):
+        cache = InlineCache(max_fragment_length=10)
+        write_markdown_html("a long paragraph of text", [].append, inline_cache=cache)
+        self.assertEqual(cache.counters(), (0, 0, 0))
+        self.assertEqual(len(cache), 0)
+
+    def test_differential_with_tiny_cache(self):
+        alphabet = ["\n", "\n\n", " ", "# ", "a", "- ", "**", "[l](/u)", "![i](/p)"]
+        rng = random.Random(11)
+        cache = InlineCache(3)
+        for _ in range(500):
+            md = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            try:
+                expected = markdown_to_html(md)
+            except ValueError:
+                continue
+            parts = []
+            write_markdown_html(md, parts.append, inline_cache=cache)
+            self.assertEqual("".join(parts), expected, repr(md))
+            self.assertEqual(
+                markdown_to_html_node(md, inline_cache=cache).to_html(), expected
+            )
+        self.assertGreater(cache.evictions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
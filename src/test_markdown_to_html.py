@@ -0,0 +1,111 @@
+import random
+import unittest
+
+from markdown_to_html import markdown_to_html, write_markdown_html
+from markdown_to_html_node import markdown_to_html_node, markdown_to_page
+from page_result import PageResult
+
+# Same inputs as test_markdown_to_html_node.py
+CASES = [
+    """
+    This is **bolded** paragraph
+    text in a p
+    tag here
+
+    This is another paragraph with _italic_ text and `code` here
+
+    """,
+    """
+    ```
+    This is text that _should_ remain
+    the **same** even with inline stuff
+    ```
+    """,
+    "# Heading 1",
+    "> This is a quote\n> spanning two lines",
+    "- Item 1\n- Item 2\n- Item 3",
+    "1. First\n2. Second\n3. Third",
+    "# Heading\n\nThis is a paragraph.\n\n- List item 1\n- List item 2",
+    "## Heading with **bold** and _italic_",
+    "- Item with **bold**\n- Item with `code`",
+    "> This is a quote with `code` and **bold**",
+    "Here is an ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://boot.dev)",
+]
+
+
+def _render(render, markdown):
+    try:
+        return render(markdown)
+    except ValueError as e:
+        return ("error", str(e))
+
+
+class TestMarkdownToHtml(unittest.TestCase):
+    def test_matches_node_tree_output(self):
+        for md in CASES:
+            with self.subTest(md=md):
+                self.assertEqual(
+                    markdown_to_html(md), markdown_to_html_node(md).to_html()
+                )
+
+    def test_matches_node_tree_output_with_resolver(self):
+        resolve_url = "/site{}".format
+        for md in CASES:
+            with self.subTest(md=md):
+                self.assertEqual(
+                    markdown_to_html(md, resolve_url),
+                    markdown_to_html_node(md, resolve_url=resolve_url).to_html(),
+                )
+
+    def test_write_markdown_html(self):
+        parts = []
+        write_markdown_html("# Title\n\n- a\n- b", parts.append)
+        self.assertEqual(
+            "".join(parts), "<div><h1>Title</h1><ul><li>a</li><li>b</li></ul></div>"
+        )
+
+    def test_write_markdown_html_collects_urls(self):
+        page = PageResult()
+        write_markdown_html(
+            "[a](/a) and ![b](/b.png)\n\n- [c](/c)\n\n```\n[d](/d)\n```",
+            [].append,
+            page,
+        )
+        self.assertEqual(page.links, ["/a", "/c"])
+        self.assertEqual(page.images, ["/b.png"])
+        self.assertIsNone(page.html_node)
+
+    def test_write_markdown_html_page_matches_markdown_to_page(self):
+        for md in CASES:
+            page = PageResult()
+            write_markdown_html(md, [].append, page)
+            expected = markdown_to_page(md)
+            self.assertEqual(page.title, expected.title)
+            self.assertEqual(page.outline, expected.outline)
+            self.assertEqual(page.word_count, expected.word_count)
+            self.assertEqual(page.urls, expected.urls)
+
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_html(""), "<div></div>")
+
+    def test_invalid_inline_raises(self):
+        with self.assertRaises(ValueError):
+            markdown_to_html("This is **unbalanced")
+
+    def test_differential_against_node_tree(self):
+        alphabet = [
+            "\n", "\n\n", " ", "# ", "## ", "a", "```", "> ", "- ", "1. ",
+            "2. ", "**", "_", "`", "[l](/u)", "![i](/p.png)",
+        ]  # fmt: skip
+        rng = random.Random(7)
+        for _ in range(3000):
+            md = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+            self.assertEqual(
+                _render(markdown_to_html, md),
+                _render(lambda text: markdown_to_html_node(text).to_html(), md),
+                repr(md),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
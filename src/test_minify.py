@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from compile_template import compile_template
+from minify import HtmlMinifier, minify_css, minify_html
+from static_sync import MINIFIED, sync_static
+
+PAGE = """<html>
+  <head>
+    <title>  Tolkien   Fan Club </title>
+    <style>
+      body  { color: red; }
+    </style>
+  </head>
+  <body>
+    <!--  keep   this  -->
+    <p>Some    text
+       over   lines &lt; Back</p>
+    <pre><code>def f():
+    return  1
+</code></pre>
+    <textarea>  a
+  b </textarea>
+    <a   href="/"  >Home</a>
+  </body>
+</html>
+"""
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_collapses_whitespace(self):
+        self.assertEqual(
+            minify_html("<p>Some    text\n   over  lines</p>\n\n  <p>x</p>"),
+            "<p>Some text\nover lines</p>\n<p>x</p>",
+        )
+
+    def test_keeps_protected_elements_comments_and_tags(self):
+        html = minify_html(PAGE)
+        self.assertIn("<pre><code>def f():\n    return  1\n</code></pre>", html)
+        self.assertIn("<textarea>  a\n  b </textarea>", html)
+        self.assertIn("<style>\n      body  { color: red; }\n    </style>", html)
+        self.assertIn("<!--  keep   this  -->", html)
+        self.assertIn('<a   href="/"  >Home</a>', html)
+        self.assertIn("<title> Tolkien Fan Club </title>", html)
+
+    def test_less_than_in_text_is_not_a_tag(self):
+        self.assertEqual(minify_html("a <  b   c"), "a < b c")
+
+    def test_streaming_matches_whole_document(self):
+        expected = minify_html(PAGE)
+        for size in (1, 2, 3, 5, 7, 16, 64):
+            with self.subTest(size=size):
+                out = []
+                minifier = HtmlMinifier(out.append)
+                for i in range(0, len(PAGE), size):
+                    minifier.feed(PAGE[i : i + size])
+                minifier.close()
+                self.assertEqual("".join(out), expected)
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_strips_whitespace_and_comments(self):
+        css = """
+/* header */
+body ,  p {
+    color: red ;
+    margin: 0  auto;
+}
+a:hover { color: blue }
+"""
+        self.assertEqual(
+            minify_css(css), "body,p{color:red;margin:0 auto}a:hover{color:blue}"
+        )
+
+    def test_keeps_strings(self):
+        css = 'a::before { content: "  a ; b  /* c */ "; }'
+        self.assertEqual(minify_css(css), 'a::before{content:"  a ; b  /* c */ "}')
+
+    def test_keeps_space_before_pseudo_class(self):
+        # "a :hover" matches hovered descendants of a, unlike "a:hover"
+        self.assertEqual(minify_css("a :hover { }"), "a :hover{}")
+
+    def test_comment_between_words_is_a_space(self):
+        self.assertEqual(minify_css("margin: 0/* x */auto;"), "margin:0 auto;")
+
+
+class TestRenderPageMinify(unittest.TestCase):
+    def test_minify_page(self):
+        source = "<html>\n  <title>{{ Title }}</title>\n  <body>{{ Content }}</body>"
+        parts = ["<p>a    b</p>\n\n", "<pre>x    y</pre>"]
+        plain = compile_template(source).render_page("T", parts)
+        minified = compile_template(source, minify=True).render_page("T", parts)
+        self.assertEqual(minified, minify_html(plain.decode()).encode())
+        self.assertIn(b"<pre>x    y</pre>", minified)
+
+    def test_write_page_streams_fragments(self):
+        source = "<title>{{ Title }}</title>\n\n  <body>{{ Content }}</body>"
+        parts = ["<p>a  ", "  b</p>\n", "\n<pre>x  ", "  y</pre>"]
+        for minify in (False, True):
+            template = compile_template(source, minify=minify)
+            written = []
+            template.write_page(written.append, "T", parts)
+            self.assertGreater(len(written), 2)
+            self.assertEqual(
+                "".join(written).encode(), template.render_page("T", parts)
+            )
+        self.assertEqual(
+            "".join(written),
+            "<title>T</title>\n<body><p>a b</p>\n<pre>x    y</pre></body>",
+        )
+
+    def test_minify_changes_source_hash(self):
+        source = "<title>{{ Title }}</title>{{ Content }}"
+        self.assertNotEqual(
+            compile_template(source, source_hash="abc").source_hash,
+            compile_template(source, source_hash="abc", minify=True).source_hash,
+        )
+
+
+class TestSyncStaticMinify(unittest.TestCase):
+    def setUp(self):
+        """Set up a static directory with a stylesheet and an image"""
+        self.test_dir = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.test_dir, "static")
+        self.public_dir = os.path.join(self.test_dir, "public")
+        os.makedirs(self.static_dir)
+        with open(os.path.join(self.static_dir, "index.css"), "w") as f:
+            f.write("body {\n  color: red;\n}\n")
+        with open(os.path.join(self.static_dir, "logo.png"), "wb") as f:
+            f.write(b"png  data")
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _read(self, name):
+        with open(os.path.join(self.public_dir, name), "rb") as f:
+            return f.read()
+
+    def test_css_is_minified(self):
+        stats = sync_static(self.static_dir, self.public_dir, minify=True)
+        self.assertEqual(self._read("index.css"), b"body{color:red}")
+        self.assertEqual(self._read("logo.png"), b"png  data")
+        self.assertEqual(stats.files_copied, 2)
+        self.assertEqual(stats.copy_methods[MINIFIED], 1)
+        self.assertIn("index.css", stats.added_paths)
+
+    def test_unchanged_css_is_skipped(self):
+        sync_static(self.static_dir, self.public_dir, minify=True)
+        stats = sync_static(self.static_dir, self.public_dir, minify=True)
+        self.assertEqual(stats.files_copied, 0)
+        self.assertEqual(stats.files_skipped, 2)
+
+    def test_hard_linked_output_does_not_overwrite_source(self):
+        sync_static(self.static_dir, self.public_dir, link=True)
+        source = os.path.join(self.static_dir, "index.css")
+        output = os.path.join(self.public_dir, "index.css")
+        if not os.path.samefile(source, output):
+            self.skipTest("hard links not supported")
+        sync_static(self.static_dir, self.public_dir, minify=True)
+        self.assertEqual(self._read("index.css"), b"body{color:red}")
+        with open(source, "rb") as f:
+            self.assertEqual(f.read(), b"body {\n  color: red;\n}\n")
+        self.assertFalse(os.path.samefile(source, output))
+
+    def test_turning_minify_off_copies_source(self):
+        sync_static(self.static_dir, self.public_dir, minify=True)
+        sync_static(self.static_dir, self.public_dir)
+        self.assertEqual(self._read("index.css"), b"body {\n  color: red;\n}\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
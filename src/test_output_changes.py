@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from output_changes import (
+    ADDED,
+    CHANGED,
+    DELETED,
+    UNCHANGED,
+    OutputChanges,
+    stream_if_changed,
+    write_if_changed,
+)
+from static_sync import sync_static
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "page.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_statuses(self):
+        self.assertEqual(write_if_changed(self.path, b"<p>a</p>"), ADDED)
+        os.utime(self.path, (0, 0))
+        self.assertEqual(write_if_changed(self.path, b"<p>a</p>"), UNCHANGED)
+        self.assertEqual(os.stat(self.path).st_mtime, 0)
+        # Same size, different content
+        self.assertEqual(write_if_changed(self.path, b"<p>b</p>"), CHANGED)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>b</p>")
+
+    def _stream(self, *fragments):
+        def write_content(write):
+            for fragment in fragments:
+                write(fragment)
+
+        return stream_if_changed(self.path, write_content)
+
+    def test_stream_statuses(self):
+        self.assertEqual(self._stream("<p>", "\u00e9", "</p>"), ADDED)
+        os.utime(self.path, (0, 0))
+        self.assertEqual(self._stream("<p>\u00e9", "</p>"), UNCHANGED)
+        self.assertEqual(os.stat(self.path).st_mtime, 0)
+        self.assertEqual(self._stream("<p>", "\u00e8</p>"), CHANGED)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), "<p>\u00e8</p>".encode("utf-8"))
+        self.assertEqual(os.listdir(self.test_dir), ["page.html"])
+
+    def test_failed_stream_keeps_output(self):
+        self._stream("<p>a</p>")
+
+        def write_content(write):
+            write("<p>partial")
+            raise ValueError("render failed")
+
+        with self.assertRaises(ValueError):
+            stream_if_changed(self.path, write_content)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>a</p>")
+        self.assertEqual(os.listdir(self.test_dir), ["page.html"])
+
+
+class TestOutputChanges(unittest.TestCase):
+    def test_record(self):
+        changes = OutputChanges("docs")
+        changes.record(os.path.join("docs", "a.html"), ADDED)
+        changes.record(os.path.join("docs", "a.html"), CHANGED)
+        changes.record(os.path.join("docs", "b.html"), CHANGED)
+        changes.record(os.path.join("docs", "c.html"), UNCHANGED)
+        changes.record(os.path.join("docs", "d.html"), DELETED)
+        changes.record(os.path.join("docs", "e.html"), DELETED)
+        changes.record(os.path.join("docs", "e.html"), ADDED)
+        changes.record(os.path.join("docs", "f.html"), ADDED)
+        changes.record(os.path.join("docs", "f.html"), DELETED)
+        self.assertEqual(
+            changes.to_dict(),
+            {
+                "output_dir": "docs",
+                "added": ["a.html"],
+                "changed": ["b.html", "e.html"],
+                "deleted": ["d.html"],
+            },
+        )
+        self.assertEqual(
+            changes.report(),
+            "Output changes: 1 added, 2 changed, 1 deleted, 1 unchanged",
+        )
+
+    def test_save(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, "cache", "changes.json")
+            changes = OutputChanges("docs")
+            changes.record_relative("index.html", CHANGED)
+            changes.save(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f), changes.to_dict())
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_static_sync(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            static_dir = os.path.join(test_dir, "static")
+            public_dir = os.path.join(test_dir, "public")
+            os.makedirs(static_dir)
+            for name in ("a.css", "b.css"):
+                with open(os.path.join(static_dir, name), "w") as f:
+                    f.write(name)
+            manifest = BuildManifest(os.path.join(test_dir, "manifest.json"))
+            changes = OutputChanges(public_dir)
+            changes.add_sync_stats(sync_static(static_dir, public_dir, manifest))
+            self.assertEqual(changes.to_dict()["added"], ["a.css", "b.css"])
+
+            os.remove(os.path.join(static_dir, "a.css"))
+            with open(os.path.join(static_dir, "b.css"), "w") as f:
+                f.write("body {}")
+            changes = OutputChanges(public_dir)
+            changes.add_sync_stats(sync_static(static_dir, public_dir, manifest))
+            self.assertEqual(
+                changes.to_dict(),
+                {
+                    "output_dir": public_dir,
+                    "added": [],
+                    "changed": ["b.css"],
+                    "deleted": ["a.css"],
+                },
+            )
+        finally:
+            shutil.rmtree(test_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
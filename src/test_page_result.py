@@ -0,0 +1,115 @@
+import unittest
+
+from extract_title import extract_title
+from markdown_to_html import write_markdown_html
+from markdown_to_html_node import markdown_to_html_node, markdown_to_page
+from page_result import PageResult
+from textnode import TextType
+
+DOCUMENT = """# My **Site**
+
+Intro with a [link](/about) and ![logo](/images/logo.png).
+
+## Section one
+
+- item [one](https://example.com)
+- item two
+
+```
+# not a heading
+code words here
+```
+
+### Deeper
+"""
+
+
+class TestPageResult(unittest.TestCase):
+    def test_first_level_one_heading_is_title(self):
+        page = PageResult()
+        page.add_heading(2, "Sub")
+        page.add_heading(1, " First ")
+        page.add_heading(1, "Second")
+        self.assertEqual(page.title, "First")
+        self.assertEqual(page.outline, [(2, "Sub"), (1, "First"), (1, "Second")])
+
+    def test_title_is_first_line_of_heading(self):
+        page = PageResult()
+        page.add_heading(1, "Title\ncontinued")
+        self.assertEqual(page.title, "Title")
+
+    def test_urls_by_type(self):
+        page = PageResult()
+        page.add_url(TextType.IMAGE, "/a.png")
+        page.add_url(TextType.LINK, "/b")
+        page.add_url(TextType.TEXT, "/ignored")
+        self.assertEqual(page.links, ["/b"])
+        self.assertEqual(page.images, ["/a.png"])
+        self.assertEqual(page.urls, ["/b", "/a.png"])
+
+
+class TestMarkdownToPage(unittest.TestCase):
+    def test_metadata(self):
+        page = markdown_to_page(DOCUMENT)
+        self.assertEqual(page.title, "My **Site**")
+        self.assertEqual(
+            page.outline, [(1, "My **Site**"), (2, "Section one"), (3, "Deeper")]
+        )
+        self.assertEqual(page.links, ["/about", "https://example.com"])
+        self.assertEqual(page.images, ["/images/logo.png"])
+        self.assertEqual(page.word_count, 22)
+
+    def test_node_tree_matches_markdown_to_html_node(self):
+        page = markdown_to_page(DOCUMENT)
+        self.assertEqual(
+            page.html_node.to_html(), markdown_to_html_node(DOCUMENT).to_html()
+        )
+
+    def test_urls_recorded_before_resolving(self):
+        page = markdown_to_page("[a](/a)", resolve_url=lambda url: "/base" + url)
+        self.assertEqual(page.links, ["/a"])
+        self.assertIn('href="/base/a"', page.html_node.to_html())
+
+    def test_no_heading(self):
+        page = markdown_to_page("just text")
+        self.assertIsNone(page.title)
+        self.assertEqual(page.outline, [])
+
+    def test_title_matches_extract_title(self):
+        for markdown in [
+            "# Hello",
+            "#   Spaced   Title   ",
+            "   # Indented Title",
+            "Intro\n\n## Sub\n\n# Real Title\n\n# Second",
+            "#NotATitle\n## Real H2\n#AlsoNotATitle\n\n# Real Title",
+            "# Title\nsame block",
+            DOCUMENT,
+        ]:
+            self.assertEqual(
+                markdown_to_page(markdown).title, extract_title(markdown), markdown
+            )
+
+    def test_title_comes_from_heading_blocks_only(self):
+        # Unlike extract_title, which takes the first "# " line anywhere
+        for markdown, title, line_title in [
+            ("```\n# not a title\n```\n\n# Real", "Real", "not a title"),
+            ("Intro\n# not a title\n\n# Real", "Real", "not a title"),
+            ("#\n\n# Real", "Real", ""),
+        ]:
+            with self.subTest(markdown=markdown):
+                self.assertEqual(extract_title(markdown), line_title)
+                self.assertEqual(markdown_to_page(markdown).title, title)
+                page = PageResult()
+                write_markdown_html(markdown, [].append, page)
+                self.assertEqual(page.title, title)
+
+    def test_heading_without_space_is_title(self):
+        # The block parser reads "#x text" as a level 1 heading
+        with self.assertRaises(Exception):
+            extract_title("#x text")
+        self.assertEqual(markdown_to_page("#x text").title, "text")
+        self.assertEqual(markdown_to_page("#x text\n\n# Real").title, "text")
+
+
+if __name__ == "__main__":
+    unittest.main()
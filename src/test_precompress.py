@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from output_changes import OutputChanges
+from precompress import (
+    etag,
+    gzip_bytes,
+    precompress_output,
+    remove_precompressed,
+)
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        """Set up an output directory with pages, a stylesheet and an image"""
+        self.test_dir = tempfile.mkdtemp()
+        self.public_dir = os.path.join(self.test_dir, "public")
+        os.makedirs(os.path.join(self.public_dir, "blog"))
+        self.page = os.path.join(self.public_dir, "blog", "index.html")
+        self._write(self.page, b"<p>hello</p>" * 100)
+        self._write(os.path.join(self.public_dir, "index.css"), b"body {}\n" * 50)
+        self._write(os.path.join(self.public_dir, "tiny.txt"), b"x")
+        self._write(os.path.join(self.public_dir, "logo.png"), b"png" * 100)
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _manifest(self):
+        with open(os.path.join(self.public_dir, "etags.json")) as f:
+            return json.load(f)["files"]
+
+    def test_gzip_bytes_is_deterministic(self):
+        data = b"<p>hello</p>" * 10
+        self.assertEqual(gzip.decompress(gzip_bytes(data, 6)), data)
+        self.assertEqual(gzip_bytes(data), gzip_bytes(data))
+
+    def test_writes_siblings_and_manifest(self):
+        stats = precompress_output(self.public_dir)
+
+        self.assertEqual(stats.files_compressed, 3)
+        with open(self.page + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), b"<p>hello</p>" * 100)
+        # Not smaller when compressed, and not a text format
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "tiny.txt.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "logo.png.gz")))
+
+        files = self._manifest()
+        self.assertEqual(
+            sorted(files), [os.path.join("blog", "index.html"), "index.css", "tiny.txt"]
+        )
+        self.assertEqual(files["tiny.txt"]["gzip_size"], None)
+        self.assertEqual(files["index.css"]["etag"], etag(files["index.css"]["hash"]))
+
+    def test_only_changed_files_are_recompressed(self):
+        precompress_output(self.public_dir)
+        self._write(self.page, b"<p>changed</p>" * 100)
+        # Touched, but the content is the same
+        os.utime(os.path.join(self.public_dir, "index.css"), (0, 0))
+
+        changes = OutputChanges(self.public_dir)
+        stats = precompress_output(self.public_dir, changes=changes)
+
+        self.assertEqual(stats.files_compressed, 1)
+        self.assertEqual(stats.files_skipped, 2)
+        with open(self.page + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), b"<p>changed</p>" * 100)
+        self.assertEqual(
+            changes.to_dict()["changed"],
+            [os.path.join("blog", "index.html.gz"), "etags.json"],
+        )
+
+    def test_level_change_recompresses_everything(self):
+        precompress_output(self.public_dir)
+        stats = precompress_output(self.public_dir, level=1)
+        self.assertEqual(stats.files_compressed, 3)
+
+    def test_stale_siblings_are_removed(self):
+        precompress_output(self.public_dir)
+        os.remove(self.page)
+        changes = OutputChanges(self.public_dir)
+
+        stats = precompress_output(self.public_dir, changes=changes)
+
+        self.assertEqual(stats.files_removed, 1)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertNotIn(os.path.join("blog", "index.html"), self._manifest())
+        self.assertEqual(
+            changes.to_dict()["deleted"], [os.path.join("blog", "index.html.gz")]
+        )
+
+    def test_remove_precompressed(self):
+        precompress_output(self.public_dir)
+        siblings = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.public_dir)
+            for name in names
+            if name.endswith(".gz")
+        ]
+        self.assertTrue(siblings)
+        changes = OutputChanges(self.public_dir)
+
+        removed = remove_precompressed(self.public_dir, changes=changes)
+
+        self.assertEqual(removed, len(siblings))
+        for path in siblings + [os.path.join(self.public_dir, "etags.json")]:
+            self.assertFalse(os.path.exists(path))
+        self.assertEqual(len(changes.to_dict()["deleted"]), len(siblings) + 1)
+        self.assertTrue(os.path.exists(self.page))
+        self.assertEqual(remove_precompressed(self.public_dir), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
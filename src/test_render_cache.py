@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import render_cache
+from image_size import ImageSizes
+from page_result import PageResult
+from render_cache import RenderCache
+
+
+def _page():
+    page = PageResult()
+    page.add_heading(1, "Títle")
+    page.add_heading(2, "Sub")
+    page.add_text("three little words")
+    page.links.append("/a")
+    page.images.append("/b.png")
+    return page
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, "render")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_key_depends_on_source_basepath_and_version(self):
+        cache = RenderCache(self.cache_dir)
+        key = cache.key("abc", "/")
+        self.assertEqual(key, cache.key("abc", "/"))
+        self.assertNotEqual(key, cache.key("abd", "/"))
+        self.assertNotEqual(key, cache.key("abc", "/site/"))
+        with mock.patch.object(render_cache, "GENERATOR_VERSION", "old"):
+            self.assertNotEqual(key, cache.key("abc", "/"))
+
+    def test_key_depends_on_image_sizes(self):
+        cache = RenderCache(self.cache_dir)
+        sizes = ImageSizes({"a.png": (1, 2)})
+        key = cache.key("abc", "/", image_sizes=sizes)
+        self.assertNotEqual(key, cache.key("abc", "/"))
+        self.assertEqual(
+            key, cache.key("abc", "/", image_sizes=ImageSizes(sizes.sizes))
+        )
+        resized = ImageSizes({"a.png": (2, 2)})
+        self.assertNotEqual(key, cache.key("abc", "/", image_sizes=resized))
+
+    def test_round_trip(self):
+        cache = RenderCache(self.cache_dir)
+        key = cache.key("abc", "/")
+        self.assertIsNone(cache.get(key))
+
+        html = "<div><pre><code>line\r\nünïcode\n</code></pre></div>"
+        cache.put(key, html, _page())
+        cached_html, page = cache.get(key)
+
+        self.assertEqual(cached_html, html)
+        self.assertEqual(page.title, "Títle")
+        self.assertEqual(page.outline, [(1, "Títle"), (2, "Sub")])
+        self.assertEqual(page.word_count, 3)
+        self.assertEqual(page.urls, ["/a", "/b.png"])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = RenderCache(self.cache_dir)
+        key = cache.key("abc", "/")
+        cache.put(key, "<div></div>", _page())
+        with open(cache._path(key), "w") as f:
+            f.write("{not json")
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.misses, 1)
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = RenderCache(self.cache_dir, max_bytes=0)
+        keys = [cache.key(str(i), "/") for i in range(3)]
+        for age, key in zip((30, 20, 10), keys):
+            cache.put(key, "x" * 1000, _page())
+            past = time.time() - age
+            os.utime(cache._path(key), (past, past))
+        entry_size = os.path.getsize(cache._path(keys[0]))
+
+        # Reading the oldest entry makes it the most recently used
+        cache.get(keys[0])
+        cache.max_bytes = entry_size * 2
+        self.assertEqual(cache.prune(), entry_size * 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertFalse(os.path.exists(cache._path(keys[1])))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+    def test_prune_removes_abandoned_temporary_files(self):
+        cache = RenderCache(self.cache_dir)
+        os.makedirs(self.cache_dir)
+        old_tmp = os.path.join(self.cache_dir, "old.1.2.tmp")
+        new_tmp = os.path.join(self.cache_dir, "new.1.2.tmp")
+        for path in (old_tmp, new_tmp):
+            with open(path, "w") as f:
+                f.write("partial")
+        past = time.time() - 2 * 3600
+        os.utime(old_tmp, (past, past))
+
+        self.assertEqual(cache.prune(), 0)
+        self.assertFalse(os.path.exists(old_tmp))
+        self.assertTrue(os.path.exists(new_tmp))
+
+    def test_record_and_report(self):
+        cache = RenderCache(self.cache_dir)
+        cache.record(True)
+        cache.record(True)
+        cache.record(False)
+        self.assertEqual(
+            cache.report(),
+            "Render cache: 2 hits, 1 misses (66.7% hit rate), 0 evictions",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
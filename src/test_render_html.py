@@ -0,0 +1,85 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from render_html import render_html
+
+
+class TestRenderHtml(unittest.TestCase):
+    def setUp(self):
+        self.node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                LeafNode("img", "", {"src": "/a.png", "alt": "A"}),
+            ],
+        )
+        self.expected = '<div><p><b>Bold</b> text</p><img src="/a.png" alt="A" /></div>'
+
+    def test_list_sink(self):
+        parts = []
+        render_html(self.node, parts)
+        self.assertEqual("".join(parts), self.expected)
+        self.assertGreater(len(parts), 1)
+
+    def test_stringio(self):
+        out = io.StringIO()
+        render_html(self.node, out)
+        self.assertEqual(out.getvalue(), self.expected)
+
+    def test_file(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, "out.html")
+            with open(path, "w") as f:
+                render_html(self.node, f)
+            with open(path) as f:
+                self.assertEqual(f.read(), self.expected)
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_callable(self):
+        parts = []
+        render_html(self.node, lambda fragment: parts.append(fragment))
+        self.assertEqual("".join(parts), self.expected)
+
+    def test_unsupported_writer(self):
+        with self.assertRaises(TypeError):
+            render_html(self.node, 42)
+
+    def test_matches_to_html(self):
+        parts = []
+        render_html(self.node, parts)
+        self.assertEqual("".join(parts), self.node.to_html())
+
+    def test_lazy_children(self):
+        items = (ParentNode("li", [LeafNode(None, str(i))]) for i in range(3))
+        node = ParentNode("ul", items)
+        parts = []
+        render_html(node, parts)
+        self.assertEqual("".join(parts), "<ul><li>0</li><li>1</li><li>2</li></ul>")
+
+    def test_deep_nesting_beyond_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+        node = LeafNode(None, "deep")
+        for _ in range(depth):
+            node = ParentNode("blockquote", [node])
+        out = io.StringIO()
+        render_html(node, out)
+        html = out.getvalue()
+        self.assertTrue(html.startswith("<blockquote>" * depth + "deep"))
+        self.assertTrue(html.endswith("</blockquote>" * depth))
+
+    def test_invalid_nested_node_raises(self):
+        node = ParentNode("div", [ParentNode(None, [])])
+        with self.assertRaises(ValueError):
+            render_html(node, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import random
+import unittest
+
+from block_to_block_type import BlockType, block_to_block_type
+from scan_blocks import Block, scan_blocks
+
+
+def _reference_blocks(markdown):
+    """The original split("\\n\\n") + strip implementation of markdown_to_blocks"""
+    return [block.strip() for block in markdown.split("\n\n") if block.strip()]
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_blocks_with_types(self):
+        md = "# Title\n\nSome text\nmore text\n\n- a\n- b\n\n```\ncode\n```"
+        self.assertEqual(
+            list(scan_blocks(md)),
+            [
+                Block(["# Title"], BlockType.HEADING),
+                Block(["Some text", "more text"], BlockType.PARAGRAPH),
+                Block(["- a", "- b"], BlockType.UNORDERED_LIST),
+                Block(["```", "code", "```"], BlockType.CODE),
+            ],
+        )
+
+    def test_is_generator(self):
+        blocks = scan_blocks("one\n\ntwo")
+        self.assertEqual(next(blocks).text, "one")
+        self.assertEqual(next(blocks).text, "two")
+        with self.assertRaises(StopIteration):
+            next(blocks)
+
+    def test_runs_of_blank_lines(self):
+        md = "\n\n\nfirst\n\n\n\n\nsecond\n\n\n"
+        self.assertEqual([b.text for b in scan_blocks(md)], ["first", "second"])
+
+    def test_whitespace_only_line_does_not_split(self):
+        # Matches the original behaviour: only truly empty lines separate blocks
+        md = "a\n   \nb\n\n  \n\nc"
+        self.assertEqual([b.text for b in scan_blocks(md)], ["a\n   \nb", "c"])
+
+    def test_crlf(self):
+        md = "# Title\r\n\r\n- a\r\n- b\r\n"
+        self.assertEqual(
+            list(scan_blocks(md)),
+            [
+                Block(["# Title"], BlockType.HEADING),
+                Block(["- a", "- b"], BlockType.UNORDERED_LIST),
+            ],
+        )
+
+    def test_file_like_input(self):
+        md = "# Title\n\n> quote\n> more\n"
+        self.assertEqual(
+            [(b.text, b.block_type) for b in scan_blocks(io.StringIO(md))],
+            [(b.text, b.block_type) for b in scan_blocks(md)],
+        )
+
+    def test_differential_against_split(self):
+        """Blocks and types must match markdown_to_blocks + block_to_block_type"""
+        alphabet = [
+            "\n", "\n", " ", "\t", "#", "## ", "a", "b c", "```",
+            "> ", "- ", "1. ", "2. ",
+        ]  # fmt: skip
+        rng = random.Random(42)
+        for _ in range(5000):
+            md = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+            expected = [
+                (block, block_to_block_type(block)) for block in _reference_blocks(md)
+            ]
+            self.assertEqual(
+                [(b.text, b.block_type) for b in scan_blocks(md)],
+                expected,
+                repr(md),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from scan_inline import scan_inline
+from text_to_textnodes import split_text_to_textnodes
+from textnode import TextNode, TextType
+
+
+def _tokenize(tokenize, text):
+    try:
+        return tokenize(text)
+    except ValueError as e:
+        return ("error", str(e))
+
+
+class TestScanInline(unittest.TestCase):
+    def test_simple_mix(self):
+        text = "**b** _i_ `c` ![img](/a.png) [link](/b)"
+        self.assertEqual(
+            scan_inline(text),
+            [
+                TextNode("b", TextType.BOLD),
+                TextNode(" ", TextType.TEXT),
+                TextNode("i", TextType.ITALIC),
+                TextNode(" ", TextType.TEXT),
+                TextNode("c", TextType.CODE),
+                TextNode(" ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "/a.png"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "/b"),
+            ],
+        )
+
+    def test_delimiters_inside_bold_are_literal(self):
+        self.assertEqual(
+            scan_inline("**a _b_ [c](d)**"),
+            [TextNode("a _b_ [c](d)", TextType.BOLD)],
+        )
+
+    def test_underscore_in_url_splits_like_pipeline(self):
+        text = "[x](http://a_b_c)"
+        self.assertEqual(scan_inline(text), split_text_to_textnodes(text))
+
+    def test_unbalanced_delimiters(self):
+        for text, delimiter in (("**a", "**"), ("_a", "_"), ("`a", "`")):
+            with self.assertRaises(ValueError) as context:
+                scan_inline(text)
+            self.assertIn(delimiter, str(context.exception))
+
+    def test_error_priority_matches_pipeline(self):
+        # Both "_" and "`" are unbalanced; the pipeline reports "_" first
+        text = "`a_b`"
+        self.assertEqual(
+            _tokenize(scan_inline, text), _tokenize(split_text_to_textnodes, text)
+        )
+
+    def test_differential_against_split_pipeline(self):
+        """Random inline markdown must tokenize exactly like the split pipeline"""
+        alphabet = [
+            "*", "**", "_", "`", "[", "]", "(", ")", "!",
+            "a", " ", "\n", "[a](b)", "![i](u.png)",
+        ]  # fmt: skip
+        rng = random.Random(1234)
+        for _ in range(20000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            self.assertEqual(
+                _tokenize(scan_inline, text),
+                _tokenize(split_text_to_textnodes, text),
+                repr(text),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
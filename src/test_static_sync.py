@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from static_sync import sync_static, sync_static_path
+
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        """Set up a static tree and an output directory"""
+        self.test_dir = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.test_dir, "static")
+        self.public_dir = os.path.join(self.test_dir, "public")
+        os.makedirs(os.path.join(self.static_dir, "images"))
+
+        self._write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self._write(os.path.join(self.static_dir, "images", "a.png"), "png data")
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_first_sync_copies_everything(self):
+        stats = sync_static(self.static_dir, self.public_dir)
+
+        self.assertEqual(stats.files_copied, 2)
+        self.assertEqual(stats.bytes_copied, len("body {}") + len("png data"))
+        self.assertTrue(
+            os.path.exists(os.path.join(self.public_dir, "images", "a.png"))
+        )
+
+    def test_second_sync_skips_unchanged(self):
+        sync_static(self.static_dir, self.public_dir)
+        stats = sync_static(self.static_dir, self.public_dir)
+
+        self.assertEqual(stats.files_copied, 0)
+        self.assertEqual(stats.bytes_copied, 0)
+        self.assertEqual(stats.files_skipped, 2)
+        self.assertEqual(stats.bytes_skipped, len("body {}") + len("png data"))
+
+    def test_changed_file_is_copied(self):
+        sync_static(self.static_dir, self.public_dir)
+        self._write(os.path.join(self.static_dir, "index.css"), "body { margin: 0 }")
+
+        stats = sync_static(self.static_dir, self.public_dir)
+
+        self.assertEqual(stats.files_copied, 1)
+        with open(os.path.join(self.public_dir, "index.css")) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
+    def test_checksum_detects_same_size_edit(self):
+        sync_static(self.static_dir, self.public_dir)
+        dest = os.path.join(self.public_dir, "index.css")
+        # Same size and mtime, different content
+        stat = os.stat(dest)
+        self._write(dest, "body []")
+        os.utime(dest, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(sync_static(self.static_dir, self.public_dir).files_copied, 0)
+        stats = sync_static(self.static_dir, self.public_dir, checksum=True)
+        self.assertEqual(stats.files_copied, 1)
+
+    def test_orphans_removed_but_pages_kept(self):
+        manifest = BuildManifest(os.path.join(self.test_dir, "manifest.json"))
+        sync_static(self.static_dir, self.public_dir, manifest)
+
+        page = os.path.join(self.public_dir, "index.html")
+        self._write(page, "<html></html>")
+        os.remove(os.path.join(self.static_dir, "images", "a.png"))
+
+        stats = sync_static(self.static_dir, self.public_dir, manifest)
+
+        self.assertEqual(stats.files_removed, 1)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.public_dir, "images", "a.png"))
+        )
+        self.assertTrue(os.path.exists(page))
+        self.assertEqual(list(manifest.assets), ["index.css"])
+
+    def test_sync_single_path(self):
+        manifest = BuildManifest(os.path.join(self.test_dir, "manifest.json"))
+        sync_static(self.static_dir, self.public_dir, manifest)
+
+        new_css = os.path.join(self.static_dir, "images", "new.css")
+        self._write(new_css, "a {}")
+        stats = sync_static_path(
+            self.static_dir,
+            self.public_dir,
+            os.path.join("images", "new.css"),
+            manifest,
+        )
+        self.assertEqual(stats.files_copied, 1)
+        self.assertIn(os.path.join("images", "new.css"), manifest.assets)
+
+        # Removing the directory prunes every asset that came from it
+        shutil.rmtree(os.path.join(self.static_dir, "images"))
+        stats = sync_static_path(self.static_dir, self.public_dir, "images", manifest)
+        self.assertEqual(stats.files_removed, 2)
+        self.assertEqual(list(manifest.assets), ["index.css"])
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from extract_title import extract_title
+from markdown_to_html_node import markdown_to_html_node
+from synthetic_corpus import (
+    CorpusOptions,
+    generate_corpus,
+    generate_page_markdown,
+    write_corpus,
+)
+
+
+class TestSyntheticCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        options = CorpusOptions(pages=5, seed=3)
+        self.assertEqual(generate_corpus(options), generate_corpus(options))
+        self.assertNotEqual(
+            generate_corpus(options), generate_corpus(CorpusOptions(pages=5, seed=4))
+        )
+
+    def test_pages_are_valid_markdown(self):
+        options = CorpusOptions(
+            pages=20, link_density=0.2, image_density=0.1, list_ratio=0.3
+        )
+        for _, markdown in generate_corpus(options):
+            extract_title(markdown)
+            markdown_to_html_node(markdown).to_html()
+
+    def test_densities(self):
+        rng = random.Random(0)
+        dense = generate_page_markdown(
+            rng, CorpusOptions(link_density=0.5, image_density=0.3)
+        )
+        sparse = generate_page_markdown(
+            rng, CorpusOptions(link_density=0, image_density=0, code_ratio=0)
+        )
+        self.assertIn("](/blog/", dense)
+        self.assertIn("![", dense)
+        self.assertNotIn("](", sparse)
+        self.assertNotIn("```", sparse)
+
+    def test_boilerplate(self):
+        plain = generate_corpus(CorpusOptions(pages=4))
+        repeated = generate_corpus(CorpusOptions(pages=4, boilerplate=2))
+        tails = set()
+        for (path, markdown), (repeated_path, repeated_markdown) in zip(
+            plain, repeated
+        ):
+            self.assertEqual(path, repeated_path)
+            self.assertTrue(repeated_markdown.startswith(markdown))
+            tails.add(repeated_markdown[len(markdown) :])
+        self.assertEqual(len(tails), 1)
+        self.assertIn("- [", tails.pop())
+
+    def test_nesting(self):
+        flat = generate_corpus(CorpusOptions(pages=10, nesting=0))
+        self.assertTrue(all(os.sep not in path for path, _ in flat))
+        nested = generate_corpus(CorpusOptions(pages=30, nesting=3))
+        self.assertTrue(any(path.count(os.sep) > 1 for path, _ in nested))
+
+    def test_write_corpus(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            corpus = generate_corpus(CorpusOptions(pages=4, nesting=2))
+            write_corpus(corpus, test_dir)
+            for rel_path, markdown in corpus:
+                with open(os.path.join(test_dir, rel_path), encoding="utf-8") as f:
+                    self.assertEqual(f.read(), markdown)
+        finally:
+            shutil.rmtree(test_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,6 +45,18 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
             html_node.props, {"src": "https://example.com/image.png", "alt": "An image"}
         )
 
+    def test_resolve_url(self):
+        resolve_url = "/site{}".format
+        link = TextNode("Home", TextType.LINK, "/")
+        image = TextNode("Logo", TextType.IMAGE, "/logo.png")
+        self.assertEqual(
+            text_node_to_html_node(link, resolve_url).props, {"href": "/site/"}
+        )
+        self.assertEqual(
+            text_node_to_html_node(image, resolve_url).props,
+            {"src": "/site/logo.png", "alt": "Logo"},
+        )
+
     def test_invalid_type(self):
         class FakeType:
             pass
@@ -37,6 +37,17 @@ class TestTextToTextNodes(unittest.TestCase):
         nodes = text_to_textnodes(text)
         self.assertEqual(nodes, [TextNode("click here", TextType.LINK, "http://x.com")])
 
+    def test_engines_agree(self):
+        text = "**b** and _i_ with `c` and [link](/x) ![img](/y.png)"
+        self.assertEqual(
+            text_to_textnodes(text, engine="scan"),
+            text_to_textnodes(text, engine="split"),
+        )
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("text", engine="nope")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -29,6 +29,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Click me", TextType.LINK, "https://different.com")
         self.assertNotEqual(node, node2)
 
+    def test_slots(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+from url_resolver import resolve_url, url_resolver
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_resolve_url(self):
+        self.assertEqual(resolve_url("/images/a.png", "/site/"), "/site/images/a.png")
+        self.assertEqual(resolve_url("/", "/site/"), "/site/")
+        self.assertEqual(resolve_url("/a", "/"), "/a")
+
+    def test_non_root_relative_urls_are_unchanged(self):
+        for url in ("https://boot.dev", "//cdn.example.com/a.js", "a.png", "#top", ""):
+            with self.subTest(url=url):
+                self.assertEqual(resolve_url(url, "/site/"), url)
+
+    def test_url_resolver(self):
+        self.assertIsNone(url_resolver("/"))
+        self.assertEqual(url_resolver("/site/")("/blog"), "/site/blog")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from generate_page import generate_pages_recursive
+from static_sync import sync_static
+from watch import InotifyWatcher, PollingWatcher, SiteRebuilder, collect_changes
+
+
+class FakeWatcher:
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def read_changes(self, timeout=None):
+        return self.batches.pop(0) if self.batches else set()
+
+
+class TestWatchers(unittest.TestCase):
+    def setUp(self):
+        """Set up a watched directory and a watched file"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        os.makedirs(self.content_dir)
+        self.page = os.path.join(self.content_dir, "index.md")
+        self.template = os.path.join(self.test_dir, "template.html")
+        self._write(self.page, "# Home")
+        self._write(self.template, "{{ Content }}")
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _check_watcher(self, watcher):
+        try:
+            self.assertEqual(watcher.read_changes(0), set())
+
+            self._write(self.page, "# Home, edited")
+            self.assertIn(self.page, watcher.read_changes(1))
+
+            # Files next to a watched file are ignored
+            self._write(os.path.join(self.test_dir, "other.txt"), "x")
+            self._write(self.template, "<main>{{ Content }}</main>")
+            self.assertEqual(collect_changes(watcher, 0.1), {self.template})
+
+            # A new directory may be reported as a whole, depending on when
+            # the watcher notices it
+            new_dir = os.path.join(self.content_dir, "blog")
+            new_page = os.path.join(new_dir, "post.md")
+            os.makedirs(new_dir)
+            self._write(new_page, "# Post")
+            self.assertTrue(collect_changes(watcher, 0.1) & {new_dir, new_page})
+
+            # Once watched, files in the new directory are reported directly
+            self._write(new_page, "# Post, edited")
+            self.assertIn(new_page, collect_changes(watcher, 0.1))
+
+            os.remove(self.page)
+            self.assertIn(self.page, watcher.read_changes(1))
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        self._check_watcher(
+            PollingWatcher([self.content_dir, self.template], interval=0.01)
+        )
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher([self.content_dir, self.template])
+        except (OSError, AttributeError):
+            self.skipTest("inotify is not available")
+        self._check_watcher(watcher)
+
+    def test_collect_changes_debounces_bursts(self):
+        watcher = FakeWatcher([set(), {"a.md"}, {"b.md"}, {"a.md"}, set(), {"c"}])
+        self.assertEqual(collect_changes(watcher, 0), {"a.md", "b.md"})
+
+
+class TestSiteRebuilder(unittest.TestCase):
+    def setUp(self):
+        """Build a small site"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        self.static_dir = os.path.join(self.test_dir, "static")
+        self.public_dir = os.path.join(self.test_dir, "public")
+        self.template = os.path.join(self.test_dir, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        os.makedirs(self.static_dir)
+
+        self._write(
+            os.path.join(self.content_dir, "index.md"), "# Home\n\n![logo](/logo.png)"
+        )
+        self._write(os.path.join(self.content_dir, "blog", "post.md"), "# Post")
+        self._write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self._write(os.path.join(self.static_dir, "logo.png"), "png")
+        self._write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+        self.manifest = BuildManifest(os.path.join(self.test_dir, "manifest.json"))
+        self.manifest.dependencies.static_dir = self.static_dir
+        sync_static(self.static_dir, self.public_dir, self.manifest)
+        generate_pages_recursive(
+            self.content_dir,
+            self.template,
+            self.public_dir,
+            manifest=self.manifest,
+        )
+        self.rebuilder = SiteRebuilder(
+            self.content_dir,
+            self.static_dir,
+            self.template,
+            self.public_dir,
+            "/",
+            self.manifest,
+        )
+
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _read(self, *parts):
+        with open(os.path.join(self.public_dir, *parts)) as f:
+            return f.read()
+
+    def test_edited_page_is_rerendered_alone(self):
+        post = os.path.join(self.content_dir, "blog", "post.md")
+        self._write(post, "# Post, edited")
+
+        self.assertEqual(self.rebuilder.apply({post}), {"pages": 1, "assets": 0})
+        self.assertIn("<title>Post, edited</title>", self._read("blog", "post.html"))
+
+    def test_deleted_directory_removes_pages(self):
+        blog = os.path.join(self.content_dir, "blog")
+        shutil.rmtree(blog)
+
+        self.assertEqual(self.rebuilder.apply({blog}), {"pages": 1, "assets": 0})
+        self.assertFalse(
+            os.path.exists(os.path.join(self.public_dir, "blog", "post.html"))
+        )
+        self.assertEqual(
+            list(self.manifest.pages), [os.path.join(self.content_dir, "index.md")]
+        )
+
+    def test_template_change_rerenders_every_page(self):
+        self._write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+
+        self.assertEqual(
+            self.rebuilder.apply({self.template}), {"pages": 2, "assets": 0}
+        )
+        self.assertTrue(self._read("index.html").startswith("<h2>Home</h2>"))
+
+    def test_static_changes_are_copied_or_pruned(self):
+        css = os.path.join(self.static_dir, "index.css")
+        font = os.path.join(self.static_dir, "font.woff")
+        self._write(css, "body { color: red }")
+        self._write(font, "woff")
+
+        self.assertEqual(self.rebuilder.apply({css, font}), {"pages": 0, "assets": 2})
+        self.assertEqual(self._read("index.css"), "body { color: red }")
+
+        os.remove(font)
+        self.assertEqual(self.rebuilder.apply({font}), {"pages": 0, "assets": 1})
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "font.woff")))
+
+    def test_asset_change_rerenders_dependent_pages(self):
+        logo = os.path.join(self.static_dir, "logo.png")
+        self._write(logo, "new png")
+
+        self.assertEqual(self.rebuilder.apply({logo}), {"pages": 1, "assets": 1})
+        self.assertEqual(self._read("logo.png"), "new png")
+        # Only the page showing the logo was rebuilt, and it is fresh again
+        index_md = os.path.join(self.content_dir, "index.md")
+        self.assertNotIn("stale", self.manifest.pages[index_md])
+
+    def test_broken_page_raises(self):
+        post = os.path.join(self.content_dir, "blog", "post.md")
+        self._write(post, "no title")
+
+        with self.assertRaises(Exception):
+            self.rebuilder.apply({post})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from output_changes import OutputChanges
+from write_behind import WriteBehind
+
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_writes_files_and_creates_directories(self):
+        paths = [
+            os.path.join(self.test_dir, "a", "b", f"page{i}.html") for i in range(20)
+        ]
+        changes = OutputChanges(self.test_dir)
+        with WriteBehind(threads=3, max_pending=2, changes=changes) as writer:
+            for i, path in enumerate(paths):
+                writer.write(path, f"page {i}".encode("utf-8"))
+
+        for i, path in enumerate(paths):
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), f"page {i}".encode("utf-8"))
+        self.assertEqual(len(changes.added), 20)
+
+    def test_stream(self):
+        path = os.path.join(self.test_dir, "a", "page.html")
+        changes = OutputChanges(self.test_dir)
+        with WriteBehind(changes=changes) as writer:
+            writer.stream(path, lambda write: (write("<p>"), write("a</p>")))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>a</p>")
+        self.assertEqual(changes.added, {os.path.join("a", "page.html")})
+
+    def test_queue_is_bounded(self):
+        release = threading.Event()
+        writer = WriteBehind(threads=1, max_pending=1)
+        writer.call(release.wait)
+        writer.call(lambda: None)
+
+        # The writer is blocked and the queue is full: the next task waits
+        queued = threading.Event()
+        producer = threading.Thread(
+            target=lambda: (writer.call(lambda: None), queued.set())
+        )
+        producer.start()
+        self.assertFalse(queued.wait(0.05))
+        release.set()
+        self.assertTrue(queued.wait(5))
+        producer.join()
+        writer.close()
+
+    def test_call_runs_other_io(self):
+        results = []
+        with WriteBehind() as writer:
+            writer.call(results.append, "stored")
+        self.assertEqual(results, ["stored"])
+
+    def test_failed_write_is_reported(self):
+        blocker = os.path.join(self.test_dir, "file")
+        with open(blocker, "w") as f:
+            f.write("not a directory")
+        bad_path = os.path.join(blocker, "page.html")
+
+        writer = WriteBehind(threads=1)
+        writer.write(bad_path, b"x")
+        with self.assertRaises(RuntimeError) as context:
+            writer.close()
+        self.assertIn(bad_path, str(context.exception))
+
+    def test_exception_in_block_is_not_masked(self):
+        bad_path = os.path.join(self.test_dir, "missing\0name")
+        with self.assertRaises(KeyError):
+            with WriteBehind(threads=1) as writer:
+                writer.write(bad_path, b"x")
+                raise KeyError("render failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,12 @@ from leafnode import LeafNode
 from textnode import TextType
 
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, resolve_url=None, images=None):
+    """
+    Convert a TextNode to a LeafNode. resolve_url, if given, maps link and
+    image URLs to their published form (see url_resolver). images, a
+    PageImages, adds the size and loading attributes of the page's images.
+    """
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
     elif text_node.text_type == TextType.BOLD:
@@ -12,8 +17,13 @@ def text_node_to_html_node(text_node):
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = text_node.url if resolve_url is None else resolve_url(text_node.url)
+        return LeafNode("a", text_node.text, {"href": url})
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        url = text_node.url if resolve_url is None else resolve_url(text_node.url)
+        props = {"src": url, "alt": text_node.text}
+        if images is not None:
+            props.update(images.props(text_node.url))
+        return LeafNode("img", "", props)
 
     raise ValueError("Unsupported TextType: " + str(text_node.text_type))
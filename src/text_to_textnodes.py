@@ -1,9 +1,10 @@
+from scan_inline import scan_inline
 from split_nodes_delimiter import split_nodes_delimiter
 from splitters import split_nodes_image, split_nodes_link
 from textnode import TextNode, TextType
 
 
-def text_to_textnodes(text):
+def split_text_to_textnodes(text):
     nodes = [TextNode(text, TextType.TEXT)]
 
     # order matters: bold → italic → code → images → links
@@ -14,3 +15,19 @@ def text_to_textnodes(text):
     nodes = split_nodes_link(nodes)
 
     return nodes
+
+
+# "scan" tokenizes in one pass; "split" is the original multi-pass pipeline.
+# Both produce identical node lists.
+INLINE_ENGINES = {
+    "scan": scan_inline,
+    "split": split_text_to_textnodes,
+}
+
+
+def text_to_textnodes(text, engine="scan"):
+    try:
+        tokenize = INLINE_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown inline engine: {engine}")
+    return tokenize(text)
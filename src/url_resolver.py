@@ -0,0 +1,35 @@
+from functools import lru_cache
+
+
+def resolve_url(url, basepath):
+    """
+    Point a root-relative URL at basepath. Relative, absolute and
+    protocol-relative ("//host/...") URLs are returned unchanged.
+    """
+    if basepath == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return basepath + url[1:]
+
+
+@lru_cache(maxsize=None)
+def url_resolver(basepath, assets=None):
+    """
+    Build the URL resolver renderers apply to link and image URLs. The same
+    resolver is returned for the same basepath and asset map, so it can be
+    part of a cache key (see InlineCache).
+
+    Args:
+        basepath (str): Base path root-relative URLs are pointed at
+        assets (AssetMap): Optional fingerprinted names of static files,
+            applied before the basepath
+
+    Returns:
+        callable | None: Function mapping a URL to its published form, or
+        None when there is nothing to rewrite (basepath "/" and no assets),
+        so renderers can skip the call entirely
+    """
+    if assets is not None:
+        return lambda url: resolve_url(assets.resolve(url), basepath)
+    if basepath == "/":
+        return None
+    return lambda url: resolve_url(url, basepath)
@@ -0,0 +1,435 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from compile_template import load_template
+from generate_page import generate_page
+from image_size import scan_image_sizes
+from static_sync import sync_static_path
+
+# inotify(7) event flags
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Detect changes below a set of files and directories by comparing the
+    size and mtime of every file between scans.
+    """
+
+    def __init__(self, paths, interval=0.05):
+        self.paths = paths
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in self.paths:
+            if os.path.isfile(path):
+                files = [path]
+            else:
+                files = [
+                    os.path.join(root, name)
+                    for root, _, names in os.walk(path)
+                    for name in names
+                ]
+            for file_path in files:
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                snapshot[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self):
+        """
+        Returns:
+            set: Paths created, modified or deleted since the previous scan
+        """
+        old = self._snapshot
+        self._snapshot = new = self._scan()
+        changed = {path for path in new if old.get(path) != new[path]}
+        changed.update(path for path in old if path not in new)
+        return changed
+
+    def read_changes(self, timeout=None):
+        """
+        Wait for changes.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait forever
+
+        Returns:
+            set: Changed paths, empty if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return self.poll()
+            time.sleep(delay)
+            changed = self.poll()
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detect changes below a set of files and directories with Linux inotify.
+
+    Directories are watched recursively, and new subdirectories are added as
+    they appear. Files are watched through their parent directory, so editors
+    that save by renaming a temporary file over the original are still seen.
+
+    Raises:
+        OSError: If inotify is not available on this system
+    """
+
+    def __init__(self, paths):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.paths = paths
+        # watch descriptor -> (directory, names of interest or None for all)
+        self._watches = {}
+        for path in paths:
+            if os.path.isdir(path):
+                self._add_tree(path)
+            else:
+                self._add_watch(os.path.dirname(path), {os.path.basename(path)})
+
+    def _add_watch(self, directory, names=None):
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory or "."), _WATCH_MASK
+        )
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        watched_names = self._watches.get(wd, (directory, set()))[1]
+        if names is None or watched_names is None:
+            self._watches[wd] = (directory, None)
+        else:
+            self._watches[wd] = (directory, watched_names | names)
+
+    def _add_tree(self, directory):
+        for root, _, _ in os.walk(directory):
+            self._add_watch(root)
+
+    def read_changes(self, timeout=None):
+        """
+        Wait for changes.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait forever
+
+        Returns:
+            set: Changed paths, empty if the timeout expired first. A new or
+            moved directory is reported as the directory itself, and a queue
+            overflow reports every watched root.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                changed.update(self.paths)
+                continue
+            if wd not in self._watches or not name:
+                continue
+
+            directory, names = self._watches[wd]
+            name = os.fsdecode(name)
+            if names is not None and name not in names:
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                try:
+                    self._add_tree(path)
+                except OSError:
+                    # Already gone again; the delete event follows
+                    pass
+            changed.add(path)
+
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_watcher(paths):
+    """
+    Watch paths with inotify where available, falling back to polling.
+    """
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError):
+        return PollingWatcher(paths)
+
+
+def collect_changes(watcher, debounce=0.02):
+    """
+    Block until something changes, then keep collecting until no new event
+    arrived for debounce seconds, so a burst (e.g. an editor writing a
+    backup, the file and its metadata) triggers a single rebuild.
+
+    Returns:
+        set: All changed paths of the burst
+    """
+    changed = set()
+    while not changed:
+        # Events for unrelated files next to a watched file come back empty
+        changed = watcher.read_changes()
+    while True:
+        more = watcher.read_changes(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+def _is_below(path, directory):
+    return path == directory or path.startswith(directory + os.sep)
+
+
+class SiteRebuilder:
+    """
+    Apply a set of changed source paths to the generated site, touching only
+    the affected outputs: a changed page is re-rendered, a changed asset is
+    copied, and the manifest's dependency graph selects the pages to
+    re-render after a template or asset change, including images whose size
+    changed.
+    """
+
+    def __init__(
+        self,
+        content_dir,
+        static_dir,
+        template_path,
+        dest_dir,
+        basepath,
+        manifest,
+        render_cache=None,
+        minify=False,
+    ):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest = manifest
+        self.render_cache = render_cache
+        self.minify = minify
+        self.manifest.dependencies.static_dir = static_dir
+        self.image_sizes, _ = scan_image_sizes(static_dir, manifest.image_sizes)
+        self.template = self._load_template()
+
+    def _load_template(self):
+        return load_template(
+            self.template_path,
+            self.basepath,
+            minify=self.minify,
+            image_sizes=self.image_sizes,
+        )
+
+    def _dest_path(self, from_path):
+        relative_path = os.path.relpath(from_path, self.content_dir)
+        return os.path.join(self.dest_dir, relative_path.replace(".md", ".html"))
+
+    def _update_content(self, path):
+        """
+        Re-render the pages at or below path and remove pages whose source
+        is gone.
+
+        Returns:
+            int: Number of pages rendered or removed
+        """
+        count = 0
+        for from_path in list(self.manifest.pages):
+            if _is_below(from_path, path) and not os.path.isfile(from_path):
+                self.manifest.remove_page(from_path)
+                count += 1
+
+        if os.path.isdir(path):
+            from_paths = [
+                os.path.join(root, name)
+                for root, _, names in os.walk(path)
+                for name in names
+            ]
+        else:
+            from_paths = [path]
+
+        for from_path in from_paths:
+            if not from_path.endswith(".md") or not os.path.isfile(from_path):
+                continue
+            source_hash = generate_page(
+                from_path,
+                self.template_path,
+                self._dest_path(from_path),
+                self.basepath,
+                self.manifest,
+                self.template,
+                render_cache=self.render_cache,
+            )
+            if source_hash is not None:
+                count += 1
+        return count
+
+    def apply(self, changed):
+        """
+        Update the outputs affected by the changed paths.
+
+        Args:
+            changed (set): Changed files or directories, as reported by a
+                watcher
+
+        Returns:
+            dict: Number of pages rendered or removed ("pages") and assets
+            copied or removed ("assets")
+        """
+        pages = assets = 0
+        changed_inputs = set()
+
+        reload_template = self.template_path in changed
+        if reload_template:
+            changed_inputs.add(self.template_path)
+
+        # Rescan image sizes before any page is rendered with them
+        if any(_is_below(path, self.static_dir) for path in changed):
+            image_sizes, resized = scan_image_sizes(
+                self.static_dir, self.manifest.image_sizes
+            )
+            if resized:
+                self.image_sizes = image_sizes
+                reload_template = True
+                changed_inputs.update(
+                    os.path.join(self.static_dir, rel_path) for rel_path in resized
+                )
+
+        if reload_template:
+            self.template = self._load_template()
+
+        for path in sorted(changed):
+            if _is_below(path, self.content_dir):
+                pages += self._update_content(path)
+            elif _is_below(path, self.static_dir):
+                rel_path = os.path.relpath(path, self.static_dir)
+                if rel_path == ".":
+                    rel_path = ""
+                stats = sync_static_path(
+                    self.static_dir,
+                    self.dest_dir,
+                    rel_path,
+                    self.manifest,
+                    minify=self.minify,
+                )
+                assets += stats.files_copied + stats.files_removed
+                changed_inputs.update(
+                    os.path.join(self.static_dir, changed_path)
+                    for changed_path in stats.changed_paths
+                )
+
+        # Re-render the pages built from a changed template or asset
+        self.manifest.invalidate_dependents(changed_inputs)
+        for from_path, entry in list(self.manifest.pages.items()):
+            if entry.get("stale"):
+                pages += self._update_content(from_path)
+
+        return {"pages": pages, "assets": assets}
+
+
+def watch_site(
+    content_dir,
+    static_dir,
+    template_path,
+    dest_dir,
+    basepath,
+    manifest,
+    debounce=0.02,
+    render_cache=None,
+    minify=False,
+):
+    """
+    Watch the site sources and rebuild affected outputs until interrupted.
+
+    Uses inotify when available and polling otherwise. The manifest is saved
+    after every rebuild, so a normal build afterwards stays incremental.
+    With a render cache, a template change re-renders pages from cached
+    content. With minify, pages and stylesheets are written minified.
+    """
+    rebuilder = SiteRebuilder(
+        content_dir,
+        static_dir,
+        template_path,
+        dest_dir,
+        basepath,
+        manifest,
+        render_cache,
+        minify,
+    )
+    paths = [path for path in (content_dir, static_dir) if os.path.isdir(path)]
+    paths.append(template_path)
+    watcher = create_watcher(paths)
+
+    print(f"Watching {', '.join(paths)} ({type(watcher).__name__})")
+    try:
+        while True:
+            changed = collect_changes(watcher, debounce)
+            start = time.perf_counter()
+            try:
+                counts = rebuilder.apply(changed)
+            except Exception as e:
+                # Keep watching; the next save will usually fix the source
+                print(f"Rebuild failed: {e}")
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"Rebuilt {counts['pages']} pages and {counts['assets']} assets "
+                f"in {elapsed:.1f} ms"
+            )
+            manifest.save()
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        watcher.close()
+        manifest.save()
+        if render_cache is not None:
+            render_cache.prune()
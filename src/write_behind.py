@@ -0,0 +1,129 @@
+import os
+import queue
+import threading
+
+from output_changes import stream_if_changed, write_if_changed
+
+
+class WriteBehind:
+    """
+    Write files from background threads, so a producer can go on rendering
+    while earlier outputs are still being flushed. Other I/O, such as
+    storing a render cache entry, can be queued with call.
+
+    Pending writes go through a bounded queue: once max_pending tasks are
+    waiting, write blocks until a writer thread catches up, which keeps
+    memory use flat however fast pages are produced. Missing parent
+    directories are created once per directory, and files that already hold
+    the data are not rewritten (see write_if_changed and stream_if_changed);
+    with changes (an
+    OutputChanges), the outcome of every write is recorded there.
+
+    Use as a context manager, or call close to wait for all pending writes.
+    A failed write is reported by the next write or by close.
+    """
+
+    def __init__(self, threads=2, max_pending=16, changes=None):
+        self._queue = queue.Queue(max_pending)
+        self._made_dirs = set()
+        self._error = None
+        self._changes = changes
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Do not mask the exception that ended the with block
+        self.close(raise_errors=exc_type is None)
+        return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            func, args = item
+            if self._error is not None:
+                # Drain the queue without writing after a failure
+                continue
+            try:
+                func(*args)
+            except Exception as e:
+                self._error = (args[0] if args else func, e)
+
+    def _make_parent(self, path):
+        directory = os.path.dirname(path)
+        if directory and directory not in self._made_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._made_dirs.add(directory)
+
+    def _record(self, path, status):
+        if self._changes is not None:
+            self._changes.record(path, status)
+
+    def _write(self, path, data):
+        self._make_parent(path)
+        self._record(path, write_if_changed(path, data))
+
+    def _stream(self, path, write_content):
+        self._make_parent(path)
+        self._record(path, stream_if_changed(path, write_content))
+
+    def _raise_error(self):
+        path, error = self._error
+        raise RuntimeError(f"Failed to write {path}: {error}") from error
+
+    def write(self, path, data):
+        """
+        Queue data (bytes) to be written to path, blocking while the queue
+        is full.
+
+        Raises:
+            RuntimeError: If an earlier write failed
+        """
+        self.call(self._write, path, data)
+
+    def stream(self, path, write_content):
+        """
+        Queue a file to be written piece by piece: write_content(write) runs
+        in a writer thread and passes str fragments to write (see
+        stream_if_changed). Blocks while the queue is full.
+
+        Raises:
+            RuntimeError: If an earlier write failed
+        """
+        self.call(self._stream, path, write_content)
+
+    def call(self, func, *args):
+        """
+        Queue func(*args) to run in a writer thread, blocking while the
+        queue is full. A failure is reported like a failed write, naming
+        the first argument.
+
+        Raises:
+            RuntimeError: If an earlier task failed
+        """
+        if self._error is not None:
+            self._raise_error()
+        self._queue.put((func, args))
+
+    def close(self, raise_errors=True):
+        """
+        Wait until every queued file is written and stop the writer threads.
+
+        Raises:
+            RuntimeError: If a write failed, naming its path
+        """
+        if self._threads:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+        if raise_errors and self._error is not None:
+            self._raise_error()